@@ -0,0 +1,276 @@
+"""End-to-end crawl benchmarks against a synthetic website served locally, with results written as JSON.
+
+A synthetic site (see `synthetic_site.py`) is served from this process, and every scenario runs in its own child
+process, so that its peak resident set size and CPU time are its own:
+
+- `crawl`: `WebCrawler.crawl` over the whole site;
+- `to_markdown`: the crawl, then `WebGraph.to_markdown`;
+- `save_multiple`: the crawl, then `WebGraph.save_to_multiple_files`;
+- `save_single`: the crawl, then `WebGraph.save_to_single_file`;
+- `stream`: `WebCrawler.iter_crawl` writing every page as soon as it is crawled (`stream_to_files`).
+
+Every scenario reports the pages per second of the whole run and of its last phase, the CPU time and the peak RSS.
+Scenarios writing Markdown also report the 50th and 99th percentiles of the latency from the moment a page was
+served to the moment its Markdown was written (the modification time of its file, or the moment it was handed to
+the writer of the combined file). With `--baseline`, results are compared with a previous JSON output, and the
+script exits with status 1 if any metric regressed by more than `--tolerance`.
+
+Usage::
+
+    python benchmarks/bench_crawl.py --pages 500 --latency 0.01 --workers 8 --output results.json
+    python benchmarks/bench_crawl.py --pages 500 --latency 0.01 --workers 8 --baseline results.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import logging
+import platform
+import argparse
+import resource
+import tempfile
+import subprocess
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_site import SiteSpec, serve_site  # noqa: E402
+from crawler import stream_to_files  # noqa: E402
+from crawler.web.web_crawler import WebCrawler  # noqa: E402
+from crawler.web.http_session import HttpSession  # noqa: E402
+from crawler.utils.file_utils import generate_filename_from_url  # noqa: E402
+
+SCENARIOS = ("crawl", "to_markdown", "save_multiple", "save_single", "stream")
+
+# Metrics compared with a baseline, and whether higher values are better
+COMPARED_METRICS = {
+    "pages_per_second": True,
+    "latency_p50_ms": False,
+    "latency_p99_ms": False,
+    "cpu_seconds": False,
+    "peak_rss_mb": False,
+}
+
+
+def percentile(values, fraction):
+    """Returns a percentile of a list of values, by the nearest-rank method, or None if it is empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def timed_pairs(pairs, written_at):
+    """Passes `(url, ...)` pairs through, recording when each one is handed over."""
+    for pair in pairs:
+        yield pair
+        written_at[pair[0]] = time.time()
+
+
+def timed_records(records, written_at):
+    """Passes crawled records through, recording when the previous one was written by the consumer."""
+    previous = None
+    for record in records:
+        if previous is not None:
+            written_at[previous] = time.time()
+        yield record
+        previous = record.node.url
+    if previous is not None:
+        written_at[previous] = time.time()
+
+
+def run_scenario(scenario, url, max_depth, workers, markdown_workers):
+    """Runs one scenario in the current process, and returns its measurements."""
+    logging.getLogger().setLevel(logging.ERROR)
+    crawler = WebCrawler(session=HttpSession(pool_maxsize=max(10, workers)))
+    written_at = {}
+    start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if scenario in ("crawl", "stream"):
+            phase_start = start
+        if scenario == "stream":
+            records = crawler.iter_crawl(url, max_depth=max_depth, workers=workers)
+            pages = stream_to_files(timed_records(records, written_at), directory, combine=False)
+        else:
+            graph = crawler.crawl(url, max_depth=max_depth, workers=workers)
+            pages = len(graph)
+            if scenario != "crawl":
+                phase_start = time.perf_counter()
+            if scenario == "to_markdown":
+                graph.to_markdown(workers=markdown_workers)
+            elif scenario == "save_multiple":
+                graph.save_to_multiple_files(directory, workers=markdown_workers)
+                for node in graph.all_nodes():
+                    path = os.path.join(directory, generate_filename_from_url(node.url))
+                    if os.path.exists(path):
+                        written_at[node.url] = os.stat(path).st_mtime
+            elif scenario == "save_single":
+                iter_markdown = graph.iter_markdown
+                graph.iter_markdown = lambda **options: timed_pairs(iter_markdown(**options), written_at)
+                graph.save_to_single_file(directory, workers=markdown_workers)
+        end = time.perf_counter()
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    crawler.session.close()
+    return {
+        "pages": pages,
+        "seconds": end - start,
+        "phase_seconds": end - phase_start,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "peak_rss_mb": peak_rss / 1024**2,
+        "written_at": written_at,
+    }
+
+
+def measure(server, scenario, args):
+    """Runs a scenario in a child process, and returns its results."""
+    server.served_at.clear()
+    output = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--scenario",
+            scenario,
+            "--url",
+            server.url,
+            "--max_depth",
+            str(args.max_depth),
+            "--workers",
+            str(args.workers),
+            "--markdown_workers",
+            str(args.markdown_workers),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result = json.loads(output)
+
+    written_at = result.pop("written_at")
+    latencies = []
+    for url, written in written_at.items():
+        served = server.served_at.get(urlsplit(url).path or "/")
+        if served is not None:
+            latencies.append((written - served) * 1000)
+    result["pages_per_second"] = result["pages"] / result["seconds"]
+    result["phase_pages_per_second"] = result["pages"] / result["phase_seconds"]
+    result["latency_p50_ms"] = percentile(latencies, 0.5)
+    result["latency_p99_ms"] = percentile(latencies, 0.99)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Returns the descriptions of the metrics that regressed by more than `tolerance` from a baseline."""
+    regressions = []
+    for scenario, result in results.items():
+        previous = baseline.get("results", {}).get(scenario)
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            value, reference = result.get(metric), previous.get(metric)
+            if value is None or not reference:
+                continue
+            change = (value - reference) / reference
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{scenario}.{metric}: {reference:.2f} -> {value:.2f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500, help="Number of pages of the site")
+    parser.add_argument("--fan_out", type=int, default=4, help="Number of child pages linked from every page")
+    parser.add_argument("--cross_links", type=int, default=8, help="Number of additional links of every page")
+    parser.add_argument("--page_size", type=int, default=8192, help="Approximate size of the text of a page")
+    parser.add_argument("--locality", type=float, default=0.8, help="Probability that a link points near its page")
+    parser.add_argument("--latency", type=float, default=0.005, help="Delay of every response, in seconds")
+    parser.add_argument("--slow_fraction", type=float, default=0.0, help="Fraction of slow pages")
+    parser.add_argument("--slow_delay", type=float, default=0.2, help="Extra delay of slow pages, in seconds")
+    parser.add_argument("--error_fraction", type=float, default=0.0, help="Fraction of pages answering a 500")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the site generator")
+    parser.add_argument("--max_depth", type=int, default=None, help="Crawl depth (default: enough for all pages)")
+    parser.add_argument("--workers", type=int, default=8, help="Number of crawl workers")
+    parser.add_argument("--markdown_workers", type=int, default=1, help="Number of Markdown conversion processes")
+    parser.add_argument("--scenarios", type=str, default=",".join(SCENARIOS), help="Comma-separated scenarios")
+    parser.add_argument("--output", type=str, default=None, help="Path of the JSON results")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative change reported as a regression")
+    parser.add_argument("--scenario", choices=SCENARIOS, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--url", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario is not None:
+        result = run_scenario(args.scenario, args.url, args.max_depth, args.workers, args.markdown_workers)
+        print(json.dumps(result))
+        return
+
+    spec = SiteSpec(
+        pages=args.pages,
+        fan_out=args.fan_out,
+        cross_links=args.cross_links,
+        page_size=args.page_size,
+        locality=args.locality,
+        latency=args.latency,
+        slow_fraction=args.slow_fraction,
+        slow_delay=args.slow_delay,
+        error_fraction=args.error_fraction,
+        seed=args.seed,
+    )
+    if args.max_depth is None:
+        # The depth of the last page in the tree of child links
+        args.max_depth = max(1, math.ceil(math.log(args.pages * (args.fan_out - 1) + 1, args.fan_out)))
+
+    server = serve_site(spec)
+    results = {}
+    try:
+        for scenario in args.scenarios.split(","):
+            results[scenario] = measure(server, scenario, args)
+            result = results[scenario]
+            latency = (
+                f", latency p50 {result['latency_p50_ms']:.0f} ms p99 {result['latency_p99_ms']:.0f} ms"
+                if result["latency_p50_ms"] is not None
+                else ""
+            )
+            print(
+                f"{scenario:>14}: {result['pages']} pages, {result['pages_per_second']:.1f} pages/s "
+                f"({result['phase_pages_per_second']:.1f} in the last phase), CPU {result['cpu_seconds']:.2f} s, "
+                f"peak RSS {result['peak_rss_mb']:.0f} MiB{latency}",
+                file=sys.stderr,
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = {
+        "site": spec.to_dict(),
+        "crawl": {"max_depth": args.max_depth, "workers": args.workers, "markdown_workers": args.markdown_workers},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Memory per edge and build time of the storage engines of the crawl graph.
+
+The same synthetic link graph (every page linking to a fixed number of other pages, as the navigation of a
+documentation site does) is added to a `WebGraph` with each storage engine of `crawler.base.graph_store`. The memory
+allocated by the graph, node objects excluded, is measured with `tracemalloc` and reported per edge. The build time
+is measured in a second pass without `tracemalloc`, which slows allocations down.
+
+Usage::
+
+    python benchmarks/bench_graph_store.py --pages 20000 --links 50
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler.web.web_node import WebNode  # noqa: E402
+from crawler.web.web_graph import WebGraph  # noqa: E402
+from crawler.web.page_cache import PageCache  # noqa: E402
+
+
+def generate_nodes(count):
+    cache = PageCache(max_bytes=0)
+    return [
+        WebNode(f"https://docs.example.com/section-{index % 97}/page-{index}.html", cache=cache)
+        for index in range(count)
+    ]
+
+
+def build(store, nodes, links):
+    graph = WebGraph(store=store)
+    for node in nodes:
+        graph.add_node(node)
+    count = len(nodes)
+    for index, node in enumerate(nodes):
+        for offset in range(1, links + 1):
+            graph.add_edge(node, nodes[(index * 31 + offset * 997) % count], depth=1)
+    # Queries compact pending edges, as the end of a crawl does
+    graph.store.number_of_edges()
+    return graph
+
+
+def measure(store, nodes, links):
+    """Returns the number of edges, the bytes per edge and the build time in seconds."""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    graph = build(store, nodes, links)
+    allocated = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    edge_count = graph.store.number_of_edges()
+    del graph
+
+    start = time.perf_counter()
+    build(store, nodes, links)
+    return edge_count, allocated / edge_count, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20_000, help="Number of pages of the graph")
+    parser.add_argument("--links", type=int, default=50, help="Number of links of every page")
+    args = parser.parse_args()
+
+    nodes = generate_nodes(args.pages)
+    print(f"{'store':>10} {'edges':>10} {'bytes/edge':>11} {'build (s)':>10}")
+    for store in ["networkx", "compact"]:
+        edge_count, bytes_per_edge, seconds = measure(store, nodes, args.links)
+        print(f"{store:>10} {edge_count:10d} {bytes_per_edge:11.1f} {seconds:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
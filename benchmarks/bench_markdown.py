@@ -0,0 +1,60 @@
+"""Throughput of HTML to Markdown conversion on large pages.
+
+Compares the former conversion path (parse the page with BeautifulSoup, re-serialize it with `prettify()`, convert
+the result with a new html2text handler) with the single-pass `MarkdownConverter`, on first conversion and when the
+same content is converted again (duplicate pages).
+
+Usage::
+
+    python benchmarks/bench_markdown.py --pages 50 --paragraphs 2000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import html2text
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_memory import generate_page  # noqa: E402
+from crawler.web.markdown_converter import MarkdownConverter  # noqa: E402
+
+
+def prettify_then_convert(html):
+    """The conversion path used before `MarkdownConverter`."""
+    handler = html2text.HTML2Text()
+    handler.ignore_links = True
+    return handler.handle(BeautifulSoup(html, "html.parser").prettify())
+
+
+def measure(convert, corpus):
+    """Returns the number of MiB of HTML converted per second."""
+    start = time.perf_counter()
+    for html in corpus:
+        convert(html)
+    return sum(len(html) for html in corpus) / 1024**2 / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20, help="Number of synthetic pages")
+    parser.add_argument("--paragraphs", type=int, default=2000, help="Number of paragraphs per page")
+    args = parser.parse_args()
+
+    corpus = [
+        generate_page(index, args.pages, paragraphs=args.paragraphs) for index in range(args.pages)
+    ]
+    size = sum(len(html) for html in corpus) / 1024**2
+    print(f"{len(corpus)} pages, {size:.1f} MiB")
+
+    converter = MarkdownConverter()
+    print(f"{'prettify':>12}: {measure(prettify_then_convert, corpus):6.2f} MiB/s")
+    print(f"{'single pass':>12}: {measure(converter.convert, corpus):6.2f} MiB/s")
+    print(f"{'memoized':>12}: {measure(converter.convert, corpus):6.2f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
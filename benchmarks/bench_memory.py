@@ -0,0 +1,92 @@
+"""Peak memory of a crawl, with and without the memory-lean mode of `WebNode`.
+
+Each mode runs in its own process over the same synthetic pages, which are loaded into the nodes without any network
+access, as a crawl would: the links of every page are extracted and the nodes are kept in the crawl subgraph. The
+peak resident set size of the process is reported per 1,000 pages.
+
+Usage::
+
+    python benchmarks/bench_memory.py --pages 2000
+"""
+
+import os
+import sys
+import json
+import argparse
+import resource
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler.web.web_node import WebNode  # noqa: E402
+from crawler.web.page_cache import PageCache  # noqa: E402
+
+
+def generate_page(index, pages, links_per_page=40, paragraphs=60):
+    """Generates a synthetic web page linking to other pages of the site."""
+    links = "".join(
+        f'<li><a href="/page/{(index * 7 + offset) % pages}.html">Page {offset}</a></li>'
+        for offset in range(links_per_page)
+    )
+    text = "".join(
+        f"<p>Paragraph {offset} of page {index}, with <b>some</b> <i>inline</i> markup.</p>"
+        for offset in range(paragraphs)
+    )
+    return (
+        f"<html><head><title>Page {index}</title></head><body><h1>Page {index}</h1>"
+        f"<nav><ul>{links}</ul></nav><main>{text}</main></body></html>"
+    )
+
+
+def peak_rss_bytes():
+    """Returns the peak resident set size of the current process, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run(pages, lean):
+    """Extracts the links of `pages` synthetic pages, keeping all the nodes alive, and returns the peak RSS."""
+    # The page cache is disabled so that only the nodes hold page content
+    cache = PageCache(max_bytes=0)
+    baseline = peak_rss_bytes()
+
+    nodes = []
+    for index in range(pages):
+        node = WebNode(f"https://example.com/page/{index}.html", cache=cache, lean=lean)
+        node.load_html(generate_page(index, pages))
+        node.fetch_connected_hyperlinks()
+        nodes.append(node)
+
+    return {"pages": pages, "lean": lean, "baseline_rss": baseline, "peak_rss": peak_rss_bytes()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000, help="Number of synthetic pages")
+    parser.add_argument("--mode", choices=["default", "lean"], default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        print(json.dumps(run(args.pages, lean=args.mode == "lean")))
+        return
+
+    results = {}
+    for mode in ("default", "lean"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--pages", str(args.pages), "--mode", mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output)
+
+    for mode, result in results.items():
+        growth = (result["peak_rss"] - result["baseline_rss"]) / 1024**2
+        print(
+            f"{mode:>8}: peak RSS {result['peak_rss'] / 1024**2:8.1f} MiB, "
+            f"{growth * 1000 / args.pages:8.1f} MiB per 1k pages"
+        )
+
+
+if __name__ == "__main__":
+    main()
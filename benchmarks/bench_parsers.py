@@ -0,0 +1,77 @@
+"""Throughput of the HTML parser backends of `WebNode` over a corpus of saved pages.
+
+For each backend, every page of the corpus is loaded into a node and parsed, then its links are extracted and it is
+converted to Markdown, as a crawl saving Markdown does. The DOM-free streaming link extractor, used when a page is
+not parsed, is measured as well. The corpus is a directory of saved `.html` files, or synthetic pages when no
+directory is given. Backends whose optional package is not installed are skipped.
+
+Usage::
+
+    python benchmarks/bench_parsers.py --corpus saved_pages/
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_memory import generate_page  # noqa: E402
+from crawler.web.web_node import WebNode  # noqa: E402
+from crawler.web.page_cache import PageCache  # noqa: E402
+from crawler.web.html_parser import PARSERS, get_parser  # noqa: E402
+
+
+def load_corpus(directory, pages):
+    """Returns the HTML of the saved pages of a directory, or `pages` synthetic pages if no directory is given."""
+    if directory is None:
+        return [generate_page(index, pages) for index in range(pages)]
+
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*.htm*"), recursive=True)):
+        with open(path, "r", encoding="utf-8", errors="replace") as file:
+            corpus.append(file.read())
+    return corpus
+
+
+def measure(parser, corpus, parse=True, markdown=False):
+    """Returns the number of pages per second processed with a parser backend."""
+    cache = PageCache(max_bytes=0)
+    start = time.perf_counter()
+    for index, html in enumerate(corpus):
+        node = WebNode(f"https://example.com/page/{index}.html", cache=cache, parser=parser)
+        node.load_html(html)
+        if parse:
+            node.soup
+        node.fetch_connected_hyperlinks()
+        if markdown:
+            node.convert_to_markdown()
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=str, default=None, help="Directory of saved .html pages")
+    parser.add_argument("--pages", type=int, default=500, help="Number of synthetic pages")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.pages)
+    size = sum(len(html) for html in corpus) / 1024**2
+    print(f"{len(corpus)} pages, {size:.1f} MiB")
+    print(f"{'streaming':>12}: {measure(None, corpus, parse=False):8.1f} pages/s (links)")
+
+    for name in PARSERS:
+        try:
+            backend = get_parser(name)
+        except ImportError as e:
+            print(f"{name:>12}: skipped ({e})")
+            continue
+        links = measure(backend, corpus, markdown=False)
+        markdown = measure(backend, corpus, markdown=True)
+        print(f"{name:>12}: {links:8.1f} pages/s (links), {markdown:8.1f} pages/s (links + Markdown)")
+
+
+if __name__ == "__main__":
+    main()
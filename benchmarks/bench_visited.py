@@ -0,0 +1,116 @@
+"""Memory per URL of the structures deduplicating the nodes of a crawl.
+
+The same synthetic URLs are added to each structure: the crawl subgraph (a `WebGraph` holding a `WebNode` per URL, the
+default), a Python `set` of the URL strings, and the compact visited sets of `crawler.base.visited_set`. The memory
+allocated by each structure, URL strings included, is measured with `tracemalloc` and reported per URL. The time of
+an insertion and of a lookup are measured in a second pass without `tracemalloc`, which slows allocations down, and
+the false positive rate is measured over URLs that were never added.
+
+Usage::
+
+    python benchmarks/bench_visited.py --urls 200000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler.web.web_node import WebNode  # noqa: E402
+from crawler.web.web_graph import WebGraph  # noqa: E402
+from crawler.web.page_cache import PageCache  # noqa: E402
+from crawler.base.visited_set import BloomFilter, HashVisitedSet  # noqa: E402
+
+
+def generate_urls(count, host="docs.example.com"):
+    """Generates distinct URLs of realistic length (about 70 characters)."""
+    return [f"https://{host}/section-{index % 97}/topic-{index // 97}/page-{index}.html" for index in range(count)]
+
+
+class GraphMembership:
+    """The default deduplication: every URL is a node of the crawl subgraph."""
+
+    def __init__(self):
+        self.graph = WebGraph()
+        self.cache = PageCache(max_bytes=0)
+
+    def add(self, url):
+        self.graph.add_node(WebNode(copy(url), cache=self.cache))
+
+    def __contains__(self, url):
+        return url in self.graph.graph.nodes
+
+
+class SetMembership(set):
+    """A Python set of the URL strings."""
+
+    def add(self, url):
+        super().add(copy(url))
+
+
+def copy(url):
+    # The structures keeping URLs own their strings, as in a crawl where the URLs come from parsed pages
+    return url.encode("utf-8").decode("utf-8")
+
+
+STRUCTURES = {
+    "graph (default)": GraphMembership,
+    "set of str": SetMembership,
+    "hash": HashVisitedSet,
+    "bloom 1%": lambda: BloomFilter(capacity=100_000, error_rate=0.01),
+    "bloom 0.1%": lambda: BloomFilter(capacity=100_000, error_rate=0.001),
+}
+
+
+def measure(factory, urls, absent_urls):
+    """Returns the bytes per URL, the insertion and lookup times in microseconds, and the false positive rate."""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    structure = factory()
+    for url in urls:
+        structure.add(url)
+    allocated = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del structure
+
+    start = time.perf_counter()
+    structure = factory()
+    for url in urls:
+        structure.add(url)
+    insert_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for url in urls:
+        assert url in structure
+    lookup_seconds = time.perf_counter() - start
+
+    false_positives = sum(url in structure for url in absent_urls)
+    return (
+        allocated / len(urls),
+        insert_seconds / len(urls) * 1e6,
+        lookup_seconds / len(urls) * 1e6,
+        false_positives / len(absent_urls),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--urls", type=int, default=200_000, help="Number of URLs added to each structure")
+    args = parser.parse_args()
+
+    urls = generate_urls(args.urls)
+    absent_urls = generate_urls(min(args.urls, 100_000), host="blog.example.com")
+    print(f"{len(urls)} URLs, {sum(map(len, urls)) / len(urls):.0f} characters on average")
+    print(f"{'structure':>16} {'bytes/URL':>10} {'add (us)':>9} {'lookup (us)':>12} {'false positives':>16}")
+    for name, factory in STRUCTURES.items():
+        bytes_per_url, insert_us, lookup_us, false_positive_rate = measure(factory, urls, absent_urls)
+        print(
+            f"{name:>16} {bytes_per_url:10.1f} {insert_us:9.2f} {lookup_us:12.2f} {false_positive_rate:16.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""A synthetic website served from a local HTTP server, for offline crawl benchmarks.
+
+Pages are generated on the fly and deterministically from their index and the `SiteSpec`, so that every run crawls
+the same site without any network access:
+
+- page `i` links to its children `i * fan_out + 1` to `i * fan_out + fan_out`, so that every page is reachable from
+  the home page in `log(pages) / log(fan_out)` hops, and to `cross_links` other pages, drawn near `i` with probability
+  `locality` (as the navigation of a section does) and anywhere in the site otherwise;
+- the body of every page holds about `page_size` bytes of text;
+- a `slow_fraction` of the pages answer after an extra `slow_delay`, an `error_fraction` answer with a 500 error,
+  and every response is delayed by `latency` seconds to emulate the network round trip.
+
+The server records when every path was served (`served_at`), to measure the latency from fetch to write.
+
+Usage::
+
+    python benchmarks/synthetic_site.py --pages 1000 --latency 0.02   # serves until interrupted
+"""
+
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Number of pages around a page its local links point to
+LOCALITY_WINDOW = 20
+
+
+class SiteSpec:
+    """The parameters of a synthetic website.
+
+    Parameters
+    ----------
+    pages : int, optional
+        The number of pages. Defaults to 1000.
+    fan_out : int, optional
+        The number of child pages every page links to. Defaults to 4.
+    cross_links : int, optional
+        The number of additional links of every page. Defaults to 8.
+    page_size : int, optional
+        The approximate size of the text of every page, in bytes. Defaults to 8192.
+    locality : float, optional
+        The probability that an additional link points near its page. Defaults to 0.8.
+    latency : float, optional
+        The delay of every response, in seconds. Defaults to 0.
+    slow_fraction : float, optional
+        The fraction of pages answering after an extra `slow_delay`. Defaults to 0.
+    slow_delay : float, optional
+        The extra delay of slow pages, in seconds. Defaults to 0.5.
+    error_fraction : float, optional
+        The fraction of pages answering with a 500 error. Defaults to 0.
+    seed : int, optional
+        The seed of the random choices. Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        pages=1000,
+        fan_out=4,
+        cross_links=8,
+        page_size=8192,
+        locality=0.8,
+        latency=0.0,
+        slow_fraction=0.0,
+        slow_delay=0.5,
+        error_fraction=0.0,
+        seed=0,
+    ):
+        self.pages = pages
+        self.fan_out = fan_out
+        self.cross_links = cross_links
+        self.page_size = page_size
+        self.locality = locality
+        self.latency = latency
+        self.slow_fraction = slow_fraction
+        self.slow_delay = slow_delay
+        self.error_fraction = error_fraction
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def _random(self, index, salt):
+        return random.Random(f"{self.seed}-{salt}-{index}")
+
+    def links(self, index):
+        """Returns the indices of the pages linked from a page."""
+        children = range(index * self.fan_out + 1, min(index * self.fan_out + self.fan_out, self.pages - 1) + 1)
+        rng = self._random(index, "links")
+        others = []
+        for _ in range(self.cross_links):
+            if rng.random() < self.locality:
+                target = index + rng.randint(-LOCALITY_WINDOW, LOCALITY_WINDOW)
+            else:
+                target = rng.randrange(self.pages)
+            others.append(min(max(target, 0), self.pages - 1))
+        return list(children) + others
+
+    def is_slow(self, index):
+        return self._random(index, "slow").random() < self.slow_fraction
+
+    def is_error(self, index):
+        # The home page always answers, so that the crawl can start
+        return index > 0 and self._random(index, "error").random() < self.error_fraction
+
+    def page(self, index):
+        """Returns the HTML of a page."""
+        links = "".join(f'<li><a href="{self.path(target)}">Page {target}</a></li>' for target in self.links(index))
+        paragraph = f"<p>Paragraph of page {index}, with <b>some</b> <i>inline</i> markup and a few words.</p>"
+        text = paragraph * max(1, self.page_size // len(paragraph))
+        return (
+            f"<html><head><title>Page {index}</title></head><body><h1>Page {index}</h1>"
+            f"<nav><ul>{links}</ul></nav><main>{text}</main></body></html>"
+        )
+
+    @staticmethod
+    def path(index):
+        return "/" if index == 0 else f"/page/{index}.html"
+
+    @staticmethod
+    def index(path):
+        """Returns the index of the page of a path, or None if the path is not a page of the site."""
+        if path == "/":
+            return 0
+        if path.startswith("/page/") and path.endswith(".html"):
+            try:
+                return int(path[len("/page/"):-len(".html")])
+            except ValueError:
+                return None
+        return None
+
+
+class _SiteRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        spec = self.server.spec
+        index = spec.index(self.path)
+        delay = spec.latency + (spec.slow_delay if index is not None and spec.is_slow(index) else 0)
+        if delay:
+            time.sleep(delay)
+
+        if index is None or index >= spec.pages or index < 0:
+            status, body = 404, b"Not found"
+        elif spec.is_error(index):
+            status, body = 500, b"Internal server error"
+        else:
+            status, body = 200, spec.page(index).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.served_at.setdefault(self.path, time.time())
+            self.server.requests += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _SiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Crawls with many workers open many connections at once
+    request_queue_size = 128
+
+
+def serve_site(spec, host="127.0.0.1", port=0):
+    """Serves a synthetic website from a background thread.
+
+    Parameters
+    ----------
+    spec : SiteSpec
+        The parameters of the site.
+    host : str, optional
+        The address to listen on. Defaults to "127.0.0.1".
+    port : int, optional
+        The port to listen on. Defaults to 0 (any free port).
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        The running server. Its `url` attribute holds the URL of the home page, `served_at` maps every path to the
+        time (`time.time()`) it was first served, and `requests` counts the requests. Stop it with `shutdown`.
+    """
+    server = _SiteServer((host, port), _SiteRequestHandler)
+    server.spec = spec
+    server.served_at = {}
+    server.requests = 0
+    server.lock = threading.Lock()
+    server.url = f"http://{host}:{server.server_address[1]}/"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000, help="Number of pages")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay of every response, in seconds")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    args = parser.parse_args()
+
+    server = serve_site(SiteSpec(pages=args.pages, latency=args.latency), port=args.port)
+    print(f"Serving {args.pages} pages at {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
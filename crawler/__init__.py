@@ -1,8 +1,132 @@
 import os
+import json
 import logging
 import argparse
 
 from crawler.web.web_crawler import WebCrawler
+from crawler.base.checkpoint import CrawlCheckpoint
+from crawler.base.metrics import METRICS_EXTENSIONS, metrics_format, timed
+from crawler.utils.file_utils import append_content_to_file, generate_filename_from_url, save_content_to_file
+from crawler.web.http_cache import DiskCache
+from crawler.web.http_session import HttpSession
+from crawler.web.politeness import Politeness
+from crawler.utils.url_utils import UrlCanonicalizer
+
+
+def stream_to_files(records, output_folder, combine, filename="merged_output.md", metrics=None):
+    """Writes the Markdown of every crawled page as soon as it is yielded by the crawler.
+
+    Parameters
+    ----------
+    records : iterable of CrawledNode
+        The nodes yielded by `iter_crawl` or `iter_resume`.
+    output_folder : str
+        The folder where Markdown files will be saved.
+    combine : bool
+        If True, all pages are written to a single Markdown file (replacing the file of a previous run) instead of
+        one file per page.
+    filename : str, optional
+        The name of the combined Markdown file. Defaults to "merged_output.md".
+    metrics : CrawlMetrics, optional
+        If given, the write of every page is timed as the `write` phase, and the bytes and files written are
+        counted. Defaults to None.
+
+    Returns
+    -------
+    int
+        The number of pages written.
+    """
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    count = 0
+    if combine:
+        path = os.path.join(output_folder, filename)
+        with open(path, "w", encoding="utf-8") as file:
+            for record in records:
+                with timed(metrics, "write", record.node.url):
+                    append_content_to_file(file, record.node.url, record.markdown)
+                    file.flush()
+                count += 1
+        if metrics is not None:
+            metrics.count("bytes_out", os.path.getsize(path))
+            metrics.count("files_written")
+    else:
+        for record in records:
+            with timed(metrics, "write", record.node.url):
+                save_content_to_file(record.node.url, record.markdown, output_folder)
+            if metrics is not None:
+                path = os.path.join(output_folder, generate_filename_from_url(record.node.url))
+                metrics.count("bytes_out", os.path.getsize(path))
+                metrics.count("files_written")
+            count += 1
+    return count
+
+
+def crawl_and_save(crawler, args):
+    """Crawls the whole graph, then saves it as Markdown files after asking for confirmation.
+
+    Parameters
+    ----------
+    crawler : WebCrawler
+        The configured web crawler.
+    args : argparse.Namespace
+        The parsed command-line arguments.
+    """
+    # Assuming 'crawl' is a method you will implement in WebCrawler for starting the crawling process
+    # Note: You need to adjust this part as per your WebCrawler implementation details
+    if args.resume:
+        crawled_data = crawler.resume(CrawlCheckpoint(args.resume), workers=args.workers)
+    else:
+        checkpoint = CrawlCheckpoint(args.checkpoint_dir) if args.checkpoint_dir else None
+        crawled_data = crawler.crawl(
+            args.url, max_depth=args.max_depth, workers=args.workers, checkpoint=checkpoint
+        )
+
+    logging.info("Crawled graph: %s", str(crawled_data))
+    logging.info("HTTP connections: %s", str(crawler.session.stats))
+    logging.info("Page cache: %s", str(crawler.cache.stats()))
+
+    if args.save_graph:
+        crawled_data.save(args.save_graph)
+        logging.info("Saved crawled graph to %s", args.save_graph)
+
+    if args.visualize:
+        crawled_data.visualize()
+
+    user_input = input(
+        "Do you want to proceed to saving the crawled data as Markdown files? (y/N): "
+    )
+
+    if user_input.lower() == "y":
+        print("Continuing...")
+
+        # Assuming you have methods to save crawled data, which you will need to implement
+        if args.combine:
+            output_path = crawled_data.save_to_single_file(
+                directory=args.output_folder,
+                filename="merged_output.md",
+                compression=args.compress,
+                workers=args.markdown_workers,
+                metrics=crawler.metrics,
+            )
+            logging.info("Saved crawled data to a single Markdown file %s", output_path)
+        else:
+            # Save to multiple Markdown files
+            stats = crawled_data.save_to_multiple_files(
+                directory=args.output_folder, workers=args.markdown_workers, metrics=crawler.metrics
+            )
+            logging.info(
+                "Saved crawled data to multiple Markdown files in %s "
+                "(%d written, %d unchanged, %.1f files/s, %.1f KiB/s)",
+                args.output_folder,
+                stats["written"],
+                stats["unchanged"],
+                stats["files_per_second"],
+                stats["bytes_per_second"] / 1024,
+            )
+    else:
+        print("Stopping.")
 
 
 def main():
@@ -13,9 +137,8 @@ def main():
     parser.add_argument(
         "-u",
         "--url",
-        required=True,
         type=str,
-        help="The starting URL for the web crawl",
+        help="The starting URL for the web crawl (required unless --resume is used)",
     )
     parser.add_argument(
         "-o",
@@ -30,6 +153,13 @@ def main():
         action="store_true",
         help="Combine all pages into a single Markdown file",
     )
+    parser.add_argument(
+        "-z",
+        "--compress",
+        choices=["gzip", "zstd"],
+        default=None,
+        help="Compress the combined Markdown file on the fly (requires --combine, without --stream)",
+    )
     parser.add_argument(
         "-md",
         "--max_depth",
@@ -44,6 +174,142 @@ def main():
         default=[],
         help="Optional list of domains the crawler is allowed to access",
     )
+    parser.add_argument(
+        "-in",
+        "--include",
+        nargs="*",
+        default=[],
+        help="Only crawl URLs starting with one of these prefixes or matching one of these globs",
+    )
+    parser.add_argument(
+        "-ex",
+        "--exclude",
+        nargs="*",
+        default=[],
+        help="Never crawl URLs starting with one of these prefixes or matching one of these globs",
+    )
+    parser.add_argument(
+        "-ts",
+        "--trailing_slash",
+        choices=UrlCanonicalizer.TRAILING_SLASH_MODES,
+        default="keep",
+        help="Keep, strip or add the trailing slash of URL paths when canonicalizing URLs",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of web pages fetched concurrently during the crawl",
+    )
+    parser.add_argument(
+        "-mw",
+        "--markdown_workers",
+        type=int,
+        default=1,
+        help="Number of processes converting pages to Markdown when saving",
+    )
+    parser.add_argument(
+        "-mph",
+        "--max_per_host",
+        type=int,
+        default=None,
+        help="Optional maximum number of concurrent requests per host",
+    )
+    parser.add_argument(
+        "-rl",
+        "--rate_limit",
+        type=float,
+        default=None,
+        help="Optional maximum number of requests per second per host",
+    )
+    parser.add_argument(
+        "-cd",
+        "--cache_dir",
+        type=str,
+        default=None,
+        help="Optional directory of a persistent HTTP cache, revalidated on later runs",
+    )
+    parser.add_argument(
+        "-cp",
+        "--checkpoint_dir",
+        type=str,
+        default=None,
+        help="Optional directory where the crawl progress is periodically checkpointed",
+    )
+    parser.add_argument(
+        "-r",
+        "--resume",
+        type=str,
+        default=None,
+        help="Resume the crawl checkpointed in the given directory",
+    )
+    parser.add_argument(
+        "-s",
+        "--stream",
+        action="store_true",
+        default=False,
+        help="Write Markdown files as pages are crawled, without keeping them in memory",
+    )
+    parser.add_argument(
+        "-vs",
+        "--visited",
+        choices=["hash", "bloom"],
+        default=None,
+        help="With --stream, deduplicate pages with a compact visited set instead of keeping every page in memory",
+    )
+    parser.add_argument(
+        "-gs",
+        "--graph_store",
+        choices=["networkx", "compact"],
+        default="networkx",
+        help="Storage engine of the crawled graph (compact keeps edges in arrays, for crawls with millions of links)",
+    )
+    parser.add_argument(
+        "-sg",
+        "--save_graph",
+        type=str,
+        default=None,
+        help="Save the crawled graph and its pages to a binary file, reopened with WebGraph.load",
+    )
+    parser.add_argument(
+        "-dd",
+        "--dedup",
+        choices=["exact", "near"],
+        default=None,
+        help="Merge pages with the same content (exact) or nearly the same text (near) as a page already crawled, "
+        "and write a dedup report",
+    )
+    parser.add_argument(
+        "-mt",
+        "--metrics",
+        type=str,
+        default=None,
+        help="Instrument every phase of the crawl, log a summary and export the metrics to this file "
+        "(Prometheus text format for .prom, JSON lines for .jsonl)",
+    )
+    parser.add_argument(
+        "-tr",
+        "--trace",
+        type=str,
+        default=None,
+        help="Record a timeline of the fetches, parses, conversions and writes of every worker, and save it to this "
+        "file in the Chrome trace-event format (opened with Perfetto or chrome://tracing)",
+    )
+    parser.add_argument(
+        "-l",
+        "--lean",
+        action="store_true",
+        default=False,
+        help="Discard parsed pages once their links are extracted, keeping only compressed HTML",
+    )
+    parser.add_argument(
+        "-p",
+        "--parser",
+        choices=["html.parser", "lxml", "selectolax"],
+        default="html.parser",
+        help="HTML parser backend (lxml and selectolax are faster but require optional packages)",
+    )
     parser.add_argument(
         "-v", "--verbose", type=str, default="info", help="Increase output verbosity"
     )
@@ -59,6 +325,29 @@ def main():
     # Parse arguments
     args = parser.parse_args()
 
+    if args.url is None and args.resume is None:
+        parser.error("the following arguments are required: -u/--url (or -r/--resume)")
+    if args.compress is not None and (not args.combine or args.stream):
+        parser.error("argument -z/--compress requires -c/--combine, and cannot be used with -s/--stream")
+    if args.visited is not None and not args.stream:
+        parser.error("argument -vs/--visited requires -s/--stream")
+    # Streamed pages are written as they are crawled, so the graph is never saved, visualized or converted afterwards
+    if args.stream:
+        for option, ignored in (
+            ("-sg/--save_graph", args.save_graph is not None),
+            ("-vis/--visualize", args.visualize),
+            ("-mw/--markdown_workers", args.markdown_workers != 1),
+        ):
+            if ignored:
+                parser.error(f"argument {option} cannot be used with -s/--stream")
+    if args.metrics is not None and metrics_format(args.metrics) is None:
+        parser.error(
+            f"argument -mt/--metrics: unsupported extension of {args.metrics} "
+            f"(expected one of {', '.join(METRICS_EXTENSIONS)})"
+        )
+    if args.visited is not None and args.graph_store != "networkx":
+        parser.error("argument -gs/--graph_store cannot be used with -vs/--visited, which keeps no graph")
+
     verbose = args.verbose or os.getenv("CRAWLER_DEBUG_VERBOSE", "info")
     verbose = verbose.upper()
 
@@ -69,42 +358,88 @@ def main():
 
     # Initialize WebCrawler with the specified list of allowed domains
     # If --allowed_domains is not used, this initializes with an empty list
-    crawler = WebCrawler(allowed_domains=args.allowed_domains)
-
-    # Assuming 'crawl' is a method you will implement in WebCrawler for starting the crawling process
-    # Note: You need to adjust this part as per your WebCrawler implementation details
-    crawled_data = crawler.crawl(args.url, max_depth=args.max_depth)
-
-    logging.info("Crawled graph: %s", str(crawled_data))
-
-    if args.visualize:
-        crawled_data.visualize()
-
-    user_input = input(
-        "Do you want to proceed to saving the crawled data as Markdown files? (y/N): "
+    # Keep at least one pooled connection per worker so that concurrent fetches reuse connections
+    disk_cache = DiskCache(args.cache_dir) if args.cache_dir else None
+    session = HttpSession(pool_maxsize=max(10, args.workers), disk_cache=disk_cache)
+    politeness = None
+    if args.max_per_host is not None or args.rate_limit is not None:
+        politeness = Politeness(
+            max_per_host=args.max_per_host or 2, requests_per_second=args.rate_limit
+        )
+    crawler = WebCrawler(
+        allowed_domains=args.allowed_domains,
+        session=session,
+        politeness=politeness,
+        lean=args.lean,
+        parser=args.parser,
+        include=args.include,
+        exclude=args.exclude,
+        canonicalizer=UrlCanonicalizer(trailing_slash=args.trailing_slash),
+        graph_store=args.graph_store,
+        dedup=args.dedup,
+        metrics=args.metrics is not None,
+        trace=args.trace is not None,
     )
 
-    if user_input.lower() == "y":
-        print("Continuing...")
-
-        # Assuming you have methods to save crawled data, which you will need to implement
-        if args.combine:
-            output_filename = "merged_output.md"
-            crawled_data.save_to_single_file(
-                directory=args.output_folder, filename=output_filename
-            )
-            logging.info(
-                "Saved crawled data to a single Markdown file %s", output_filename
+    if args.stream:
+        if args.resume:
+            records = crawler.iter_resume(
+                CrawlCheckpoint(args.resume, contents=False), workers=args.workers, visited=args.visited
             )
         else:
-            # Save to multiple Markdown files
-            crawled_data.save_to_multiple_files(directory=args.output_folder)
-            logging.info(
-                "Saved crawled data to multiple Markdown files in %s",
-                args.output_folder,
+            checkpoint = CrawlCheckpoint(args.checkpoint_dir, contents=False) if args.checkpoint_dir else None
+            records = crawler.iter_crawl(
+                args.url,
+                max_depth=args.max_depth,
+                workers=args.workers,
+                checkpoint=checkpoint,
+                visited=args.visited,
             )
+        count = stream_to_files(records, args.output_folder, args.combine, metrics=crawler.metrics)
+        logging.info("Streamed %d pages to %s", count, args.output_folder)
     else:
-        print("Stopping.")
+        crawl_and_save(crawler, args)
+
+    stats = crawler.canonicalization_stats()
+    logging.info(
+        "URL canonicalization: %d spellings of %d URLs, %d fetches avoided",
+        stats["spellings"],
+        stats["canonical_urls"],
+        stats["fetches_avoided"],
+    )
+
+    report = crawler.dedup_report()
+    if report is not None:
+        logging.info(
+            "Content deduplication: %d pages, %d unique, %d exact and %d near duplicates",
+            report["pages"],
+            report["unique_pages"],
+            report["exact_duplicates"],
+            report["near_duplicates"],
+        )
+        if not os.path.exists(args.output_folder):
+            os.makedirs(args.output_folder)
+        report_path = os.path.join(args.output_folder, "dedup_report.json")
+        with open(report_path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        logging.info("Saved the dedup report to %s", report_path)
+
+    if crawler.metrics is not None:
+        logging.info("%s", crawler.metrics.format_summary())
+        if args.metrics:
+            crawler.metrics.export(args.metrics)
+            logging.info("Saved the crawl metrics to %s", args.metrics)
+        if args.trace:
+            crawler.metrics.tracer.export(args.trace)
+            logging.info("Saved the crawl timeline (%s) to %s", str(crawler.metrics.tracer), args.trace)
+
+    if disk_cache is not None:
+        logging.info(
+            "HTTP disk cache: %d pages revalidated, %d bytes saved",
+            disk_cache.revalidated,
+            disk_cache.bytes_saved,
+        )
+    session.close()
 
 
 if __name__ == "__main__":
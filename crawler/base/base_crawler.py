@@ -1,5 +1,50 @@
-from collections import deque
+from functools import partial
 from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import timed
+from .visited_set import get_visited_set
+
+CrawledNode = namedtuple("CrawledNode", ["node", "depth", "parent", "links", "markdown"])
+CrawledNode.__doc__ = """A node yielded by `BaseCrawler.iter_crawl` as soon as it has been processed.
+
+Attributes
+----------
+node : BaseNode
+    The crawled node.
+depth : int
+    The depth of the node in the crawl.
+parent : BaseNode or None
+    The node through which this node was discovered, or None for a start node.
+links : list
+    The identifiers of the neighbors of the node (empty for nodes at the maximum depth, which are not expanded).
+markdown : str or None
+    The Markdown representation of the node, or None if it was not requested.
+"""
+
+
+class _DeferredVisit:
+    """A pending node visit that is only evaluated when its result is requested.
+
+    Used by the serial crawl path so that it exposes the same interface as the futures returned by a
+    thread pool, while still fetching each node exactly when it is popped from the frontier.
+
+    Parameters
+    ----------
+    function : callable
+        The function that processes the node.
+    node : BaseNode
+        The node to process.
+    """
+
+    def __init__(self, function, node):
+        self._function = function
+        self._node = node
+
+    def result(self):
+        """Processes the node and returns the result of the function."""
+        return self._function(self._node)
 
 
 class BaseCrawler(ABC):
@@ -17,13 +62,23 @@ class BaseCrawler(ABC):
         Starts a new crawling session from a given node.
     visit_node_neighborhood(node)
         Retrieves the neighborhood of a given node.
-    crawl(start_node_id, max_depth=1)
+    canonical_node(node)
+        Returns the node standing for the content of a visited node under its canonical identifier.
+    dedup_report()
+        Returns a summary of the duplicate contents found by the last crawl.
+    crawl(start_node_id, max_depth=1, workers=1, checkpoint=None)
         Performs the crawling process starting from a given node up to a specified depth.
+    resume(checkpoint, workers=1)
+        Continues a crawl from its last checkpoint.
+    iter_crawl(start_node_id, max_depth=1, workers=1, checkpoint=None, markdown=True, visited=None)
+        Crawls like `crawl`, yielding every node as soon as it has been processed.
     """
 
     def __init__(self):
         """Initializes the BaseCrawler instance."""
         super().__init__()
+        self.deduplicator = None
+        self.metrics = None
 
     @abstractmethod
     def get_node(self, node_id):
@@ -73,45 +128,421 @@ class BaseCrawler(ABC):
         """
         pass
 
-    def crawl(self, start_node_id, max_depth=1):
+    def canonical_node(self, node):
+        """Returns the node standing for the content of a visited node under its canonical identifier.
+
+        Called on every processed node before its neighbors are merged into the crawl subgraph. When the returned
+        node differs from `node` (e.g. `node` is a URL redirecting to another one), `node` is merged into it with
+        `BaseGraph.merge_alias`, and it is not yielded again if the canonical node was already part of the crawl.
+        By default every node is its own canonical node.
+
+        Parameters
+        ----------
+        node : BaseNode
+            The processed node.
+
+        Returns
+        -------
+        BaseNode
+            The canonical node, or `node` itself.
+        """
+        return node
+
+    def dedup_report(self):
+        """Returns a summary of the duplicate contents found by the last crawl (see `ContentDeduplicator.report`).
+
+        Returns
+        -------
+        dict or None
+            The report, or None if the crawler does not detect duplicate contents.
+        """
+        if self.deduplicator is None:
+            return None
+        return self.deduplicator.report()
+
+    def crawl(self, start_node_id, max_depth=1, workers=1, checkpoint=None):
         """Performs the crawling process using Breadth-First Search (BFS).
 
         Starting from a specified node, this method explores neighboring nodes up to a given depth, creating a
         subgraph of visited nodes.
 
+        When `workers` is greater than one, the neighborhoods of the nodes in the frontier are visited concurrently
+        by a thread pool. Results are still merged into the subgraph in BFS order, so the resulting graph (nodes,
+        depths, parents and edges) is identical to the one produced by the serial crawl.
+
         Parameters
         ----------
         start_node_id : str
             The identifier of the root node to start the crawling from.
         max_depth : int, optional
             The maximum depth to crawl. Default is 1.
+        workers : int, optional
+            The number of threads used to visit node neighborhoods concurrently. Default is 1 (serial crawl).
+        checkpoint : CrawlCheckpoint, optional
+            If given, the progress of the crawl is journaled to disk so that it can be continued with `resume`.
 
         Returns
         -------
         BaseGraph
             The subgraph created during the crawling process, containing nodes and edges explored.
         """
-        start_node = self.get_node(start_node_id)
+        crawl_subgraph = self.start_new_crawling_session(start_node_id)
+        # The root held by the graph is expanded, so that the graph keeps its fetched content
+        start_node = crawl_subgraph.all_nodes()[0]
+        if checkpoint is not None:
+            checkpoint.begin([start_node], max_depth)
+        return self.expand_frontier(
+            crawl_subgraph, [start_node], max_depth=max_depth, workers=workers, checkpoint=checkpoint
+        )
 
-        visiting_nodes = deque()
-        visiting_nodes.append((start_node, 0))
+    def restore_crawling_session(self, root_ids):
+        """Starts the crawling session of a crawl restored from a checkpoint.
 
-        crawl_subgraph = self.start_new_crawling_session(start_node_id)
+        Subclasses whose sessions depend on all the roots of the crawl should override this method.
 
-        while len(visiting_nodes) > 0:
-            current_node, current_depth = visiting_nodes.popleft()
-            new_depth = current_depth + 1
+        Parameters
+        ----------
+        root_ids : list of str
+            The identifiers of the nodes the crawl started from.
 
-            if new_depth > max_depth:
+        Returns
+        -------
+        BaseGraph
+            A new graph object representing the crawling session, containing the root nodes.
+        """
+        crawl_subgraph = self.start_new_crawling_session(root_ids[0])
+        for root_id in root_ids[1:]:
+            crawl_subgraph.add_node(self.get_node(root_id))
+        return crawl_subgraph
+
+    def resume(self, checkpoint, workers=1):
+        """Continues a crawl from its last checkpoint.
+
+        The subgraph (nodes, depths, parents and edges) is rebuilt from the checkpoint without visiting any node,
+        and the BFS continues from the nodes that were not expanded yet, producing the same graph as an
+        uninterrupted crawl.
+
+        Parameters
+        ----------
+        checkpoint : CrawlCheckpoint
+            The checkpoint of the crawl to continue.
+        workers : int, optional
+            The number of threads used to visit node neighborhoods concurrently. Default is 1 (serial crawl).
+
+        Returns
+        -------
+        BaseGraph
+            The subgraph created during the crawling process, containing nodes and edges explored.
+        """
+        crawl_subgraph, frontier, max_depth = self._restore(checkpoint)
+        return self.expand_frontier(
+            crawl_subgraph, frontier, max_depth=max_depth, workers=workers, checkpoint=checkpoint
+        )
+
+    def _restore(self, checkpoint):
+        # Folding the journal first also drops a partially written last line left by a crash
+        checkpoint.compact()
+        state = checkpoint.load()
+        if state.sessions:
+            raise ValueError(f"{checkpoint.directory} holds the sessions of a crawl from several roots (see resume)")
+
+        crawl_subgraph = self.restore_crawling_session(state.roots)
+        for node_id, (depth, parent_id) in state.nodes.items():
+            if node_id in state.roots:
                 continue
+            node = self.get_node(node_id)
+            node.depth = depth
+            node.parent = crawl_subgraph.get_node(parent_id)
+            crawl_subgraph.add_node(node)
+
+        for (u_id, v_id), depth in state.edges.items():
+            crawl_subgraph.add_edge(
+                crawl_subgraph.get_node(u_id), crawl_subgraph.get_node(v_id), depth=depth
+            )
+        crawl_subgraph.aliases.update(state.aliases)
 
-            for child_node in self.visit_node_neighborhood(current_node):
-                if child_node not in crawl_subgraph:
-                    child_node.depth = new_depth
-                    child_node.parent = current_node
-                    crawl_subgraph.add_node(child_node)
-                    visiting_nodes.append((child_node, new_depth))
+        if checkpoint.contents:
+            contents = {state.resolve(node_id): content for node_id, content in checkpoint.load_contents().items()}
+            for node in crawl_subgraph.all_nodes():
+                if node.id in contents:
+                    node.load_content(contents[node.id])
 
-                crawl_subgraph.add_edge(current_node, child_node, depth=new_depth)
+        frontier = [crawl_subgraph.get_node(node_id) for node_id in state.frontier()]
+        return crawl_subgraph, frontier, state.max_depth
 
+    def iter_crawl(
+        self, start_node_id, max_depth=1, workers=1, checkpoint=None, markdown=True, visited=None
+    ):
+        """Performs the same BFS crawl as `crawl`, yielding every node as soon as it has been processed.
+
+        Nodes are yielded in BFS order, each one together with its depth, parent, links and (optionally) its
+        Markdown representation, so that results can be written while the crawl is still running. Once the consumer
+        asks for the next node, the content of the previous one is released (see `BaseNode.release`), which keeps
+        memory flat on large crawls. With several workers, the Markdown conversion also runs in the worker threads.
+
+        For very large crawls, a compact visited set can deduplicate the nodes instead of the crawl subgraph: every
+        yielded node is then discarded from the subgraph, so memory only grows by the few bytes per URL of the set,
+        and no edges are kept (the links of every node are part of its record).
+
+        Parameters
+        ----------
+        start_node_id : str
+            The identifier of the root node to start the crawling from.
+        max_depth : int, optional
+            The maximum depth to crawl. Default is 1.
+        workers : int, optional
+            The number of threads used to process nodes concurrently. Default is 1 (serial crawl).
+        checkpoint : CrawlCheckpoint, optional
+            If given, the progress of the crawl is journaled to disk. A node is only marked as processed once the
+            consumer asks for the next one.
+        markdown : bool, optional
+            If True, the Markdown representation of every node is computed and yielded. Default is True.
+        visited : str or VisitedSet, optional
+            The visited set deduplicating the nodes, or its name ("hash" for an exact set of 64-bit hashes, "bloom"
+            for a Bloom filter with a 0.1% false positive rate, see `get_visited_set`). Default is None (nodes are
+            deduplicated against the crawl subgraph, and kept in it).
+
+        Yields
+        ------
+        CrawledNode
+            The processed node, with its depth, parent, links and Markdown representation.
+        """
+        crawl_subgraph = self.start_new_crawling_session(start_node_id)
+        # The root held by the graph is expanded, so that the graph keeps its fetched content
+        start_node = crawl_subgraph.all_nodes()[0]
+        visited = get_visited_set(visited)
+        if visited is not None:
+            crawl_subgraph.track_visited(visited)
+        if checkpoint is not None:
+            checkpoint.begin([start_node], max_depth)
+        yield from self._iter_records(
+            crawl_subgraph, [start_node], max_depth, workers, checkpoint, markdown
+        )
+
+    def iter_resume(self, checkpoint, workers=1, markdown=True, visited=None):
+        """Continues a checkpointed crawl like `resume`, yielding the remaining nodes like `iter_crawl`.
+
+        Parameters
+        ----------
+        checkpoint : CrawlCheckpoint
+            The checkpoint of the crawl to continue.
+        workers : int, optional
+            The number of threads used to process nodes concurrently. Default is 1 (serial crawl).
+        markdown : bool, optional
+            If True, the Markdown representation of every node is computed and yielded. Default is True.
+        visited : str or VisitedSet, optional
+            The visited set deduplicating the nodes, or its name, as in `iter_crawl`. Default is None.
+
+        Yields
+        ------
+        CrawledNode
+            The processed node, with its depth, parent, links and Markdown representation.
+        """
+        crawl_subgraph, frontier, max_depth = self._restore(checkpoint)
+        visited = get_visited_set(visited)
+        if visited is not None:
+            crawl_subgraph.track_visited(visited)
+            frontier_ids = {node.id for node in frontier}
+            for node in crawl_subgraph.all_nodes():
+                if node.id not in frontier_ids:
+                    crawl_subgraph.discard(node)
+        yield from self._iter_records(crawl_subgraph, frontier, max_depth, workers, checkpoint, markdown)
+
+    def _iter_records(self, crawl_subgraph, start_nodes, max_depth, workers, checkpoint, markdown):
+        for node, links, markdown_text in self._iter_frontier(
+            crawl_subgraph, start_nodes, max_depth, workers, checkpoint, markdown
+        ):
+            yield CrawledNode(
+                node, node.depth, node.parent, [link.id for link in links], markdown_text
+            )
+            node.release()
+            if crawl_subgraph.visited is not None:
+                crawl_subgraph.discard(node)
+
+    def expand_frontier(self, crawl_subgraph, start_nodes, max_depth=1, workers=1, checkpoint=None, executor=None):
+        """Expands a crawl subgraph with BFS, starting from the given frontier nodes at their current depth.
+
+        Neighborhood visits are submitted to the executor as soon as a node is discovered, but their results are
+        consumed in FIFO order. This keeps the depth/parent assignment and the deduplication against
+        `crawl_subgraph` identical to the serial BFS, while letting the fetches of the whole frontier overlap.
+
+        Parameters
+        ----------
+        crawl_subgraph : BaseGraph
+            The subgraph of the current crawling session. It is updated in place.
+        start_nodes : list of BaseNode
+            The nodes the crawl starts from, in BFS order. They are expected to already be part of `crawl_subgraph`.
+        max_depth : int, optional
+            The maximum depth to crawl. Default is 1.
+        workers : int, optional
+            The number of threads used to visit node neighborhoods concurrently. Default is 1 (serial crawl).
+        checkpoint : CrawlCheckpoint, optional
+            If given, every discovered node, edge and expanded node is journaled to the checkpoint.
+        executor : concurrent.futures.Executor, optional
+            An executor shared with other crawls (see `create_executor`), used instead of creating one, and left
+            running once the frontier is expanded. Default is None.
+
+        Returns
+        -------
+        BaseGraph
+            The expanded crawl subgraph.
+        """
+        for _ in self._iter_frontier(crawl_subgraph, start_nodes, max_depth, workers, checkpoint, executor=executor):
+            pass
         return crawl_subgraph
+
+    def _iter_frontier(
+        self, crawl_subgraph, start_nodes, max_depth, workers, checkpoint, markdown=False, executor=None
+    ):
+        """The BFS loop shared by all crawl methods.
+
+        Yields `(node, neighbors, markdown)` for every node popped from the frontier, after its neighbors have been
+        merged into `crawl_subgraph`. Nodes at the maximum depth are yielded without neighbors.
+
+        If the crawler has metrics, the length of the frontier is sampled as the `frontier` gauge, the time spent
+        waiting for the visit of the next node as the `wait` phase, and crawled and merged nodes are counted.
+        """
+        shared_executor = executor is not None
+        if not shared_executor:
+            executor = self.create_executor(workers)
+        metrics = self.metrics
+
+        def schedule(node, depth):
+            expand = depth < max_depth
+            # Leaves are only fetched to be converted, or fingerprinted so that duplicates are written once
+            if not expand and not markdown and self.deduplicator is None:
+                return None
+            function = partial(self._process_node, expand=expand, markdown=markdown)
+            if executor is None:
+                return _DeferredVisit(function, node)
+            return self.submit_visit(executor, node, function)
+
+        try:
+            visiting_nodes = deque()
+            for start_node in start_nodes:
+                visiting_nodes.append((start_node, start_node.depth, schedule(start_node, start_node.depth)))
+
+            while len(visiting_nodes) > 0:
+                current_node, current_depth, pending_visit = visiting_nodes.popleft()
+                new_depth = current_depth + 1
+                if metrics is not None:
+                    metrics.gauge("frontier", len(visiting_nodes) + 1)
+                with timed(metrics, "wait", current_node.id):
+                    neighbors, markdown_text, fingerprint = (
+                        ([], None, None) if pending_visit is None else pending_visit.result()
+                    )
+
+                duplicate = False
+                canonical_node = self.canonical_node(current_node)
+                if canonical_node is not current_node:
+                    duplicate = canonical_node in crawl_subgraph
+                    alias_node = current_node
+                    current_node = crawl_subgraph.merge_alias(alias_node, canonical_node)
+                    if checkpoint is not None:
+                        checkpoint.record_alias(alias_node, current_node)
+                    if metrics is not None:
+                        metrics.count("aliases_merged")
+
+                # A node with the content of a node submitted earlier is merged into it, and neither expanded nor
+                # yielded. Nodes are submitted in crawl order, so the first node with a content is always kept.
+                if not duplicate and fingerprint is not None:
+                    original_id = self.deduplicator.submit(current_node.id, fingerprint)
+                    if original_id is not None:
+                        duplicate_node = current_node
+                        current_node = crawl_subgraph.merge_alias(duplicate_node, self.get_node(original_id))
+                        if checkpoint is not None:
+                            checkpoint.record_alias(duplicate_node, current_node)
+                        if metrics is not None:
+                            metrics.count("duplicates_merged")
+                        continue
+
+                for child_node in neighbors:
+                    if child_node not in crawl_subgraph:
+                        child_node.depth = new_depth
+                        child_node.parent = current_node
+                        crawl_subgraph.add_node(child_node)
+                        if checkpoint is not None:
+                            checkpoint.record_node(child_node)
+                        visiting_nodes.append((child_node, new_depth, schedule(child_node, new_depth)))
+
+                    crawl_subgraph.add_edge(current_node, child_node, depth=new_depth)
+                    if checkpoint is not None:
+                        checkpoint.record_edge(current_node, child_node, new_depth)
+
+                # The content of a duplicate is the one of a node already part of the crawl, yielded on its own
+                if duplicate:
+                    continue
+
+                if metrics is not None:
+                    metrics.count("pages_crawled")
+                yield current_node, neighbors, markdown_text
+
+                if checkpoint is not None:
+                    checkpoint.record_expanded(current_node)
+
+            if checkpoint is not None:
+                checkpoint.finish()
+        finally:
+            if executor is not None and not shared_executor:
+                self.shutdown_executor(executor)
+            if checkpoint is not None:
+                checkpoint.close()
+
+    def _process_node(self, node, expand, markdown):
+        neighbors = self.visit_node_neighborhood(node) if expand else []
+        markdown_text = node.to_markdown() if markdown else None
+        fingerprint = None
+        if self.deduplicator is not None:
+            fingerprint = node.content_fingerprint(text=self.deduplicator.near_duplicates)
+        return neighbors, markdown_text, fingerprint
+
+    def create_executor(self, workers):
+        """Creates the executor used to visit node neighborhoods concurrently.
+
+        Subclasses may override this method to plug in a different scheduling policy. The returned object must
+        provide the `submit` and `shutdown` methods of `concurrent.futures.Executor`.
+
+        Parameters
+        ----------
+        workers : int
+            The number of concurrent workers requested for the crawl.
+
+        Returns
+        -------
+        concurrent.futures.Executor or None
+            The executor to use, or None to visit neighborhoods serially on the calling thread.
+        """
+        if workers <= 1:
+            return None
+        return ThreadPoolExecutor(max_workers=workers)
+
+    def shutdown_executor(self, executor):
+        """Stops the executor created by `create_executor` at the end of a crawl, cancelling the visits not started.
+
+        Subclasses releasing resources tied to the executor should override this method.
+
+        Parameters
+        ----------
+        executor : concurrent.futures.Executor
+            The executor returned by `create_executor`.
+        """
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit_visit(self, executor, node, function):
+        """Submits the processing of a node (the visit of its neighborhood) to the executor.
+
+        Parameters
+        ----------
+        executor : concurrent.futures.Executor
+            The executor returned by `create_executor`.
+        node : BaseNode
+            The node to process.
+        function : callable
+            The function processing the node, called with the node as its only argument.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            A future resolving to the result of `function`.
+        """
+        return executor.submit(function, node)
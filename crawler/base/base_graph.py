@@ -1,6 +1,12 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import networkx as nx
 import matplotlib.pyplot as plt
 
+from .graph_store import get_graph_store
+
 # Assuming save_content_to_multiple_files and save_content_to_single_file
 # are defined elsewhere
 from ..utils.file_utils import (
@@ -15,10 +21,26 @@ class BaseGraph:
     This class encapsulates a directed graph and provides methods for node and edge manipulation,
     visualization, and exporting the graph data.
 
+    Nodes and edges are held by a storage engine: a NetworkX directed graph by default, or the array-backed
+    `CompactStore` for crawls with millions of edges (see `crawler.base.graph_store`).
+
+    Parameters
+    ----------
+    store : {None, "networkx", "compact"}, optional
+        The storage engine of the graph. Default is None ("networkx").
+
     Attributes
     ----------
     graph : nx.DiGraph
-        A directed graph instance from NetworkX where nodes and edges can be added or manipulated.
+        A directed graph instance from NetworkX where nodes and edges can be added or manipulated. With the compact
+        store, it is a copy exported on access (see `to_networkx`).
+    store : NetworkxStore or CompactStore
+        The storage engine of the nodes and edges.
+    aliases : dict
+        Maps the identifier of every node merged into another one (see `merge_alias`) to the identifier of the node
+        it was merged into.
+    visited : VisitedSet or None
+        The compact set of node identifiers answering membership queries, if one is tracked (see `track_visited`).
 
     Methods
     -------
@@ -27,22 +49,64 @@ class BaseGraph:
     add_edge(u, v, **attributes)
         Adds an edge between two nodes in the graph, with optional attributes.
     get_node(node_id)
-        Retrieves a node from the graph by its identifier.
+        Retrieves a node from the graph by its identifier, or by the identifier of one of its aliases.
+    resolve(node_id)
+        Returns the identifier of the node a possibly aliased identifier stands for.
+    merge_alias(alias, canonical)
+        Merges a node into the node of its canonical identifier, rewriting its edges.
+    track_visited(visited)
+        Answers membership queries with a compact visited set, so that nodes can be discarded from the graph.
+    discard(node)
+        Removes a node and its edges from the graph, while keeping it in the visited set.
     all_nodes()
         Returns a list of all nodes in the graph.
+    update(other)
+        Adds the nodes and edges of another graph to the graph.
+    to_networkx()
+        Returns the graph as a NetworkX directed graph.
     visualize()
         Visualizes the graph using matplotlib.
-    to_markdown()
+    iter_markdown(release=False, workers=1, chunksize=8)
+        Yields the URL and markdown representation of every graph node, one node at a time.
+    to_markdown(workers=1)
         Converts all graph nodes to a markdown text dictionary.
-    save_to_multiple_files(directory="output")
+    save_to_multiple_files(directory="output", workers=1)
         Saves the graph nodes' markdown representations to multiple files in the specified directory.
-    save_to_single_file(directory="output", filename="combined_output.md")
+    save_to_single_file(directory="output", filename="combined_output.md", compression=None, workers=1)
         Combines the markdown representations of all graph nodes and saves them to a single file.
     """
 
-    def __init__(self):
-        """Initializes a new instance of BaseGraph."""
-        self.graph = nx.DiGraph()
+    def __init__(self, store=None):
+        """Initializes a new instance of BaseGraph.
+
+        Parameters
+        ----------
+        store : {None, "networkx", "compact"}, optional
+            The storage engine of the graph. Default is None ("networkx").
+        """
+        self.store = get_graph_store(store)
+        self.aliases = {}
+        self.visited = None
+
+    @property
+    def graph(self):
+        """The graph as a NetworkX directed graph (see `to_networkx`)."""
+        return self.store.to_networkx()
+
+    def to_networkx(self):
+        """Returns the graph as a NetworkX directed graph, each node holding its node object as `node` attribute.
+
+        With the default store, this is the live graph. With the compact store, it is a copy, built on each call.
+
+        Returns
+        -------
+        nx.DiGraph
+            The directed graph.
+        """
+        return self.store.to_networkx()
+
+    def __len__(self):
+        return len(self.store)
 
     def add_node(self, node):
         """Adds a node to the graph.
@@ -52,7 +116,9 @@ class BaseGraph:
         node : BaseNode
             The node to be added to the graph. The node must have a unique identifier.
         """
-        self.graph.add_node(node.id, node=node)
+        self.store.add_node(node)
+        if self.visited is not None:
+            self.visited.add(node.id)
 
     def add_edge(self, u, v, **attributes):
         """Adds an edge between two nodes in the graph, with optional attributes.
@@ -66,9 +132,15 @@ class BaseGraph:
         **attributes
             Arbitrary keyword arguments representing additional attributes of the edge.
         """
-        if u.id == v.id:
+        u_id, v_id = self.resolve(u.id), self.resolve(v.id)
+        if u_id == v_id:
+            return
+        # Edges of discarded nodes are dropped, instead of implicitly adding the nodes again
+        if self.visited is not None and (
+            not self.store.has_node(u_id) or not self.store.has_node(v_id)
+        ):
             return
-        self.graph.add_edge(u.id, v.id, **attributes)
+        self.store.add_edge(u_id, v_id, attributes)
 
     def get_node(self, node_id):
         """Retrieves a node from the graph by its identifier.
@@ -76,14 +148,72 @@ class BaseGraph:
         Parameters
         ----------
         node_id : Any
-            The unique identifier of the node to retrieve.
+            The unique identifier of the node to retrieve, or of one of its aliases.
 
         Returns
         -------
         BaseNode
             The node associated with the given identifier.
         """
-        return self.graph.nodes[node_id]["node"]
+        return self.store.get(self.resolve(node_id))
+
+    def resolve(self, node_id):
+        """Returns the identifier of the node a possibly aliased identifier stands for.
+
+        Parameters
+        ----------
+        node_id : Any
+            A node identifier.
+
+        Returns
+        -------
+        Any
+            The identifier of the node `node_id` was merged into, or `node_id` itself if it is not an alias.
+        """
+        # Aliases may chain, when a node that already had aliases is itself merged into another one
+        while node_id in self.aliases:
+            node_id = self.aliases[node_id]
+        return node_id
+
+    def merge_alias(self, alias, canonical):
+        """Merges a node into the node of its canonical identifier, e.g. a redirecting URL into its target.
+
+        If the canonical node is not in the graph yet, it takes the place of the alias, with its depth and parent.
+        Otherwise the alias is dropped in favor of the existing node. In both cases the edges of the alias are
+        rewritten to the canonical node, and later references to the alias (`in`, `get_node`, `add_edge`) resolve
+        to the canonical node.
+
+        Parameters
+        ----------
+        alias : BaseNode
+            The node to merge, part of the graph.
+        canonical : BaseNode
+            The node standing for the same content under its canonical identifier.
+
+        Returns
+        -------
+        BaseNode
+            The node of the graph holding the canonical identifier.
+        """
+        canonical_id = self.resolve(canonical.id)
+        if alias.id == canonical_id:
+            return self.get_node(canonical_id)
+
+        if self.store.has_node(canonical_id):
+            canonical = self.get_node(canonical_id)
+        elif self.visited is not None and canonical_id in self.visited:
+            # The canonical node was already visited and discarded
+            self.discard(alias)
+            self.aliases[alias.id] = canonical_id
+            return canonical
+        else:
+            canonical.depth = alias.depth
+            canonical.parent = alias.parent
+            self.add_node(canonical)
+
+        self.store.merge(alias.id, canonical_id)
+        self.aliases[alias.id] = canonical_id
+        return canonical
 
     def all_nodes(self):
         """Returns a list of all nodes in the graph.
@@ -93,7 +223,21 @@ class BaseGraph:
         list of BaseNode
             A list containing all nodes in the graph.
         """
-        return [node["node"] for node in self.graph.nodes.values()]
+        return self.store.nodes()
+
+    def update(self, other):
+        """Adds the nodes, edges and aliases of another graph to the graph.
+
+        Parameters
+        ----------
+        other : BaseGraph
+            The graph to merge into this one. Nodes present in both graphs are replaced by those of `other`.
+        """
+        for node in other.all_nodes():
+            self.add_node(node)
+        for u_id, v_id, attributes in other.store.edges():
+            self.store.add_edge(self.resolve(u_id), self.resolve(v_id), attributes)
+        self.aliases.update(other.aliases)
 
     def __contains__(self, node):
         """Checks if a node is in the graph.
@@ -106,9 +250,39 @@ class BaseGraph:
         Returns
         -------
         bool
-            True if the node is in the graph, False otherwise.
+            True if the node, or the node it is an alias of, is in the graph, False otherwise.
+        """
+        if self.visited is not None:
+            return node.id in self.visited or node.id in self.aliases
+        return self.store.has_node(node.id) or node.id in self.aliases
+
+    def track_visited(self, visited):
+        """Answers membership queries (`in`) with a compact visited set instead of the graph itself.
+
+        The nodes of the graph are added to the set, as well as every node added later. Nodes can then be removed
+        from the graph with `discard` once they are no longer needed (e.g. once a streaming crawl has yielded
+        them), and are still reported as part of the graph, so that they are never crawled again. The memory of the
+        crawl then grows by a few bytes per discovered node instead of a node object and a graph entry.
+
+        Parameters
+        ----------
+        visited : VisitedSet
+            The visited set. With a probabilistic set (e.g. `BloomFilter`), a node never added may be reported as
+            part of the graph, with a probability bounded by the error rate of the set.
+        """
+        self.visited = visited
+        for node in self.store.nodes():
+            visited.add(node.id)
+
+    def discard(self, node):
+        """Removes a node and its edges from the graph, while keeping it in the visited set.
+
+        Parameters
+        ----------
+        node : BaseNode
+            The node to remove.
         """
-        return node.id in self.graph.nodes
+        self.store.remove_node(node.id)
 
     def visualize(self):
         """Visualizes the graph using matplotlib.
@@ -124,12 +298,14 @@ class BaseGraph:
         plt.subplots_adjust(left=0.1, right=0.75)
         ax_graph = plt.subplot(121)
 
+        graph = self.to_networkx()
+
         # Choose a layout algorithm (e.g., Kamada-Kawai for better aesthetics)
-        pos = nx.kamada_kawai_layout(self.graph)  # positions for all nodes
+        pos = nx.kamada_kawai_layout(graph)  # positions for all nodes
 
         # Draw the graph with customization
         nx.draw_networkx_nodes(
-            self.graph,
+            graph,
             pos,
             node_size=500,  # Larger nodes
             node_color="lightblue",  # Light blue nodes
@@ -141,7 +317,7 @@ class BaseGraph:
         )
 
         nx.draw_networkx_edges(
-            self.graph,
+            graph,
             pos,
             width=2,  # Thicker edges
             edge_color="gray",  # Gray edges
@@ -152,7 +328,7 @@ class BaseGraph:
         )
 
         nx.draw_networkx_labels(
-            self.graph,
+            graph,
             pos,
             font_size=10,  # Larger font size
             font_color="black",  # Black font
@@ -182,43 +358,147 @@ class BaseGraph:
 
         plt.show()
 
-    def to_markdown(self):
+    def iter_markdown(self, release=False, workers=1, chunksize=8, metrics=None):
+        """Yields the URL and markdown representation of every graph node, one node at a time.
+
+        With several workers, nodes are converted in a process pool: each node provides a picklable task (see
+        `BaseNode.markdown_task`) carrying its raw content, tasks are sent to the workers in chunks, and results are
+        yielded in node order, exactly as in the serial case. Nodes are converted in batches so that only a bounded
+        number of contents is in flight at a time.
+
+        Parameters
+        ----------
+        release : bool, optional
+            If True, the content of each node is released (see `BaseNode.release`) once it has been converted, so
+            that only one parsed node is held in memory at a time. Default is False.
+        workers : int, optional
+            The number of worker processes converting nodes. Default is 1 (conversion in the calling process).
+        chunksize : int, optional
+            The number of nodes sent to a worker process at once. Default is 8.
+        metrics : CrawlMetrics, optional
+            If given, conversions in worker processes are timed by the workers and reported as the `markdown`
+            phase (and traced on the track of their process). Serial conversions are timed by the nodes themselves,
+            if they are instrumented. Default is None.
+
+        Yields
+        ------
+        tuple of (str, str)
+            The URL of the node and its markdown representation.
+        """
+        nodes = self.all_nodes()
+        if workers <= 1:
+            for node in nodes:
+                markdown_text = node.to_markdown()
+                if release:
+                    node.release()
+                yield node.url, markdown_text
+            return
+
+        batch_size = workers * chunksize * 4
+        run_task = _run_markdown_task if metrics is None else _run_timed_markdown_task
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(nodes), batch_size):
+                batch = nodes[start:start + batch_size]
+                tasks = [node.markdown_task() for node in batch]
+                results = executor.map(run_task, [task for task in tasks if task is not None], chunksize=chunksize)
+                for node, task in zip(batch, tasks):
+                    if task is None:
+                        markdown_text = node.to_markdown()
+                    elif metrics is None:
+                        markdown_text = next(results)
+                    else:
+                        started_at, ended_at, pid, markdown_text = next(results)
+                        metrics.observe("markdown", (ended_at - started_at) * 1e-9)
+                        if metrics.tracer is not None:
+                            metrics.tracer.record("markdown", started_at, ended_at, node.url, pid=pid)
+                    if release:
+                        node.release()
+                    yield node.url, markdown_text
+
+    def to_markdown(self, workers=1, metrics=None):
         """Converts all graph nodes to a markdown text dictionary.
 
+        Parameters
+        ----------
+        workers : int, optional
+            The number of worker processes converting nodes. Default is 1.
+        metrics : CrawlMetrics, optional
+            The metrics conversions in worker processes are reported to (see `iter_markdown`). Default is None.
+
         Returns
         -------
         dict
             A dictionary where keys are URLs (assuming each node has a URL attribute) and values are the markdown
             representation of nodes.
         """
-        url_text_dict = {}
-        for node in self.all_nodes():
-            url_text_dict[node.url] = (
-                node.to_markdown()
-            )  # Assuming each node has a 'to_markdown' method
-        return url_text_dict
+        return dict(self.iter_markdown(workers=workers, metrics=metrics))
 
-    def save_to_multiple_files(self, directory="output"):
+    def save_to_multiple_files(self, directory="output", workers=1, metrics=None):
         """Saves the graph nodes' markdown representations to multiple files in the specified
         directory.
 
+        Nodes are converted one at a time and their files are written concurrently, as soon as they are converted.
+
         Parameters
         ----------
         directory : str, optional
             The directory where the files will be saved. Default is "output".
+        workers : int, optional
+            The number of worker processes converting nodes. Default is 1.
+        metrics : CrawlMetrics, optional
+            If given, conversions and writes are reported to these metrics. Default is None.
+
+        Returns
+        -------
+        dict
+            The statistics of the writes (see `BulkWriter.stats`).
         """
-        url_text_dict = self.to_markdown()
-        save_content_to_multiple_files(url_text_dict, directory)
+        return save_content_to_multiple_files(
+            self.iter_markdown(release=True, workers=workers, metrics=metrics), directory, metrics=metrics
+        )
 
-    def save_to_single_file(self, directory="output", filename="combined_output.md"):
+    def save_to_single_file(
+        self, directory="output", filename="combined_output.md", compression=None, workers=1, metrics=None
+    ):
         """Combines the markdown representations of all graph nodes and saves them to a single file.
 
+        Nodes are converted and written one at a time, so the markdown of the whole graph is never held in memory.
+
         Parameters
         ----------
         directory : str, optional
             The directory where the output file will be saved. Default is "output".
         filename : str, optional
             The name of the output file. Default is "combined_output.md".
+        compression : {None, "gzip", "zstd"}, optional
+            If given, the output file is compressed on the fly. Default is None.
+        workers : int, optional
+            The number of worker processes converting nodes. Default is 1.
+        metrics : CrawlMetrics, optional
+            If given, conversions and writes are reported to these metrics. Default is None.
+
+        Returns
+        -------
+        str
+            The path of the saved file.
         """
-        url_text_dict = self.to_markdown()
-        save_content_to_single_file(url_text_dict, directory, filename)
+        return save_content_to_single_file(
+            self.iter_markdown(release=True, workers=workers, metrics=metrics),
+            directory,
+            filename,
+            compression=compression,
+            metrics=metrics,
+        )
+
+
+def _run_markdown_task(task):
+    function, args = task
+    return function(*args)
+
+
+def _run_timed_markdown_task(task):
+    # Timed in the worker process, so that the duration excludes the transfer of the task and of its result. The
+    # monotonic clock is system-wide, so the span can be placed on the timeline of the parent process.
+    start = time.perf_counter_ns()
+    markdown_text = _run_markdown_task(task)
+    return start, time.perf_counter_ns(), os.getpid(), markdown_text
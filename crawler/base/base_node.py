@@ -23,12 +23,22 @@ class BaseNode(ABC):
     -------
     to_markdown()
         Abstract method that should be implemented to convert the node's content to Markdown format.
+    markdown_task()
+        Returns a picklable task computing the node's Markdown in another process, if the node supports it.
+    release()
+        Releases the memory held by the node's content, if any.
+    dump_content()
+        Returns the content held by the node, to be saved with a crawl checkpoint.
+    load_content(content)
+        Restores the content saved from the node by `dump_content`.
     __hash__()
         Computes the hash based on the node's identifier.
     __eq__(other)
         Checks equality with another node based on identifiers.
     """
 
+    __slots__ = ("_node_id", "_depth", "_parent")
+
     def __init__(self, node_id):
         """Initializes the BaseNode instance with the provided identifier.
 
@@ -105,6 +115,65 @@ class BaseNode(ABC):
         """
         pass
 
+    def markdown_task(self):
+        """Returns a picklable task computing the node's Markdown in another process.
+
+        Used by `BaseGraph` to convert nodes in a process pool. The task must only carry raw data (e.g. the encoded
+        content of the node), not the node itself. By default nodes have no such task and are converted in the
+        calling process with `to_markdown`.
+
+        Returns
+        -------
+        tuple of (callable, tuple) or None
+            A module-level function and its arguments, or None if the node must be converted in this process.
+        """
+        return None
+
+    def content_fingerprint(self, text=False):
+        """Fingerprints the node's content, to detect nodes holding the same content (see `ContentDeduplicator`).
+
+        Parameters
+        ----------
+        text : bool, optional
+            If True, the fingerprint also holds a SimHash of the text of the content, to detect near duplicates.
+            Default is False.
+
+        Returns
+        -------
+        ContentFingerprint or None
+            The fingerprint, or None if the node has no content to compare. By default nodes are never duplicates.
+        """
+        return None
+
+    def release(self):
+        """Releases the memory held by the node's content.
+
+        Called once a streamed node has been consumed. Subclasses holding large contents should override this
+        method; the content must still be retrievable (e.g. recomputed) if it is accessed again.
+        """
+        pass
+
+    def dump_content(self):
+        """Returns the content held by the node, to be saved with a crawl checkpoint so that a resumed crawl does not
+        retrieve it again. It must never retrieve the content itself.
+
+        Returns
+        -------
+        bytes or None
+            The serialized content, or None if the node holds no content. By default nodes have no content to save.
+        """
+        return None
+
+    def load_content(self, content):
+        """Restores the content saved from the node by `dump_content`.
+
+        Parameters
+        ----------
+        content : bytes-like
+            The serialized content.
+        """
+        pass
+
     def __hash__(self):
         """Computes the hash of the node based on its unique identifier.
 
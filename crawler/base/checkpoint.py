@@ -0,0 +1,427 @@
+import os
+import json
+import struct
+
+# Header of every record of the contents file: the lengths of the JSON-encoded node identifier and of the content
+_CONTENT_HEADER = struct.Struct("<II")
+
+
+class CrawlState:
+    """The state of a crawl, as restored from a checkpoint.
+
+    Attributes
+    ----------
+    roots : list
+        The identifiers of the nodes the crawl started from.
+    max_depth : int
+        The maximum depth of the crawl.
+    nodes : dict
+        Maps the identifier of every discovered node to its `(depth, parent_id)`, in discovery order.
+    edges : dict
+        Maps every `(u_id, v_id)` edge to its depth attribute.
+    expanded : set
+        The identifiers of the nodes whose neighborhood has already been visited.
+    aliases : dict
+        Maps the identifier of every node merged into another one to the identifier of that node.
+    sessions : bool
+        True if every root was crawled in its own session, checkpointed in its own subdirectory (see
+        `CrawlCheckpoint.session`), the state only holding the roots.
+    complete : bool
+        True if the crawl ran to completion.
+    """
+
+    def __init__(self):
+        self.roots = []
+        self.max_depth = 0
+        self.sessions = False
+        self.nodes = {}
+        self.edges = {}
+        self.expanded = set()
+        self.aliases = {}
+        self.complete = False
+
+    def apply(self, event):
+        """Applies one journal event to the state.
+
+        Parameters
+        ----------
+        event : dict
+            The journal event.
+        """
+        op = event["op"]
+        if op == "node":
+            self.nodes.setdefault(event["id"], (event["depth"], event["parent"]))
+        elif op == "edge":
+            self.edges[(event["u"], event["v"])] = event["depth"]
+        elif op == "expanded":
+            self.expanded.add(event["id"])
+        elif op == "alias":
+            self.aliases[event["id"]] = event["canonical"]
+        elif op == "session":
+            self.roots = event["roots"]
+            self.max_depth = event["max_depth"]
+            self.sessions = event.get("sessions", False)
+        elif op == "complete":
+            self.complete = True
+
+    def resolve(self, node_id):
+        """Returns the identifier of the node a possibly aliased identifier stands for.
+
+        Parameters
+        ----------
+        node_id : Any
+            A node identifier.
+
+        Returns
+        -------
+        Any
+            The identifier of the node `node_id` was merged into, or `node_id` itself if it is not an alias.
+        """
+        while node_id in self.aliases:
+            node_id = self.aliases[node_id]
+        return node_id
+
+    def fold_aliases(self):
+        """Rewrites the nodes, edges and expanded nodes of the state to the nodes their aliases were merged into.
+
+        An alias takes the place of its canonical node in the BFS order if the canonical node was not discovered on
+        its own, as in `BaseGraph.merge_alias`.
+        """
+        if not self.aliases:
+            return
+
+        nodes = {}
+        for node_id, (depth, parent) in self.nodes.items():
+            nodes.setdefault(self.resolve(node_id), (depth, self.resolve(parent)))
+        self.nodes = nodes
+
+        edges = {}
+        for (u, v), depth in self.edges.items():
+            u, v = self.resolve(u), self.resolve(v)
+            if u != v:
+                edges.setdefault((u, v), depth)
+        self.edges = edges
+        self.expanded = {self.resolve(node_id) for node_id in self.expanded}
+        self.roots = [self.resolve(root) for root in self.roots]
+
+    def frontier(self):
+        """Returns the identifiers of the discovered nodes that still have to be expanded, in BFS order.
+
+        Returns
+        -------
+        list
+            The identifiers of the nodes left in the frontier.
+        """
+        return [node_id for node_id in self.nodes if node_id not in self.expanded]
+
+
+class CrawlCheckpoint:
+    """Incremental on-disk checkpoint of a BFS crawl.
+
+    Every change made to the crawl subgraph (discovered node with its depth and parent, new edge, expanded node) is
+    appended as one JSON line to a journal. Every `compact_every` expanded nodes the journal is folded into a
+    snapshot file, written atomically, and truncated, so checkpointing never rewrites the whole crawl on each step.
+    Replaying events is idempotent, which keeps the checkpoint consistent if the process dies at any point.
+
+    The content of every expanded node (see `BaseNode.dump_content`) is appended to a separate contents file, never
+    rewritten, and restored into the nodes on resume, so that the pages completed before the interruption are not
+    fetched again.
+
+    Parameters
+    ----------
+    directory : str
+        The directory where the snapshot and the journal are stored. It is created if it does not exist.
+    compact_every : int, optional
+        The number of expanded nodes between two compactions. Defaults to 1000.
+    contents : bool, optional
+        If True, the content of every expanded node is saved. Crawls writing their pages as they go (see
+        `BaseCrawler.iter_crawl`) do not need them. Defaults to True.
+
+    Methods
+    -------
+    exists()
+        Checks whether the directory holds a checkpoint.
+    load()
+        Restores the crawl state from the snapshot and the journal.
+    begin(roots, max_depth, sessions=False)
+        Records the start of a new crawl.
+    session(index)
+        Returns the checkpoint of the session of one root, for a crawl from several roots.
+    record_node(node)
+        Records a discovered node.
+    record_edge(u, v, depth)
+        Records an edge.
+    record_expanded(node)
+        Records that the neighborhood of a node has been visited.
+    record_alias(alias, canonical)
+        Records that a node was merged into another one.
+    load_contents()
+        Reads the contents of the expanded nodes.
+    finish()
+        Records the completion of the crawl and compacts the checkpoint.
+    compact()
+        Folds the journal into the snapshot.
+
+    Examples
+    --------
+    >>> checkpoint = CrawlCheckpoint("checkpoints/docs")
+    >>> graph = crawler.crawl("https://example.com", max_depth=3, checkpoint=checkpoint)
+    >>> # ... after a crash, in a new process:
+    >>> graph = crawler.resume(CrawlCheckpoint("checkpoints/docs"))
+    """
+
+    SNAPSHOT_FILENAME = "snapshot.json"
+    JOURNAL_FILENAME = "journal.jsonl"
+    CONTENTS_FILENAME = "contents.bin"
+
+    def __init__(self, directory, compact_every=1000, contents=True):
+        """Initializes the checkpoint in the given directory.
+
+        Parameters
+        ----------
+        directory : str
+            The directory where the snapshot and the journal are stored.
+        compact_every : int, optional
+            The number of expanded nodes between two compactions. Defaults to 1000.
+        contents : bool, optional
+            If True, the content of every expanded node is saved. Defaults to True.
+        """
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.directory = directory
+        self.compact_every = compact_every
+        self.contents = contents
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_FILENAME)
+        self.journal_path = os.path.join(directory, self.JOURNAL_FILENAME)
+        self.contents_path = os.path.join(directory, self.CONTENTS_FILENAME)
+        self._journal = None
+        self._contents_file = None
+        self._expanded_since_compaction = 0
+
+    def exists(self):
+        """Checks whether the directory holds a checkpoint.
+
+        Returns
+        -------
+        bool
+            True if a snapshot or a journal exists.
+        """
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def load(self):
+        """Restores the crawl state from the snapshot and the journal.
+
+        Returns
+        -------
+        CrawlState
+            The restored crawl state.
+        """
+        state = CrawlState()
+
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as file:
+                snapshot = json.load(file)
+            state.roots = snapshot["roots"]
+            state.max_depth = snapshot["max_depth"]
+            state.nodes = {node_id: (depth, parent) for node_id, depth, parent in snapshot["nodes"]}
+            state.edges = {(u, v): depth for u, v, depth in snapshot["edges"]}
+            state.expanded = set(snapshot["expanded"])
+            state.aliases = dict(snapshot.get("aliases", []))
+            state.sessions = snapshot.get("sessions", False)
+            state.complete = snapshot["complete"]
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        state.apply(json.loads(line))
+                    except ValueError:
+                        break  # A partially written last line, left by a crash
+
+        state.fold_aliases()
+        return state
+
+    def load_contents(self):
+        """Reads the contents of the expanded nodes saved by `record_expanded`. A partially written last record, left
+        by a crash, is dropped from the contents file.
+
+        Returns
+        -------
+        dict
+            Maps the identifier of every expanded node with a content to its content, as returned by
+            `BaseNode.dump_content`.
+        """
+        contents = {}
+        if not os.path.exists(self.contents_path):
+            return contents
+
+        self._close_contents()
+        with open(self.contents_path, "rb") as file:
+            data = memoryview(file.read())
+        offset = 0
+        while offset + _CONTENT_HEADER.size <= len(data):
+            key_length, content_length = _CONTENT_HEADER.unpack_from(data, offset)
+            key_end = offset + _CONTENT_HEADER.size + key_length
+            end = key_end + content_length
+            if end > len(data):
+                break
+            contents[json.loads(bytes(data[offset + _CONTENT_HEADER.size:key_end]))] = data[key_end:end]
+            offset = end
+        if offset < len(data):
+            os.truncate(self.contents_path, offset)
+        return contents
+
+    def _append(self, event):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps(event) + "\n")
+
+    def begin(self, roots, max_depth, sessions=False):
+        """Records the start of a new crawl, discarding any previous checkpoint in the directory.
+
+        Parameters
+        ----------
+        roots : list of BaseNode
+            The nodes the crawl starts from.
+        max_depth : int
+            The maximum depth of the crawl.
+        sessions : bool, optional
+            If True, every root is crawled in its own session, journaled to the checkpoint returned by `session`,
+            and only the roots are recorded here. Defaults to False.
+        """
+        self.close()
+        for path in (self.snapshot_path, self.journal_path, self.contents_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+        event = {"op": "session", "roots": [root.id for root in roots], "max_depth": max_depth}
+        if sessions:
+            event["sessions"] = True
+        self._append(event)
+        if not sessions:
+            for root in roots:
+                self.record_node(root)
+        self._journal.flush()
+
+    def session(self, index):
+        """Returns the checkpoint of the session of one root, for a crawl from several roots started with
+        `begin(roots, max_depth, sessions=True)`.
+
+        Parameters
+        ----------
+        index : int
+            The index of the root in the roots of the crawl.
+
+        Returns
+        -------
+        CrawlCheckpoint
+            The checkpoint of the session, in a subdirectory of this checkpoint.
+        """
+        return CrawlCheckpoint(
+            os.path.join(self.directory, f"session-{index}"), compact_every=self.compact_every, contents=self.contents
+        )
+
+    def record_node(self, node):
+        """Records a discovered node with its depth and parent.
+
+        Parameters
+        ----------
+        node : BaseNode
+            The discovered node.
+        """
+        parent = node.parent.id if node.parent is not None else None
+        self._append({"op": "node", "id": node.id, "depth": node.depth, "parent": parent})
+
+    def record_edge(self, u, v, depth):
+        """Records an edge.
+
+        Parameters
+        ----------
+        u : BaseNode
+            The source node of the edge.
+        v : BaseNode
+            The target node of the edge.
+        depth : int
+            The depth attribute of the edge.
+        """
+        self._append({"op": "edge", "u": u.id, "v": v.id, "depth": depth})
+
+    def record_alias(self, alias, canonical):
+        """Records that a node was merged into another one (see `BaseGraph.merge_alias`).
+
+        Parameters
+        ----------
+        alias : BaseNode
+            The merged node.
+        canonical : BaseNode
+            The node it was merged into.
+        """
+        self._append({"op": "alias", "id": alias.id, "canonical": canonical.id})
+
+    def record_expanded(self, node):
+        """Records that the neighborhood of a node has been visited, saves its content, and flushes the journal.
+
+        Parameters
+        ----------
+        node : BaseNode
+            The expanded node.
+        """
+        content = node.dump_content() if self.contents else None
+        if content is not None:
+            if self._contents_file is None:
+                self._contents_file = open(self.contents_path, "ab")
+            key = json.dumps(node.id).encode("utf-8")
+            self._contents_file.write(_CONTENT_HEADER.pack(len(key), len(content)) + key + content)
+            # The content is on disk before the node is recorded as expanded
+            self._contents_file.flush()
+        self._append({"op": "expanded", "id": node.id})
+        self._journal.flush()
+
+        self._expanded_since_compaction += 1
+        if self._expanded_since_compaction >= self.compact_every:
+            self.compact()
+
+    def finish(self):
+        """Records the completion of the crawl and compacts the checkpoint."""
+        self._append({"op": "complete"})
+        self.compact()
+
+    def compact(self):
+        """Folds the journal into the snapshot, written atomically, and truncates the journal."""
+        self.close()
+        state = self.load()
+
+        snapshot = {
+            "roots": state.roots,
+            "max_depth": state.max_depth,
+            "nodes": [[node_id, depth, parent] for node_id, (depth, parent) in state.nodes.items()],
+            "edges": [[u, v, depth] for (u, v), depth in state.edges.items()],
+            "expanded": sorted(state.expanded),
+            "aliases": sorted(state.aliases.items()),
+            "sessions": state.sessions,
+            "complete": state.complete,
+        }
+        temporary_path = self.snapshot_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.snapshot_path)
+
+        # Events left in the journal after a crash here are already part of the snapshot, and replaying them is
+        # harmless
+        open(self.journal_path, "w").close()
+        self._expanded_since_compaction = 0
+
+    def _close_contents(self):
+        if self._contents_file is not None:
+            self._contents_file.close()
+            self._contents_file = None
+
+    def close(self):
+        """Closes the journal and contents files."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        self._close_contents()
@@ -0,0 +1,246 @@
+import re
+import sys
+import hashlib
+from array import array
+from collections import namedtuple
+
+ContentFingerprint = namedtuple("ContentFingerprint", ["digest", "simhash"])
+ContentFingerprint.__doc__ = """The fingerprint of the content of a node.
+
+Attributes
+----------
+digest : bytes
+    A 128-bit hash of the raw content, equal for exact duplicates.
+simhash : int or None
+    The 64-bit SimHash of the words of the content, close in Hamming distance for near duplicates, or None if the
+    content has too few words to be compared.
+"""
+
+SIMHASH_BITS = 64
+# Number of consecutive words hashed together
+SHINGLE_SIZE = 4
+# Contents with fewer shingles are only compared exactly
+MIN_SHINGLES = 16
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+_HASH_MASK = (1 << SIMHASH_BITS) - 1
+
+
+def _hash64(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+# SimHash counts, for every bit position, the shingle hashes having that bit set. The hashes are packed in an array of
+# 64-bit integers, whose bytes are then read by column (every 8th byte) and mapped to the value of one bit, so that
+# every count is a single `bytes.count` call instead of a Python loop over the hashes.
+_BIT_TABLES = [bytes(value >> bit & 1 for value in range(256)) for bit in range(8)]
+
+
+def simhash(text):
+    """Computes the SimHash of a text (Charikar, 2002), over shingles of consecutive lowercase words.
+
+    Texts differing by a few words have hashes differing by a few bits, unlike cryptographic hashes.
+
+    Parameters
+    ----------
+    text : str
+        The text to hash.
+
+    Returns
+    -------
+    int or None
+        The 64-bit SimHash, or None if the text has fewer than `MIN_SHINGLES` shingles.
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    # Every distinct word is hashed once; shingles are then hashed as tuples of integers, whose hash is not salted
+    word_hashes = {word: _hash64(word.encode("utf-8")) for word in set(words)}
+    codes = [word_hashes[word] for word in words]
+    shingles = zip(*(codes[offset:] for offset in range(SHINGLE_SIZE)))
+    hashes = array("Q", [hash(shingle) & _HASH_MASK for shingle in shingles])
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    if sys.byteorder == "big":
+        hashes.byteswap()
+
+    data = hashes.tobytes()
+    value = 0
+    for byte_index in range(SIMHASH_BITS // 8):
+        column = data[byte_index::8]
+        for bit, table in enumerate(_BIT_TABLES):
+            if 2 * column.translate(table).count(1) > len(hashes):
+                value |= 1 << (8 * byte_index + bit)
+    return value
+
+
+def fingerprint_content(content, text=None):
+    """Fingerprints the content of a node.
+
+    Parameters
+    ----------
+    content : bytes
+        The raw content (e.g. the HTML of a page).
+    text : str, optional
+        The text extracted from the content, for near-duplicate detection. If None, only exact duplicates can be
+        detected.
+
+    Returns
+    -------
+    ContentFingerprint
+        The fingerprint of the content.
+    """
+    digest = hashlib.blake2b(content, digest_size=16).digest()
+    return ContentFingerprint(digest, simhash(text) if text is not None else None)
+
+
+class ContentDeduplicator:
+    """Detects nodes whose content duplicates the content of a node seen earlier in the crawl.
+
+    Nodes are submitted in crawl order with the fingerprint of their content. A node is an exact duplicate of the
+    first node with the same content digest. With `near_duplicates`, it is a near duplicate of the first node whose
+    SimHash differs by at most `max_distance` bits: the 64 bits are split into `max_distance + 1` bands and every
+    hash is indexed by each of its bands, so that the candidates of a lookup are the hashes sharing at least one
+    band (by the pigeonhole principle, every hash within `max_distance` bits does), as in Manku et al., "Detecting
+    Near-Duplicates for Web Crawling", 2007.
+
+    Parameters
+    ----------
+    near_duplicates : bool, optional
+        If True, near duplicates are detected as well as exact duplicates. Defaults to False.
+    max_distance : int, optional
+        The maximum Hamming distance between the SimHashes of near duplicates. Defaults to 3.
+
+    Attributes
+    ----------
+    pages : int
+        The number of nodes submitted.
+    exact_duplicates : int
+        The number of exact duplicates found.
+    near_duplicates_found : int
+        The number of near duplicates found.
+    duplicates : dict
+        Maps the identifier of every original node to the list of the identifiers of its duplicates.
+    """
+
+    def __init__(self, near_duplicates=False, max_distance=3):
+        """Initializes an empty deduplicator.
+
+        Parameters
+        ----------
+        near_duplicates : bool, optional
+            If True, near duplicates are detected as well. Defaults to False.
+        max_distance : int, optional
+            The maximum Hamming distance between the SimHashes of near duplicates. Defaults to 3.
+        """
+        if not 0 <= max_distance < SIMHASH_BITS // 2:
+            raise ValueError(f"The maximum distance must be between 0 and {SIMHASH_BITS // 2 - 1}, got {max_distance}")
+        self.near_duplicates = near_duplicates
+        self.max_distance = max_distance
+        band_count = max_distance + 1
+        width = SIMHASH_BITS // band_count
+        # The last band takes the remaining bits
+        self._bands = [
+            (index * width, (1 << (width if index < band_count - 1 else SIMHASH_BITS - index * width)) - 1)
+            for index in range(band_count)
+        ]
+        self.clear()
+
+    def clear(self):
+        """Forgets all the nodes submitted so far."""
+        self.pages = 0
+        self.exact_duplicates = 0
+        self.near_duplicates_found = 0
+        self.duplicates = {}
+        self._digests = {}
+        self._band_index = [{} for _ in self._bands]
+
+    def _find_near(self, value):
+        for (shift, mask), index in zip(self._bands, self._band_index):
+            for candidate, node_id in index.get(value >> shift & mask, ()):
+                if (candidate ^ value).bit_count() <= self.max_distance:
+                    return node_id
+        return None
+
+    def submit(self, node_id, fingerprint):
+        """Submits a node, returning the node it duplicates if any.
+
+        Parameters
+        ----------
+        node_id : Any
+            The identifier of the node.
+        fingerprint : ContentFingerprint
+            The fingerprint of the content of the node.
+
+        Returns
+        -------
+        Any
+            The identifier of the earlier node with the same (or, with `near_duplicates`, nearly the same) content,
+            or None if the content was not seen before. Duplicates are not indexed themselves.
+        """
+        self.pages += 1
+        original_id = self._digests.get(fingerprint.digest)
+        if original_id is not None and original_id != node_id:
+            self.exact_duplicates += 1
+            self.duplicates.setdefault(original_id, []).append(node_id)
+            return original_id
+        if self.near_duplicates and fingerprint.simhash is not None:
+            original_id = self._find_near(fingerprint.simhash)
+            if original_id is not None and original_id != node_id:
+                self.near_duplicates_found += 1
+                self.duplicates.setdefault(original_id, []).append(node_id)
+                return original_id
+
+        self._digests.setdefault(fingerprint.digest, node_id)
+        if self.near_duplicates and fingerprint.simhash is not None:
+            for (shift, mask), index in zip(self._bands, self._band_index):
+                index.setdefault(fingerprint.simhash >> shift & mask, []).append((fingerprint.simhash, node_id))
+        return None
+
+    def report(self):
+        """Returns a summary of the duplicates found.
+
+        Returns
+        -------
+        dict
+            The number of `pages` submitted, of `unique_pages`, of `exact_duplicates` and `near_duplicates`, and the
+            `groups` of duplicates, mapping every original node identifier to the identifiers of its duplicates.
+        """
+        duplicate_count = self.exact_duplicates + self.near_duplicates_found
+        return {
+            "pages": self.pages,
+            "unique_pages": self.pages - duplicate_count,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates_found,
+            "groups": {original_id: list(ids) for original_id, ids in self.duplicates.items()},
+        }
+
+
+DEDUP_MODES = ("exact", "near")
+
+
+def get_deduplicator(dedup=None, **options):
+    """Returns a new content deduplicator matching a mode.
+
+    Parameters
+    ----------
+    dedup : {None, "exact", "near"} or ContentDeduplicator, optional
+        "exact" detects identical contents, "near" also detects near duplicates. A deduplicator instance is
+        returned as is. If None, None is returned and duplicate contents are crawled as distinct nodes.
+    **options : dict, optional
+        Options of the deduplicator (e.g. `max_distance`).
+
+    Returns
+    -------
+    ContentDeduplicator or None
+        The deduplicator.
+
+    Raises
+    ------
+    ValueError
+        If the mode is not supported.
+    """
+    if dedup is None or isinstance(dedup, ContentDeduplicator):
+        return dedup
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"Unsupported deduplication mode: {dedup} (expected one of {', '.join(DEDUP_MODES)})")
+    return ContentDeduplicator(near_duplicates=dedup == "near", **options)
@@ -0,0 +1,368 @@
+from array import array
+from bisect import bisect_left
+
+import networkx as nx
+
+
+class NetworkxStore:
+    """The default storage engine of `BaseGraph`: a `networkx.DiGraph`.
+
+    Every node is stored with its node object as the `node` attribute, and every edge with its attribute dictionary.
+    This costs a few dictionaries per node and per edge, but supports arbitrary edge attributes and all the
+    algorithms of networkx directly on the live graph.
+
+    Attributes
+    ----------
+    graph : nx.DiGraph
+        The underlying directed graph.
+    """
+
+    name = "networkx"
+
+    def __init__(self):
+        """Initializes an empty store."""
+        self.graph = nx.DiGraph()
+
+    def __len__(self):
+        return self.graph.number_of_nodes()
+
+    def has_node(self, node_id):
+        return node_id in self.graph
+
+    def get(self, node_id):
+        return self.graph.nodes[node_id]["node"]
+
+    def nodes(self):
+        return [data["node"] for data in self.graph.nodes.values()]
+
+    def add_node(self, node):
+        self.graph.add_node(node.id, node=node)
+
+    def remove_node(self, node_id):
+        if node_id in self.graph:
+            self.graph.remove_node(node_id)
+
+    def add_edge(self, u_id, v_id, attributes):
+        self.graph.add_edge(u_id, v_id, **attributes)
+
+    def has_edge(self, u_id, v_id):
+        return self.graph.has_edge(u_id, v_id)
+
+    def number_of_edges(self):
+        return self.graph.number_of_edges()
+
+    def edges(self):
+        return self.graph.edges(data=True)
+
+    def merge(self, alias_id, canonical_id):
+        for u_id, _, attributes in list(self.graph.in_edges(alias_id, data=True)):
+            if u_id != canonical_id and not self.graph.has_edge(u_id, canonical_id):
+                self.graph.add_edge(u_id, canonical_id, **attributes)
+        for _, v_id, attributes in list(self.graph.out_edges(alias_id, data=True)):
+            if v_id != canonical_id and not self.graph.has_edge(canonical_id, v_id):
+                self.graph.add_edge(canonical_id, v_id, **attributes)
+        self.remove_node(alias_id)
+
+    def to_networkx(self):
+        return self.graph
+
+
+class CompactStore:
+    """An array-backed storage engine of `BaseGraph`, for crawls with millions of edges.
+
+    Node identifiers are interned into consecutive integers, and the depth and parent of every node are kept in typed
+    arrays. Edges are appended to flat arrays of source, target and depth integers (10 bytes per edge), which are
+    compacted into a compressed sparse row (CSR) adjacency, sorted and deduplicated, once they outnumber the edges
+    already compacted, so an edge costs about 6 bytes instead of the several hundred bytes of the dictionaries of a
+    `networkx.DiGraph`. Merging an alias (see `BaseGraph.merge_alias`) only records a forwarding entry: the edges of
+    the alias are rewritten at the next compaction.
+
+    Only the integer `depth` edge attribute is supported. `to_networkx` exports the graph, with the same nodes,
+    edges and attributes as a `NetworkxStore` would hold, for analysis and visualization.
+
+    Attributes
+    ----------
+    ids : list
+        The node identifiers, by interned integer.
+    depths : array of int
+        The depth of every node when it was added, by interned integer.
+    parents : array of int
+        The interned integer of the parent of every node when it was added, or -1 for nodes without a parent.
+    node_factory : callable or None
+        For stores built with `from_arrays`, creates the node object of an interned integer on first access.
+    """
+
+    name = "compact"
+
+    # Value of the depth array of an edge without depth attribute
+    NO_DEPTH = -1
+
+    def __init__(self):
+        """Initializes an empty store."""
+        self.ids = []
+        self.depths = array("i")
+        self.parents = array("i")
+        self._index = {}
+        self._nodes = []
+        self._forward = {}
+        self._count = 0
+        self.node_factory = None
+
+        # Compacted edges: the targets of node i are _targets[_offsets[i]:_offsets[i + 1]], in increasing order
+        self._offsets = array("Q", [0])
+        self._targets = array("I")
+        self._edge_depths = array("i")
+        # Edges appended since the last compaction
+        self._pending_sources = array("I")
+        self._pending_targets = array("I")
+        self._pending_depths = array("i")
+        self._dirty = False
+
+    def __len__(self):
+        return self._count
+
+    def _intern(self, node_id):
+        index = self._index.get(node_id)
+        if index is None:
+            index = self._index[node_id] = len(self.ids)
+            self.ids.append(node_id)
+            self._nodes.append(None)
+            self.depths.append(0)
+            self.parents.append(-1)
+            self._count += 1
+        return index
+
+    def _alive(self, index):
+        return self._index.get(self.ids[index]) == index
+
+    def _resolve(self, index):
+        while index in self._forward:
+            index = self._forward[index]
+        return index
+
+    @classmethod
+    def from_arrays(cls, ids, depths, parents, offsets, targets, edge_depths, node_factory):
+        """Builds a store from compacted arrays (e.g. those of a saved graph), creating node objects on first access.
+
+        Parameters
+        ----------
+        ids : list
+            The node identifiers, by interned integer.
+        depths : array of int
+            The depth of every node.
+        parents : array of int
+            The interned integer of the parent of every node, or -1.
+        offsets : array of int
+            The CSR offsets of the edges, of length `len(ids) + 1`.
+        targets : array of int
+            The interned integers of the edge targets, sorted by source then target.
+        edge_depths : array of int
+            The depth attribute of every edge, or `NO_DEPTH`.
+        node_factory : callable
+            Creates the node object of an interned integer, e.g. from a memory-mapped file.
+
+        Returns
+        -------
+        CompactStore
+            The store.
+        """
+        store = cls()
+        store.ids = ids
+        store.depths, store.parents = depths, parents
+        store._index = {node_id: index for index, node_id in enumerate(ids)}
+        store._nodes = [None] * len(ids)
+        store._count = len(ids)
+        store._offsets, store._targets, store._edge_depths = offsets, targets, edge_depths
+        store.node_factory = node_factory
+        return store
+
+    def _node(self, index):
+        node = self._nodes[index]
+        if node is None and self.node_factory is not None and self._alive(index):
+            node = self._nodes[index] = self.node_factory(index)
+        return node
+
+    def has_node(self, node_id):
+        return node_id in self._index
+
+    def get(self, node_id):
+        node = self._node(self._index[node_id])
+        if node is None:
+            raise KeyError(node_id)
+        return node
+
+    def nodes(self):
+        if self.node_factory is not None:
+            return [node for node in map(self._node, range(len(self._nodes))) if node is not None]
+        return [node for node in self._nodes if node is not None]
+
+    def add_node(self, node):
+        index = self._intern(node.id)
+        self._nodes[index] = node
+        self.depths[index] = node.depth
+        parent = node.parent
+        self.parents[index] = self._index.get(parent.id, -1) if parent is not None else -1
+
+    def remove_node(self, node_id):
+        index = self._index.pop(node_id, None)
+        if index is not None:
+            self._nodes[index] = None
+            self._count -= 1
+            self._dirty = True
+
+    def add_edge(self, u_id, v_id, attributes):
+        depth = attributes.get("depth", self.NO_DEPTH)
+        if len(attributes) > ("depth" in attributes):
+            raise TypeError(f"The compact graph store only supports the 'depth' edge attribute, got {attributes}")
+        self._pending_sources.append(self._intern(u_id))
+        self._pending_targets.append(self._intern(v_id))
+        self._pending_depths.append(depth)
+        if len(self._pending_sources) > max(1 << 16, len(self._targets)):
+            self._compact()
+
+    def _compact(self):
+        """Merges the pending edges into the CSR arrays, resolving merged aliases and dropping removed nodes."""
+        sources, targets, depths = [], [], []
+        for u in range(len(self._offsets) - 1):
+            start, end = self._offsets[u], self._offsets[u + 1]
+            sources.extend([u] * (end - start))
+            targets.extend(self._targets[start:end])
+            depths.extend(self._edge_depths[start:end])
+        sources.extend(self._pending_sources)
+        targets.extend(self._pending_targets)
+        depths.extend(self._pending_depths)
+
+        # The last attributes of an edge win, as in networkx
+        if self._dirty:
+            edges = {}
+            resolve, alive = self._resolve, self._alive
+            for u, v, depth in zip(sources, targets, depths):
+                u, v = resolve(u), resolve(v)
+                if u != v and alive(u) and alive(v):
+                    edges[(u << 32) | v] = depth
+        else:
+            edges = {(u << 32) | v: depth for u, v, depth in zip(sources, targets, depths) if u != v}
+
+        node_count = len(self.ids)
+        offsets = array("Q", bytes(8 * (node_count + 1)))
+        new_targets, new_depths = array("I"), array("i")
+        for key in sorted(edges):
+            offsets[(key >> 32) + 1] += 1
+            new_targets.append(key & 0xFFFFFFFF)
+            new_depths.append(edges[key])
+        for u in range(node_count):
+            offsets[u + 1] += offsets[u]
+
+        self._offsets, self._targets, self._edge_depths = offsets, new_targets, new_depths
+        self._pending_sources, self._pending_targets, self._pending_depths = array("I"), array("I"), array("i")
+        self._dirty = False
+
+    def _compacted(self):
+        if self._pending_sources or self._dirty or len(self._offsets) != len(self.ids) + 1:
+            self._compact()
+
+    def has_edge(self, u_id, v_id):
+        u, v = self._index.get(u_id), self._index.get(v_id)
+        if u is None or v is None:
+            return False
+        self._compacted()
+        start, end = self._offsets[u], self._offsets[u + 1]
+        position = bisect_left(self._targets, v, start, end)
+        return position < end and self._targets[position] == v
+
+    def number_of_edges(self):
+        self._compacted()
+        return len(self._targets)
+
+    def csr(self):
+        """Returns the compacted adjacency of the store.
+
+        Returns
+        -------
+        tuple of array
+            The offsets (of length `len(ids) + 1`), targets and depths of the edges, by interned integer. The arrays
+            are those of the store, not copies.
+        """
+        self._compacted()
+        return self._offsets, self._targets, self._edge_depths
+
+    def edges(self):
+        self._compacted()
+        for u in range(len(self.ids)):
+            for position in range(self._offsets[u], self._offsets[u + 1]):
+                depth = self._edge_depths[position]
+                attributes = {} if depth == self.NO_DEPTH else {"depth": depth}
+                yield self.ids[u], self.ids[self._targets[position]], attributes
+
+    def merge(self, alias_id, canonical_id):
+        alias, canonical = self._index.pop(alias_id, None), self._index[canonical_id]
+        if alias is not None and alias != canonical:
+            self._nodes[alias] = None
+            self._forward[alias] = canonical
+            self._count -= 1
+            self._dirty = True
+
+    @property
+    def nbytes(self):
+        """The memory used by the node and edge arrays, in bytes (node objects and the identifier index excluded).
+
+        Returns
+        -------
+        int
+            The size of the arrays.
+        """
+        buffers = (
+            self.depths,
+            self.parents,
+            self._offsets,
+            self._targets,
+            self._edge_depths,
+            self._pending_sources,
+            self._pending_targets,
+            self._pending_depths,
+        )
+        return sum(buffer.itemsize * len(buffer) for buffer in buffers)
+
+    def to_networkx(self):
+        graph = nx.DiGraph()
+        for index, node_id in enumerate(self.ids):
+            if self._alive(index):
+                node = self._node(index)
+                if node is not None:
+                    graph.add_node(node_id, node=node)
+                else:
+                    graph.add_node(node_id)
+        for u_id, v_id, attributes in self.edges():
+            graph.add_edge(u_id, v_id, **attributes)
+        return graph
+
+
+GRAPH_STORES = {
+    "networkx": NetworkxStore,
+    "compact": CompactStore,
+}
+
+
+def get_graph_store(store=None):
+    """Returns a new graph storage engine matching a name.
+
+    Parameters
+    ----------
+    store : str, optional
+        The name of a store in `GRAPH_STORES` ("networkx" or "compact"). If None, a `NetworkxStore` is returned.
+
+    Returns
+    -------
+    NetworkxStore or CompactStore
+        The storage engine.
+
+    Raises
+    ------
+    ValueError
+        If the name does not match any store.
+    """
+    if store is None:
+        return NetworkxStore()
+    if store not in GRAPH_STORES:
+        raise ValueError(f"Unsupported graph store: {store} (expected one of {', '.join(GRAPH_STORES)})")
+    return GRAPH_STORES[store]()
@@ -0,0 +1,473 @@
+import os
+import json
+import math
+import time
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+
+# Upper bounds, in seconds, of the buckets of the phase histograms
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_FORMATS = ("prometheus", "jsonl")
+
+# The file extensions each metrics format is inferred from
+METRICS_EXTENSIONS = {".prom": "prometheus", ".txt": "prometheus", ".jsonl": "jsonl", ".json": "jsonl"}
+
+# Returned by `timed` when metrics are disabled, so that an instrumented phase costs a single call
+_NO_PHASE = nullcontext()
+
+
+def metrics_format(path):
+    """Returns the metrics format inferred from the extension of a path.
+
+    Parameters
+    ----------
+    path : str
+        The path of a metrics file.
+
+    Returns
+    -------
+    str or None
+        "prometheus" for ".prom" and ".txt" files, "jsonl" for ".jsonl" and ".json" files, or None for any other
+        extension.
+    """
+    return METRICS_EXTENSIONS.get(os.path.splitext(path)[1])
+
+
+class Histogram:
+    """A histogram of durations, with fixed buckets.
+
+    Parameters
+    ----------
+    buckets : tuple of float
+        The sorted upper bounds of the buckets, in seconds. Larger values fall in an implicit `+Inf` bucket.
+
+    Attributes
+    ----------
+    count : int
+        The number of observations.
+    sum : float
+        The sum of the observations, in seconds.
+    min : float
+        The smallest observation (infinite while there is none).
+    max : float
+        The largest observation (zero while there is none).
+    bucket_counts : list of int
+        The number of observations of every bucket, the last one being the `+Inf` bucket.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value):
+        """Records one observation."""
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+
+    def quantile(self, q):
+        """Estimates a quantile of the observations, by linear interpolation within its bucket.
+
+        Parameters
+        ----------
+        q : float
+            The quantile, between 0 and 1.
+
+        Returns
+        -------
+        float or None
+            The estimated quantile, within the observed range, or None if there is no observation.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                return min(max(value, self.min), self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def as_dict(self):
+        """Returns the count, sum, extrema and estimated median and 99th percentile of the observations.
+
+        Returns
+        -------
+        dict
+            The statistics of the histogram, durations in seconds.
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class _Phase:
+    """Times a block into the histogram of a phase, and records it as a span if the metrics have a tracer."""
+
+    __slots__ = ("_metrics", "_name", "_target", "_start")
+
+    def __init__(self, metrics, name, target=None):
+        self._metrics = metrics
+        self._name = name
+        self._target = target
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        self._metrics.observe(self._name, (end - self._start) * 1e-9)
+        tracer = self._metrics.tracer
+        if tracer is not None:
+            tracer.record(self._name, self._start, end, self._target)
+
+
+class CrawlMetrics:
+    """Thread-safe instrumentation of a crawl: counters, histograms of phase durations, and gauges sampled over time.
+
+    The crawler, its HTTP session and its nodes report to the same instance: the duration of every phase of a page
+    (`dns`, `connect`, `tls`, `download`, `parse`, `links`, `markdown`, `fingerprint`, `write`), counters such as
+    `bytes_in`, `bytes_out` or `pages_fetched`, and gauges such as the length of the BFS `frontier`. Phases nest:
+    `download` covers the whole HTTP request, including the `dns`, `connect` and `tls` phases of a new connection.
+    With a `tracer`, every timed phase is also recorded as a span of the crawl timeline.
+
+    Parameters
+    ----------
+    buckets : tuple of float, optional
+        The upper bounds of the buckets of the phase histograms, in seconds. Defaults to `DEFAULT_BUCKETS`.
+    sample_interval : float, optional
+        The minimum interval, in seconds, between two recorded samples of a gauge. Defaults to 0.1.
+    max_samples : int, optional
+        The maximum number of samples recorded per gauge. When it is reached, every other sample is dropped and the
+        interval is doubled. Defaults to 10000.
+    tracer : CrawlTracer, optional
+        If given, every timed phase is also recorded as a span by this tracer. Defaults to None.
+
+    Attributes
+    ----------
+    tracer : CrawlTracer or None
+        The tracer the timed phases are recorded by.
+    counters : dict
+        Maps every counter name to its value.
+    histograms : dict
+        Maps every phase name to its `Histogram`.
+    gauges : dict
+        Maps every gauge name to its last value.
+
+    Examples
+    --------
+    >>> metrics = CrawlMetrics()
+    >>> crawler = WebCrawler(metrics=metrics)
+    >>> graph = crawler.crawl("https://example.com", max_depth=2)
+    >>> print(metrics.format_summary())
+    >>> metrics.export("metrics.prom")
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, sample_interval=0.1, max_samples=10000, tracer=None):
+        """Initializes empty metrics.
+
+        Parameters
+        ----------
+        buckets : tuple of float, optional
+            The upper bounds of the buckets of the phase histograms, in seconds. Defaults to `DEFAULT_BUCKETS`.
+        sample_interval : float, optional
+            The minimum interval, in seconds, between two samples of a gauge. Defaults to 0.1.
+        max_samples : int, optional
+            The maximum number of samples recorded per gauge. Defaults to 10000.
+        tracer : CrawlTracer, optional
+            The tracer recording every timed phase as a span. Defaults to None.
+        """
+        self.buckets = tuple(buckets)
+        self.tracer = tracer
+        self.sample_interval = sample_interval
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Resets all the metrics, and restarts the clock of the samples."""
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.gauges = {}
+            self._gauge_max = {}
+            self._samples = {}
+            self._intervals = {}
+            self._started_at = time.perf_counter()
+
+    def count(self, name, value=1):
+        """Increments a counter.
+
+        Parameters
+        ----------
+        name : str
+            The name of the counter.
+        value : int, optional
+            The increment. Defaults to 1.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        """Records the duration of one occurrence of a phase.
+
+        Parameters
+        ----------
+        name : str
+            The name of the phase.
+        seconds : float
+            The duration of the phase.
+        """
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def phase(self, name, target=None):
+        """Returns a context manager recording the duration of its block as one occurrence of a phase.
+
+        Parameters
+        ----------
+        name : str
+            The name of the phase.
+        target : str, optional
+            The URL of the page (or the name of the file) the phase works on, tagged on its span if traced.
+
+        Returns
+        -------
+        context manager
+            The timer of the phase.
+        """
+        return _Phase(self, name, target)
+
+    def gauge(self, name, value):
+        """Sets the current value of a gauge, sampling it over time.
+
+        Parameters
+        ----------
+        name : str
+            The name of the gauge.
+        value : float
+            The current value.
+        """
+        elapsed = time.perf_counter() - self._started_at
+        with self._lock:
+            self.gauges[name] = value
+            if value > self._gauge_max.get(name, -math.inf):
+                self._gauge_max[name] = value
+            samples = self._samples.setdefault(name, [])
+            interval = self._intervals.setdefault(name, self.sample_interval)
+            if samples and elapsed - samples[-1][0] < interval:
+                return
+            samples.append((elapsed, value))
+            if len(samples) > self.max_samples:
+                del samples[1::2]
+                self._intervals[name] = 2 * interval
+
+    def summary(self):
+        """Returns a snapshot of all the metrics.
+
+        Returns
+        -------
+        dict
+            The `elapsed_seconds` since the metrics were created or cleared, the `counters`, the `phases` (the
+            statistics of every histogram, see `Histogram.as_dict`) and the `gauges` (their last and maximum values
+            and their samples, as `[seconds, value]` pairs).
+        """
+        with self._lock:
+            return {
+                "elapsed_seconds": time.perf_counter() - self._started_at,
+                "counters": dict(self.counters),
+                "phases": {name: histogram.as_dict() for name, histogram in self.histograms.items()},
+                "gauges": {
+                    name: {
+                        "value": value,
+                        "max": self._gauge_max[name],
+                        "samples": [list(sample) for sample in self._samples.get(name, ())],
+                    }
+                    for name, value in self.gauges.items()
+                },
+            }
+
+    def format_summary(self):
+        """Returns a human-readable summary of the metrics, to be logged at the end of a run.
+
+        Returns
+        -------
+        str
+            A table of the phases sorted by total time, followed by the counters and gauges.
+        """
+        summary = self.summary()
+        lines = [f"Crawl metrics over {summary['elapsed_seconds']:.2f} s"]
+        if summary["phases"]:
+            lines.append(
+                f"  {'phase':<12} {'count':>8} {'total s':>9} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+            )
+            phases = sorted(summary["phases"].items(), key=lambda item: item[1]["sum"], reverse=True)
+            for name, stats in phases:
+                lines.append(
+                    f"  {name:<12} {stats['count']:>8} {stats['sum']:>9.2f} {1000 * stats['mean']:>9.2f} "
+                    f"{1000 * stats['p50']:>9.2f} {1000 * stats['p99']:>9.2f} {1000 * stats['max']:>9.2f}"
+                )
+        if summary["counters"]:
+            counters = ", ".join(f"{name}={value}" for name, value in sorted(summary["counters"].items()))
+            lines.append(f"  counters: {counters}")
+        for name, gauge in sorted(summary["gauges"].items()):
+            lines.append(f"  gauge {name}: last={gauge['value']}, max={gauge['max']}")
+        return "\n".join(lines)
+
+    def to_prometheus(self, prefix="crawler"):
+        """Formats the metrics in the Prometheus text exposition format.
+
+        Counters are exported as `<prefix>_<name>_total`, phases as the `<prefix>_phase_seconds` histogram labelled
+        by phase, and gauges as `<prefix>_<name>` along with their maximum as `<prefix>_<name>_max`.
+
+        Parameters
+        ----------
+        prefix : str, optional
+            The prefix of the metric names. Defaults to "crawler".
+
+        Returns
+        -------
+        str
+            The metrics, one sample per line.
+        """
+        with self._lock:
+            lines = []
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{name}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+
+            if self.histograms:
+                metric = f"{prefix}_phase_seconds"
+                lines += [f"# HELP {metric} Duration of the phases of the crawl.", f"# TYPE {metric} histogram"]
+            for name, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (math.inf,), histogram.bucket_counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == math.inf else repr(bound)
+                    lines.append(f'{metric}_bucket{{phase="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{phase="{name}"}} {histogram.sum!r}')
+                lines.append(f'{metric}_count{{phase="{name}"}} {histogram.count}')
+
+            for name, value in sorted(self.gauges.items()):
+                metric = f"{prefix}_{name}"
+                lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+                lines += [f"# TYPE {metric}_max gauge", f"{metric}_max {self._gauge_max[name]}"]
+        return "\n".join(lines) + "\n"
+
+    def iter_json_lines(self):
+        """Yields the metrics as JSON lines.
+
+        The first line describes the run; it is followed by one line per counter, per phase, per gauge and per
+        gauge sample, each with a `type` field ("run", "counter", "phase", "gauge" or "sample").
+
+        Yields
+        ------
+        str
+            One JSON document per metric, without line terminator.
+        """
+        summary = self.summary()
+        yield json.dumps({"type": "run", "elapsed_seconds": summary["elapsed_seconds"]})
+        for name, value in sorted(summary["counters"].items()):
+            yield json.dumps({"type": "counter", "name": name, "value": value})
+        for name, stats in sorted(summary["phases"].items()):
+            yield json.dumps({"type": "phase", "name": name, **stats})
+        for name, gauge in sorted(summary["gauges"].items()):
+            yield json.dumps({"type": "gauge", "name": name, "value": gauge["value"], "max": gauge["max"]})
+            for seconds, value in gauge["samples"]:
+                yield json.dumps({"type": "sample", "name": name, "seconds": seconds, "value": value})
+
+    def export(self, path, format=None):
+        """Writes the metrics to a file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+        format : {None, "prometheus", "jsonl"}, optional
+            The format of the file. If None, it is inferred from the extension of the path: ".prom" or ".txt" for
+            the Prometheus text format, ".jsonl" or ".json" for JSON lines.
+
+        Raises
+        ------
+        ValueError
+            If the format is not supported, or cannot be inferred from the path.
+        """
+        if format is None:
+            format = metrics_format(path)
+            if format is None:
+                raise ValueError(
+                    f"Cannot infer the metrics format of {path} (expected one of {', '.join(METRICS_EXTENSIONS)})"
+                )
+        if format not in METRICS_FORMATS:
+            raise ValueError(f"Unsupported metrics format: {format} (expected one of {', '.join(METRICS_FORMATS)})")
+
+        content = self.to_prometheus() if format == "prometheus" else "\n".join(self.iter_json_lines()) + "\n"
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+    def __repr__(self):
+        return f"CrawlMetrics({len(self.counters)} counters, {len(self.histograms)} phases, {len(self.gauges)} gauges)"
+
+
+def timed(metrics, name, target=None):
+    """Returns a context manager timing a phase into `metrics`, or doing nothing if `metrics` is None.
+
+    Parameters
+    ----------
+    metrics : CrawlMetrics or None
+        The metrics to report to.
+    name : str
+        The name of the phase.
+    target : str, optional
+        The URL of the page (or the name of the file) the phase works on, tagged on its span if traced.
+
+    Returns
+    -------
+    context manager
+        The timer of the phase.
+    """
+    return _NO_PHASE if metrics is None else _Phase(metrics, name, target)
+
+
+def get_metrics(metrics=None):
+    """Returns the crawl metrics matching an option.
+
+    Parameters
+    ----------
+    metrics : bool or CrawlMetrics or None, optional
+        True creates new metrics, an instance is returned as is. If None or False, None is returned and the crawl
+        is not instrumented.
+
+    Returns
+    -------
+    CrawlMetrics or None
+        The metrics.
+    """
+    if metrics is None or metrics is False:
+        return None
+    if metrics is True:
+        return CrawlMetrics()
+    return metrics
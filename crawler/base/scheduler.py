@@ -0,0 +1,260 @@
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+
+class TokenBucket:
+    """A token bucket rate limiter.
+
+    Tokens are refilled continuously at `rate` tokens per second, up to `burst` tokens. Each request consumes one
+    token, so at most `burst` requests can be sent back to back, and `rate` requests per second on average.
+
+    Parameters
+    ----------
+    rate : float
+        The number of tokens added per second.
+    burst : int, optional
+        The maximum number of tokens the bucket can hold. Defaults to 1.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self, now):
+        """Returns how long to wait, in seconds, until a token is available (0 if one is available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now):
+        """Consumes one token. The caller is expected to have checked `delay` first."""
+        self._refill(now)
+        self.tokens -= 1
+
+
+class _Task:
+    def __init__(self, future, function, args):
+        self.future = future
+        self.function = function
+        self.args = args
+
+
+class KeyedScheduler:
+    """A thread pool that enforces per-key concurrency and rate limits, interleaving keys.
+
+    Tasks are submitted together with a key (for a crawler, the host of the page being fetched). Each key has its own
+    FIFO queue, a maximum number of tasks running concurrently, and an optional token bucket limiting the number of
+    tasks started per second. Idle workers pick the next task from the first key that is ready, in round-robin
+    order, so that a throttled key never keeps workers idle while other keys have work. Keys can also be deferred
+    for a while, for instance to honor a `Retry-After` header.
+
+    The scheduler provides the `submit`/`shutdown` interface used by `BaseCrawler.expand_frontier`, with the key
+    as the first argument of `submit`.
+
+    Parameters
+    ----------
+    max_workers : int
+        The number of worker threads.
+    max_per_key : int, optional
+        The maximum number of tasks of the same key running concurrently. Defaults to 2.
+    rate : float, optional
+        The maximum number of tasks of the same key started per second. If None, no rate limit is applied.
+    burst : int, optional
+        The number of tasks of the same key that can be started back to back before `rate` applies. Defaults to 1.
+
+    Methods
+    -------
+    submit(key, function, *args)
+        Schedules a task for the given key and returns its future.
+    set_rate(key, rate, burst=1)
+        Overrides the rate limit of a key.
+    defer(key, delay)
+        Prevents tasks of a key from starting for the given number of seconds.
+    shutdown(wait=True, cancel_futures=False)
+        Stops the worker threads.
+    """
+
+    def __init__(self, max_workers, max_per_key=2, rate=None, burst=1):
+        """Initializes the scheduler and starts its worker threads.
+
+        Parameters
+        ----------
+        max_workers : int
+            The number of worker threads.
+        max_per_key : int, optional
+            The maximum number of tasks of the same key running concurrently. Defaults to 2.
+        rate : float, optional
+            The maximum number of tasks of the same key started per second. Defaults to None (unlimited).
+        burst : int, optional
+            The size of the token bucket of each key. Defaults to 1.
+        """
+        self.max_per_key = max_per_key
+        self.rate = rate
+        self.burst = burst
+
+        self._queues = OrderedDict()
+        self._running = {}
+        self._buckets = {}
+        self._deferred_until = {}
+        self._shutdown = False
+        self._condition = threading.Condition()
+
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True, name=f"KeyedScheduler-{index}")
+            for index in range(max(1, max_workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, key, function, *args):
+        """Schedules a task for the given key.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key the task is throttled by (e.g. a host name).
+        function : callable
+            The function to run.
+        *args
+            The positional arguments of the function.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            The future resolving to the result of the function.
+        """
+        future = Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new tasks after shutdown")
+            if key not in self._queues:
+                self._queues[key] = deque()
+                self._running.setdefault(key, 0)
+            self._queues[key].append(_Task(future, function, args))
+            self._condition.notify()
+        return future
+
+    def set_rate(self, key, rate, burst=1):
+        """Overrides the rate limit of a key, e.g. to honor a `Crawl-delay` directive.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key to throttle.
+        rate : float
+            The maximum number of tasks of this key started per second.
+        burst : int, optional
+            The size of the token bucket of this key. Defaults to 1.
+        """
+        with self._condition:
+            self._buckets[key] = TokenBucket(rate, burst)
+
+    def defer(self, key, delay):
+        """Prevents tasks of a key from starting for the given number of seconds.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key to defer.
+        delay : float
+            The number of seconds to wait before starting new tasks of this key.
+        """
+        with self._condition:
+            until = time.monotonic() + delay
+            self._deferred_until[key] = max(until, self._deferred_until.get(key, 0.0))
+            self._condition.notify_all()
+
+    def _bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None and self.rate is not None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def _next_task(self):
+        """Pops the next ready task, or returns the time to wait before one may become ready."""
+        now = time.monotonic()
+        wait = None
+
+        for key, queue in self._queues.items():
+            if self._running[key] >= self.max_per_key:
+                continue
+
+            key_wait = self._deferred_until.get(key, 0.0) - now
+            bucket = self._bucket(key)
+            if key_wait <= 0 and bucket is not None:
+                key_wait = bucket.delay(now)
+
+            if key_wait > 0:
+                wait = key_wait if wait is None else min(wait, key_wait)
+                continue
+
+            task = queue.popleft()
+            if bucket is not None:
+                bucket.consume(now)
+            self._running[key] += 1
+            # Move the key to the end of the queue so that keys are served in round-robin order
+            del self._queues[key]
+            if len(queue) > 0:
+                self._queues[key] = queue
+            return key, task, None
+
+        return None, None, wait
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while True:
+                    key, task, wait = self._next_task()
+                    if task is not None:
+                        break
+                    if self._shutdown and len(self._queues) == 0:
+                        return
+                    self._condition.wait(timeout=wait)
+
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    task.future.set_result(task.function(*task.args))
+                except BaseException as e:
+                    task.future.set_exception(e)
+
+            with self._condition:
+                self._running[key] -= 1
+                self._condition.notify_all()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """Stops the worker threads once the queued tasks are done.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            If True, blocks until all worker threads have exited. Defaults to True.
+        cancel_futures : bool, optional
+            If True, cancels the tasks that have not started yet. Defaults to False.
+        """
+        with self._condition:
+            self._shutdown = True
+            if cancel_futures:
+                for queue in self._queues.values():
+                    for task in queue:
+                        task.future.cancel()
+                self._queues.clear()
+            self._condition.notify_all()
+
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown(wait=True)
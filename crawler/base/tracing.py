@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import threading
+from array import array
+
+# Number of spans kept by default: about 40 MB, several spans per page of a 100k-page crawl
+DEFAULT_CAPACITY = 1 << 20
+
+
+class CrawlTracer:
+    """Records the spans of a crawl (fetches, parses, link extractions, conversions, writes) in a ring buffer, and
+    exports them as a Chrome trace-event timeline.
+
+    Spans are recorded by the timed phases of `CrawlMetrics` (see `WebCrawler`'s `trace` option), each with the
+    thread (or worker process) it ran on and the URL it worked on. They are stored column-wise in preallocated
+    arrays: recording a span only claims the next slot under a lock, and fills it without allocating anything beyond
+    the integers themselves. When the buffer is full, the oldest spans are overwritten, so tracing a long crawl keeps
+    its most recent `capacity` spans in bounded memory (about 40 bytes per span).
+
+    The exported JSON can be opened in a trace viewer such as Perfetto (https://ui.perfetto.dev) or
+    `chrome://tracing`, showing one track per worker thread, where head-of-line blocking and idle workers are gaps.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        The number of spans kept. Defaults to `DEFAULT_CAPACITY` (about one million).
+
+    Attributes
+    ----------
+    capacity : int
+        The number of spans kept.
+    recorded : int
+        The number of spans recorded since the tracer was created or cleared, including overwritten ones.
+
+    Examples
+    --------
+    >>> crawler = WebCrawler(trace=True)
+    >>> graph = crawler.crawl("https://example.com", max_depth=2, workers=8)
+    >>> crawler.metrics.tracer.export("crawl.trace.json")
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """Initializes an empty tracer.
+
+        Parameters
+        ----------
+        capacity : int, optional
+            The number of spans kept. Defaults to `DEFAULT_CAPACITY`.
+        """
+        if capacity <= 0:
+            raise ValueError(f"The capacity of a tracer must be positive, got {capacity}")
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Drops all the recorded spans."""
+        with self._lock:
+            capacity = self.capacity
+            self._starts = array("q", bytes(8 * capacity))
+            self._ends = array("q", bytes(8 * capacity))
+            self._names = array("H", bytes(2 * capacity))
+            self._threads = array("I", bytes(4 * capacity))
+            self._pids = array("i", bytes(4 * capacity))
+            self._targets = [None] * capacity
+            self.recorded = 0
+            self._name_codes = {}
+            self._name_list = []
+            self._thread_ids = {}
+            self._thread_names = {}
+            self._pid = os.getpid()
+            self._origin = time.perf_counter_ns()
+
+    def _name_code(self, name):
+        code = self._name_codes.get(name)
+        if code is None:
+            with self._lock:
+                code = self._name_codes.get(name)
+                if code is None:
+                    code = self._name_codes[name] = len(self._name_list)
+                    self._name_list.append(name)
+        return code
+
+    def _thread_id(self):
+        ident = threading.get_ident()
+        thread_id = self._thread_ids.get(ident)
+        if thread_id is None:
+            # Threads are numbered in order of appearance, the viewer's integers being limited to 53 bits
+            with self._lock:
+                thread_id = self._thread_ids.get(ident)
+                if thread_id is None:
+                    thread_id = self._thread_ids[ident] = len(self._thread_ids) + 1
+                    self._thread_names[thread_id] = threading.current_thread().name
+        return thread_id
+
+    def record(self, name, start_ns, end_ns, target=None, pid=None):
+        """Records a span that ran on the calling thread, or in another process.
+
+        Parameters
+        ----------
+        name : str
+            The name of the span (the phase, e.g. "download").
+        start_ns : int
+            The start of the span, from `time.perf_counter_ns`.
+        end_ns : int
+            The end of the span, from `time.perf_counter_ns`.
+        target : str, optional
+            The URL of the page (or the name of the file) the span worked on. Defaults to None.
+        pid : int, optional
+            The identifier of the process the span ran in, if it is not the tracing process (e.g. a Markdown
+            conversion worker, timed with the system-wide monotonic clock). Defaults to None.
+        """
+        with self._lock:
+            slot = self.recorded % self.capacity
+            self.recorded += 1
+        self._starts[slot] = start_ns
+        self._ends[slot] = end_ns
+        self._names[slot] = self._name_code(name)
+        if pid is None or pid == self._pid:
+            self._threads[slot] = self._thread_id()
+            self._pids[slot] = 0
+        else:
+            self._threads[slot] = 0
+            self._pids[slot] = pid
+        self._targets[slot] = target
+
+    def __len__(self):
+        return min(self.recorded, self.capacity)
+
+    @property
+    def dropped(self):
+        """The number of spans overwritten because the buffer was full.
+
+        Returns
+        -------
+        int
+            The number of spans recorded but no longer kept.
+        """
+        return self.recorded - len(self)
+
+    def iter_spans(self):
+        """Yields the spans kept, from the oldest to the most recent.
+
+        Yields
+        ------
+        dict
+            The `name`, `start` and `duration` (in seconds, from the creation of the tracer), `thread` (its name, or
+            "process <pid>" for a span of another process) and `target` of every span.
+        """
+        recorded = self.recorded
+        first = max(0, recorded - self.capacity)
+        for index in range(first, recorded):
+            slot = index % self.capacity
+            thread_id = self._threads[slot]
+            yield {
+                "name": self._name_list[self._names[slot]],
+                "start": (self._starts[slot] - self._origin) * 1e-9,
+                "duration": (self._ends[slot] - self._starts[slot]) * 1e-9,
+                "thread": self._thread_names[thread_id] if thread_id else f"process {self._pids[slot]}",
+                "target": self._targets[slot],
+            }
+
+    def _iter_events(self):
+        pid = self._pid
+        yield {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "crawler"}}
+        for thread_id, thread_name in sorted(self._thread_names.items()):
+            yield {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}}
+
+        recorded = self.recorded
+        worker_pids = set()
+        for index in range(max(0, recorded - self.capacity), recorded):
+            slot = index % self.capacity
+            start = self._starts[slot]
+            event = {
+                "name": self._name_list[self._names[slot]],
+                "cat": "crawl",
+                "ph": "X",
+                "ts": (start - self._origin) / 1000,
+                "dur": (self._ends[slot] - start) / 1000,
+                "pid": self._pids[slot] or pid,
+                "tid": self._threads[slot],
+            }
+            if self._targets[slot] is not None:
+                event["args"] = {"target": self._targets[slot]}
+            if self._pids[slot] and self._pids[slot] not in worker_pids:
+                worker_pids.add(self._pids[slot])
+                yield {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": self._pids[slot],
+                    "tid": 0,
+                    "args": {"name": f"worker {self._pids[slot]}"},
+                }
+            yield event
+
+    def to_chrome_trace(self):
+        """Returns the spans kept as a Chrome trace-event document.
+
+        Every span is a complete ("X") event, in microseconds from the creation of the tracer, on the track of its
+        thread; metadata events name the threads and the worker processes.
+
+        Returns
+        -------
+        dict
+            The trace, with its `traceEvents` and the number of spans `dropped` in `otherData`.
+        """
+        return {
+            "traceEvents": list(self._iter_events()),
+            "displayTimeUnit": "ms",
+            "otherData": {"recorded": self.recorded, "dropped": self.dropped},
+        }
+
+    def export(self, path):
+        """Writes the spans kept to a Chrome trace-event JSON file, one event per line.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('{"displayTimeUnit": "ms", ')
+            file.write(f'"otherData": {json.dumps({"recorded": self.recorded, "dropped": self.dropped})}, ')
+            file.write('"traceEvents": [\n')
+            for index, event in enumerate(self._iter_events()):
+                if index:
+                    file.write(",\n")
+                file.write(json.dumps(event))
+            file.write("\n]}\n")
+
+    def __repr__(self):
+        return f"CrawlTracer({len(self)} spans, {self.dropped} dropped)"
+
+
+def get_tracer(trace=None):
+    """Returns the crawl tracer matching an option.
+
+    Parameters
+    ----------
+    trace : bool or CrawlTracer or None, optional
+        True creates a new tracer, an instance is returned as is. If None or False, None is returned.
+
+    Returns
+    -------
+    CrawlTracer or None
+        The tracer.
+    """
+    if trace is None or trace is False:
+        return None
+    if trace is True:
+        return CrawlTracer()
+    return trace
@@ -0,0 +1,288 @@
+import math
+import hashlib
+import threading
+from array import array
+
+
+def _digest(key):
+    """Returns a 128-bit hash of a node identifier, as two 64-bit integers."""
+    if not isinstance(key, bytes):
+        key = str(key).encode("utf-8")
+    digest = hashlib.blake2b(key, digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+class VisitedSet:
+    """Base class of the compact sets of visited node identifiers used to deduplicate large crawls.
+
+    A visited set only answers membership queries: it does not keep the identifiers themselves, so it needs a small
+    fixed number of bytes per identifier instead of a string, a node object and a graph entry. Sets are safe to use
+    from several threads.
+
+    Methods
+    -------
+    add(key)
+        Adds an identifier to the set.
+    __contains__(key)
+        Checks whether an identifier was added to the set.
+    __len__()
+        Returns the number of identifiers added to the set.
+    nbytes
+        The memory used by the set, in bytes.
+    """
+
+    def add(self, key):
+        """Adds an identifier to the set.
+
+        Parameters
+        ----------
+        key : str or bytes
+            The identifier of a node.
+        """
+        raise NotImplementedError
+
+    def __contains__(self, key):
+        """Checks whether an identifier was added to the set.
+
+        Parameters
+        ----------
+        key : str or bytes
+            The identifier of a node.
+
+        Returns
+        -------
+        bool
+            True if the identifier was added (or, for probabilistic sets, possibly added), False otherwise.
+        """
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    @property
+    def nbytes(self):
+        """The memory used by the set, in bytes.
+
+        Returns
+        -------
+        int
+            The size of the underlying buffers.
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} keys, {self.nbytes} bytes)"
+
+
+class HashVisitedSet(VisitedSet):
+    """An exact visited set storing a 64-bit hash of every identifier in an open-addressing table.
+
+    Hashes are kept in a flat `array` of unsigned 64-bit integers with linear probing, so an identifier costs 8
+    bytes divided by the load factor (at most 0.7), i.e. about 16 bytes, instead of the ~100 bytes of a Python
+    string in a `set`. Two distinct identifiers are only confused if their 64-bit hashes collide, which has a
+    probability of about `n**2 / 2**65` for `n` identifiers (one in a few thousand crawls of 100 million URLs).
+
+    Parameters
+    ----------
+    capacity : int, optional
+        The number of identifiers the table is sized for. It grows as needed. Defaults to 1024.
+    """
+
+    MAX_LOAD = 0.7
+
+    def __init__(self, capacity=1024):
+        """Initializes an empty set.
+
+        Parameters
+        ----------
+        capacity : int, optional
+            The number of identifiers the table is initially sized for. Defaults to 1024.
+        """
+        size = 8
+        while size * self.MAX_LOAD < capacity:
+            size *= 2
+        self._table = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash(key):
+        # 0 marks an empty slot
+        return _digest(key)[0] or 1
+
+    def _find(self, value):
+        table, mask = self._table, self._mask
+        index = value & mask
+        while True:
+            slot = table[index]
+            if slot == value or slot == 0:
+                return index
+            index = (index + 1) & mask
+
+    def _grow(self):
+        old_table = self._table
+        self._table = array("Q", bytes(16 * len(old_table)))
+        self._mask = len(self._table) - 1
+        for value in old_table:
+            if value:
+                self._table[self._find(value)] = value
+
+    def add(self, key):
+        value = self._hash(key)
+        with self._lock:
+            index = self._find(value)
+            if self._table[index] == 0:
+                self._table[index] = value
+                self._count += 1
+                if self._count > self.MAX_LOAD * len(self._table):
+                    self._grow()
+
+    def __contains__(self, key):
+        value = self._hash(key)
+        with self._lock:
+            return self._table[self._find(value)] == value
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        return self._table.itemsize * len(self._table)
+
+
+class BloomFilter(VisitedSet):
+    """A scalable Bloom filter: a probabilistic visited set using about 1.2 bytes per identifier at a 1% error rate.
+
+    Membership queries may return false positives (an identifier never added is reported as visited, and its node
+    is then never crawled) with a probability below `error_rate`, but never false negatives. The filter starts with
+    room for `capacity` identifiers; when it is full, a new filter twice as large and with half the error rate is
+    chained to it, so the total false positive rate stays below `error_rate` however many identifiers are added
+    (Almeida et al., "Scalable Bloom Filters", 2007).
+
+    Parameters
+    ----------
+    capacity : int, optional
+        The number of identifiers of the first filter. Defaults to 1,000,000.
+    error_rate : float, optional
+        The target false positive rate, between 0 and 1. Defaults to 0.001.
+
+    Raises
+    ------
+    ValueError
+        If `capacity` is not positive or `error_rate` is not between 0 and 1.
+
+    Examples
+    --------
+    >>> visited = BloomFilter(capacity=10_000_000, error_rate=0.001)
+    >>> visited.add("https://example.com/")
+    >>> "https://example.com/" in visited
+    True
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        """Initializes an empty filter.
+
+        Parameters
+        ----------
+        capacity : int, optional
+            The number of identifiers of the first filter. Defaults to 1,000,000.
+        error_rate : float, optional
+            The target false positive rate. Defaults to 0.001.
+        """
+        if capacity <= 0:
+            raise ValueError(f"The capacity of a Bloom filter must be positive, got {capacity}")
+        if not 0 < error_rate < 1:
+            raise ValueError(f"The error rate of a Bloom filter must be between 0 and 1, got {error_rate}")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._count = 0
+        self._slices = []  # [bits, number of bits, number of hashes, capacity, count]
+        self._lock = threading.Lock()
+        self._add_slice(capacity, error_rate / 2)
+
+    def _add_slice(self, capacity, error_rate):
+        bit_count = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        hash_count = max(1, round(bit_count / capacity * math.log(2)))
+        self._slices.append([bytearray((bit_count + 7) // 8), bit_count, hash_count, capacity, 0])
+
+    @staticmethod
+    def _positions(h1, h2, bit_count, hash_count):
+        # Double hashing (Kirsch and Mitzenmacher): the k positions are h1 + i * h2, modulo the number of bits
+        position, step = h1 % bit_count, (h2 | 1) % bit_count
+        for _ in range(hash_count):
+            yield position
+            position += step
+            if position >= bit_count:
+                position -= bit_count
+
+    def _contains(self, h1, h2):
+        # The most recent slices hold most of the identifiers, so they are looked at first
+        for bits, bit_count, hash_count, _, _ in reversed(self._slices):
+            positions = self._positions(h1, h2, bit_count, hash_count)
+            if all(bits[position >> 3] >> (position & 7) & 1 for position in positions):
+                return True
+        return False
+
+    def add(self, key):
+        h1, h2 = _digest(key)
+        with self._lock:
+            if self._contains(h1, h2):
+                return
+            current = self._slices[-1]
+            if current[4] >= current[3]:
+                error_rate = self.error_rate / 2 ** (len(self._slices) + 1)
+                self._add_slice(2 * current[3], error_rate)
+                current = self._slices[-1]
+
+            bits, bit_count, hash_count, _, _ = current
+            for position in self._positions(h1, h2, bit_count, hash_count):
+                bits[position >> 3] |= 1 << (position & 7)
+            current[4] += 1
+            self._count += 1
+
+    def __contains__(self, key):
+        # Bits are only ever set, and slices only appended, so lookups need no lock
+        return self._contains(*_digest(key))
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        return sum(len(bits) for bits, _, _, _, _ in self._slices)
+
+
+VISITED_SETS = {
+    "hash": HashVisitedSet,
+    "bloom": BloomFilter,
+}
+
+
+def get_visited_set(visited=None, **options):
+    """Returns a new visited set matching a name.
+
+    Parameters
+    ----------
+    visited : str or VisitedSet, optional
+        The name of a set in `VISITED_SETS` ("hash" or "bloom"), or a set instance, returned as is. If None, None
+        is returned and the crawl deduplicates nodes against its graph.
+    **options : dict, optional
+        Options of the set (e.g. `error_rate` for "bloom").
+
+    Returns
+    -------
+    VisitedSet or None
+        The visited set.
+
+    Raises
+    ------
+    ValueError
+        If the name does not match any visited set.
+    """
+    if visited is None or isinstance(visited, VisitedSet):
+        return visited
+    if visited not in VISITED_SETS:
+        raise ValueError(f"Unsupported visited set: {visited} (expected one of {', '.join(VISITED_SETS)})")
+    return VISITED_SETS[visited](**options)
@@ -0,0 +1,210 @@
+import os
+import time
+import hashlib
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from ..base.metrics import timed
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def write_file_atomically(path, data):
+    """Writes a file atomically, unless it already holds the same content.
+
+    The content is written to a temporary file in the same directory, which is then renamed over the target, so an
+    interrupted write never leaves a truncated file behind. Files of the same size as the new content are compared
+    by hash first, and left untouched if their content is unchanged.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file.
+    data : bytes
+        The content of the file.
+
+    Returns
+    -------
+    bool
+        True if the file was written, False if its content was unchanged.
+    """
+    try:
+        unchanged = os.path.getsize(path) == len(data) and _file_digest(path) == _digest(data)
+    except OSError:
+        unchanged = False  # The file does not exist yet
+    if unchanged:
+        return False
+
+    # A short name unique to the writing thread, as the target name may already be at the filesystem's length limit
+    temporary_path = os.path.join(
+        os.path.dirname(path), f".tmp-{os.getpid()}-{threading.get_ident()}"
+    )
+    try:
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, path)
+    except BaseException:
+        # The temporary file does not exist if it could not be created, which must not hide the original error
+        with contextlib.suppress(OSError):
+            os.unlink(temporary_path)
+        raise
+    return True
+
+
+class BulkWriter:
+    """Writes many files concurrently with a bounded thread pool.
+
+    Every file is written atomically and skipped if its content is unchanged (see `write_file_atomically`). Writes
+    are queued with `write` and performed by `workers` threads, which overlap the latency of slow (e.g. network)
+    filesystems. At most `2 * workers` writes are pending at a time, so `write` blocks when the producer is faster
+    than the filesystem, and contents are never all held in memory. The first error raised by a write is raised
+    again by `close`.
+
+    Parameters
+    ----------
+    directory : str
+        The directory where the files are written. It is created if it does not exist.
+    workers : int, optional
+        The number of writer threads. Defaults to 8.
+    metrics : CrawlMetrics, optional
+        If given, every write is timed as the `write` phase, and the bytes and files written are counted as
+        `bytes_out` and `files_written`. Defaults to None.
+
+    Attributes
+    ----------
+    written : int
+        The number of files written.
+    unchanged : int
+        The number of files skipped because their content was unchanged.
+    bytes_written : int
+        The number of bytes written.
+
+    Examples
+    --------
+    >>> with BulkWriter("output") as writer:
+    ...     writer.write("page.md", "# Page")
+    >>> writer.stats()
+    {'files': 1, 'written': 1, 'unchanged': 0, 'bytes': 6, 'seconds': ..., 'files_per_second': ..., ...}
+    """
+
+    def __init__(self, directory, workers=8, metrics=None):
+        """Initializes the writer and its thread pool.
+
+        Parameters
+        ----------
+        directory : str
+            The directory where the files are written.
+        workers : int, optional
+            The number of writer threads. Defaults to 8.
+        metrics : CrawlMetrics, optional
+            The metrics the writes are reported to. Defaults to None.
+        """
+        if not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.metrics = metrics
+        self.written = 0
+        self.unchanged = 0
+        self.bytes_written = 0
+        self._error = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(2 * workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="BulkWriter")
+        self._started_at = time.perf_counter()
+        self._finished_at = None
+
+    def write(self, filename, content):
+        """Queues a file to be written.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file, relative to the writer's directory.
+        content : str
+            The content of the file, encoded as UTF-8.
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._write, filename, content)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._done)
+
+    def _write(self, filename, content):
+        data = content.encode("utf-8")
+        with timed(self.metrics, "write", filename):
+            written = write_file_atomically(os.path.join(self.directory, filename), data)
+        if written and self.metrics is not None:
+            self.metrics.count("bytes_out", len(data))
+            self.metrics.count("files_written")
+        with self._lock:
+            if written:
+                self.written += 1
+                self.bytes_written += len(data)
+            else:
+                self.unchanged += 1
+
+    def _done(self, future):
+        self._slots.release()
+        error = future.exception()
+        if error is not None:
+            with self._lock:
+                if self._error is None:
+                    self._error = error
+
+    def close(self):
+        """Waits for the queued writes to complete, and raises the first error of a write, if any.
+
+        Returns
+        -------
+        dict
+            The statistics of the writer, see `stats`.
+        """
+        self._executor.shutdown(wait=True)
+        if self._finished_at is None:
+            self._finished_at = time.perf_counter()
+        if self._error is not None:
+            raise self._error
+        return self.stats()
+
+    def stats(self):
+        """Returns the statistics of the writer.
+
+        Returns
+        -------
+        dict
+            The number of files handled, written and unchanged, the number of bytes written, the elapsed seconds,
+            and the resulting files per second and bytes per second.
+        """
+        with self._lock:
+            finished_at = self._finished_at if self._finished_at is not None else time.perf_counter()
+            seconds = max(finished_at - self._started_at, 1e-9)
+            files = self.written + self.unchanged
+            return {
+                "files": files,
+                "written": self.written,
+                "unchanged": self.unchanged,
+                "bytes": self.bytes_written,
+                "seconds": seconds,
+                "files_per_second": files / seconds,
+                "bytes_per_second": self.bytes_written / seconds,
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,5 +1,14 @@
 import os
 import re
+import gzip
+
+from .bulk_writer import BulkWriter, write_file_atomically
+from ..base.metrics import timed
+
+# Size of the write buffer used when streaming a combined Markdown file
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
 
 
 def generate_filename_from_url(url):
@@ -31,59 +40,164 @@ def generate_filename_from_url(url):
     return safe_filename
 
 
-def save_content_to_multiple_files(url_text_dict, directory="output"):
+def save_content_to_file(url, markdown_text, directory="output"):
+    """Saves the content of one URL to its own Markdown file within the specified directory.
+
+    The file is named after the URL (see `generate_filename_from_url`) and starts with a header holding the URL.
+    It is written atomically, and left untouched if its content is unchanged. The target directory is expected to
+    exist.
+
+    Parameters
+    ----------
+    url : str
+        The URL the content was extracted from.
+    markdown_text : str
+        The Markdown text content of the URL.
+    directory : str, optional
+        The directory path where the file will be saved. Defaults to 'output'.
+    """
+    filename = generate_filename_from_url(url)
+    content = _file_content(url, markdown_text)
+    write_file_atomically(os.path.join(directory, filename), content.encode("utf-8"))
+
+
+def _file_content(url, markdown_text):
+    header = f"# Source URL: {url}\n\n"
+    return header + markdown_text
+
+
+def append_content_to_file(file, url, markdown_text):
+    """Appends the content of one URL to an open combined Markdown file.
+
+    The content is preceded by a header holding the URL and followed by a Markdown horizontal rule, which is the
+    format of `save_content_to_single_file`.
+
+    Parameters
+    ----------
+    file : file object
+        The combined Markdown file, opened for writing in text mode.
+    url : str
+        The URL the content was extracted from.
+    markdown_text : str
+        The Markdown text content of the URL.
+    """
+    file.write(f"# Source URL: {url}\n\n")
+    file.write(markdown_text)
+    file.write("\n\n---\n\n")
+
+
+def save_content_to_multiple_files(url_text_dict, directory="output", workers=8, metrics=None):
     """Saves content of each URL to its own Markdown file within the specified directory.
 
     Each URL's content is saved in a separate Markdown file named after the URL itself. The function
-    ensures the creation of the target directory if it does not already exist.
+    ensures the creation of the target directory if it does not already exist. Files are written concurrently by
+    a `BulkWriter`: each one atomically, and only if its content changed since a previous run.
 
     Parameters
     ----------
-    url_text_dict : dict
-        A dictionary where keys are URLs and values are their corresponding Markdown text content.
+    url_text_dict : dict or iterable of tuple
+        A dictionary where keys are URLs and values are their corresponding Markdown text content, or an iterable
+        of `(url, markdown_text)` pairs.
     directory : str, optional
         The directory path where files will be saved. Defaults to 'output'.
+    workers : int, optional
+        The number of writer threads. Defaults to 8.
+    metrics : CrawlMetrics, optional
+        If given, the writes are reported to these metrics (see `BulkWriter`). Defaults to None.
+
+    Returns
+    -------
+    dict
+        The statistics of the writer (see `BulkWriter.stats`), including files and bytes written per second.
     """
-    # Ensure target directory exists
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+    if hasattr(url_text_dict, "items"):
+        url_text_dict = url_text_dict.items()
 
     # Write each URL's content to a separate file
-    for url, markdown_text in url_text_dict.items():
-        filename = generate_filename_from_url(url)
-        header = f"# Source URL: {url}\n\n"
-        content = header + markdown_text
-        with open(os.path.join(directory, filename), "w", encoding="utf-8") as file:
-            file.write(content)
+    with BulkWriter(directory, workers=workers, metrics=metrics) as writer:
+        for url, markdown_text in url_text_dict:
+            writer.write(generate_filename_from_url(url), _file_content(url, markdown_text))
+    return writer.stats()
+
+
+def open_text_file(path, compression=None):
+    """Opens a text file for writing with a large write buffer, optionally compressing it on the fly.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file.
+    compression : {None, "gzip", "zstd"}, optional
+        The compression applied while writing. "zstd" requires the optional `zstandard` package. Defaults to None.
+
+    Returns
+    -------
+    file object
+        The file, opened for writing in text mode with UTF-8 encoding.
+    """
+    if compression is None:
+        return open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("zstd compression requires the 'zstandard' package") from e
+        return zstandard.open(path, "wt", encoding="utf-8")
+    raise ValueError(f"Unsupported compression: {compression}")
 
 
 def save_content_to_single_file(
-    url_text_dict, directory="output", filename="combined_output.md"
+    url_text_dict, directory="output", filename="combined_output.md", compression=None, metrics=None
 ):
     """Saves content of all URLs into a single Markdown file within the specified directory.
 
     Content from each URL is saved consecutively in the same file, separated by Markdown horizontal rules.
-    The function ensures the creation of the target directory if it does not already exist.
+    The function ensures the creation of the target directory if it does not already exist. The content is written
+    incrementally through a buffered file, so `url_text_dict` may be any iterable of `(url, markdown_text)` pairs
+    (such as a generator) and never needs to be held in memory at once.
 
     Parameters
     ----------
-    url_text_dict : dict
-        A dictionary where keys are URLs and values are their corresponding Markdown text content.
+    url_text_dict : dict or iterable of tuple
+        A dictionary where keys are URLs and values are their corresponding Markdown text content, or an iterable
+        of `(url, markdown_text)` pairs.
     directory : str, optional
         The directory path where the combined file will be saved. Defaults to 'output'.
     filename : str, optional
         The name of the file to save the combined content. Defaults to 'combined_output.md'.
+    compression : {None, "gzip", "zstd"}, optional
+        If given, the file is compressed on the fly and the matching extension is appended to `filename` (unless
+        already present). Defaults to None.
+    metrics : CrawlMetrics, optional
+        If given, the write of every page is timed as the `write` phase, and the size of the file is counted as
+        `bytes_out`. Defaults to None.
+
+    Returns
+    -------
+    str
+        The path of the saved file.
     """
     # Ensure target directory exists
     if not os.path.exists(directory):
         os.makedirs(directory)
 
-    # Combine all content into a single string
-    combined_content = ""
-    for url, markdown_text in url_text_dict.items():
-        header = f"# Source URL: {url}\n\n"
-        combined_content += header + markdown_text + "\n\n---\n\n"
-
-    # Write combined content to the specified file
-    with open(os.path.join(directory, filename), "w", encoding="utf-8") as file:
-        file.write(combined_content)
+    if compression is not None:
+        extension = COMPRESSION_EXTENSIONS.get(compression, "")
+        if not filename.endswith(extension):
+            filename += extension
+
+    if hasattr(url_text_dict, "items"):
+        url_text_dict = url_text_dict.items()
+
+    # Write each URL's content as soon as it is available
+    path = os.path.join(directory, filename)
+    with open_text_file(path, compression) as file:
+        for url, markdown_text in url_text_dict:
+            with timed(metrics, "write", url):
+                append_content_to_file(file, url, markdown_text)
+    if metrics is not None:
+        metrics.count("bytes_out", os.path.getsize(path))
+        metrics.count("files_written")
+    return path
@@ -0,0 +1,161 @@
+import re
+import fnmatch
+import ipaddress
+from urllib.parse import urlsplit
+
+from .url_utils import DEFAULT_PORTS
+
+# Characters that make an include/exclude rule a glob pattern rather than a URL prefix
+GLOB_CHARACTERS = "*?["
+
+
+def _parse_domain(domain):
+    """Returns the lower-cased `(host, port)` of an allowed domain, given as a host, `host:port` or a URL."""
+    if "://" not in domain:
+        domain = "//" + domain
+    parts = urlsplit(domain.strip())
+    host = (parts.hostname or "").lstrip("*.")
+    return host, parts.port
+
+
+def _is_ip_address(host):
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class _RuleSet:
+    """URL prefixes and glob patterns, matched with one `str.startswith` call and one compiled regex."""
+
+    def __init__(self, rules):
+        self.prefixes = tuple(rule for rule in rules if not any(c in rule for c in GLOB_CHARACTERS))
+        globs = [rule for rule in rules if any(c in rule for c in GLOB_CHARACTERS)]
+        self.pattern = re.compile("|".join(fnmatch.translate(glob) for glob in globs)) if globs else None
+
+    def __bool__(self):
+        return bool(self.prefixes) or self.pattern is not None
+
+    def match(self, url):
+        if url.startswith(self.prefixes):
+            return True
+        return self.pattern is not None and self.pattern.match(url) is not None
+
+
+class UrlMatcher:
+    """A precompiled filter of the URLs a crawler is allowed to visit.
+
+    A URL is allowed if its host is one of the allowed domains or a subdomain of one of them, if it matches at least
+    one include rule (when there are any), and if it matches no exclude rule. Domains are stored in hash sets, so a
+    host is checked by looking up its successive suffixes (`a.b.example.com`, `b.example.com`, `example.com`, ...),
+    in a number of steps that depends on its number of labels rather than on the number of allowed domains. Unlike a
+    substring test, `example.com` does not match `notexample.com` nor `evil.net/?example.com`.
+
+    Domains may carry a port (e.g. `127.0.0.1:8000`), in which case only that port is allowed (the default port of
+    the scheme when a URL has none); a domain without a port allows every port. Rules are either URL prefixes
+    (`https://example.com/docs/`) or, if they contain `*`, `?` or `[`, glob patterns matched against the whole URL
+    (`*/tag/*`).
+
+    Parameters
+    ----------
+    domains : iterable of str, optional
+        The allowed domains, as hosts, `host:port` or URLs. If empty, every host is allowed.
+    include : iterable of str, optional
+        URL prefixes or glob patterns; if any is given, a URL must match one of them.
+    exclude : iterable of str, optional
+        URL prefixes or glob patterns; a URL matching one of them is rejected.
+
+    Examples
+    --------
+    >>> matcher = UrlMatcher(["example.com"], exclude=["*/private/*"])
+    >>> matcher.match("https://docs.example.com/guide")
+    True
+    >>> matcher.match("https://notexample.com/?example.com")
+    False
+    >>> matcher.match("https://example.com/private/page")
+    False
+    """
+
+    def __init__(self, domains=(), include=(), exclude=()):
+        """Compiles the domains and rules.
+
+        Parameters
+        ----------
+        domains : iterable of str, optional
+            The allowed domains. Defaults to no restriction.
+        include : iterable of str, optional
+            The include rules. Defaults to none.
+        exclude : iterable of str, optional
+            The exclude rules. Defaults to none.
+        """
+        self.hosts = set()
+        self.host_ports = set()
+        for domain in domains:
+            host, port = _parse_domain(domain)
+            if port is None:
+                self.hosts.add(host)
+            else:
+                self.host_ports.add((host, port))
+        self.include = _RuleSet(list(include))
+        self.exclude = _RuleSet(list(exclude))
+
+    def match_host(self, host, port=None):
+        """Checks whether a host (and port) belongs to the allowed domains.
+
+        Parameters
+        ----------
+        host : str
+            The lower-cased host name.
+        port : int, optional
+            The port of the URL (or the default port of its scheme).
+
+        Returns
+        -------
+        bool
+            True if the host is an allowed domain or one of its subdomains.
+        """
+        if not self.hosts and not self.host_ports:
+            return True
+        if host in self.hosts or (host, port) in self.host_ports:
+            return True
+        if host[-1:].isdigit() and _is_ip_address(host):
+            return False
+
+        # Walk the parent domains: a.b.example.com -> b.example.com -> example.com -> com
+        index = host.find(".")
+        while index != -1:
+            suffix = host[index + 1:]
+            if suffix in self.hosts or (suffix, port) in self.host_ports:
+                return True
+            index = host.find(".", index + 1)
+        return False
+
+    def match(self, url):
+        """Checks whether a URL is allowed.
+
+        Parameters
+        ----------
+        url : str
+            The absolute URL to check.
+
+        Returns
+        -------
+        bool
+            True if the URL passes the domain, include and exclude filters.
+        """
+        if self.hosts or self.host_ports:
+            try:
+                parts = urlsplit(url)
+                host, port = parts.hostname, parts.port or DEFAULT_PORTS.get(parts.scheme)
+            except ValueError:
+                return False
+            if host is None or not self.match_host(host, port):
+                return False
+        if self.include and not self.include.match(url):
+            return False
+        return not (self.exclude and self.exclude.match(url))
+
+    def __repr__(self):
+        domains = sorted(self.hosts) + sorted(f"{host}:{port}" for host, port in self.host_ports)
+        return f"UrlMatcher(domains={domains})"
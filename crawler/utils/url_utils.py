@@ -0,0 +1,244 @@
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """Normalizes a URL so that trivially different spellings of the same page share one key.
+
+    The scheme and host are lower-cased, default ports and fragments are dropped and an empty path is replaced by
+    `/`. The rest of the URL is kept untouched.
+
+    Parameters
+    ----------
+    url : str
+        The URL to normalize.
+
+    Returns
+    -------
+    str
+        The normalized URL. URLs that cannot be parsed are returned unchanged.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+
+    if port is not None and DEFAULT_PORTS.get(scheme) == port:
+        netloc = netloc.rsplit(":", 1)[0]
+
+    path = parts.path or "/"
+    return urlunsplit((scheme, netloc, path, parts.query, ""))
+
+
+# Query parameters that only track the origin of a visit and never change the content of a page. A trailing `*`
+# matches every parameter starting with the preceding prefix.
+TRACKING_PARAMS = (
+    "utm_*",
+    "fbclid",
+    "gclid",
+    "dclid",
+    "gbraid",
+    "wbraid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+)
+
+
+def remove_dot_segments(path):
+    """Resolves the `.` and `..` segments of a URL path, as specified by RFC 3986 (section 5.2.4).
+
+    Parameters
+    ----------
+    path : str
+        The path of a URL.
+
+    Returns
+    -------
+    str
+        The path without dot segments.
+
+    Examples
+    --------
+    >>> remove_dot_segments("/a/b/../c/./d")
+    '/a/c/d'
+    """
+    if "." not in path:
+        return path
+
+    segments = path.split("/")
+    output = []
+    for segment in segments:
+        if segment == "..":
+            if len(output) > 1:
+                output.pop()
+        elif segment != ".":
+            output.append(segment)
+    # A path ending with a dot segment designates a directory
+    if segments[-1] in (".", ".."):
+        output.append("")
+    return "/".join(output)
+
+
+class UrlCanonicalizer:
+    """A configurable URL canonicalizer, giving every spelling of the same page a single identifier.
+
+    The scheme and host are always lower-cased (they are case-insensitive), and an empty path becomes `/`. The
+    other rules can be turned off one by one for sites that give them a meaning.
+
+    Parameters
+    ----------
+    remove_default_port : bool, optional
+        If True, `:80` is dropped from `http` URLs and `:443` from `https` URLs. Defaults to True.
+    remove_dot_segments : bool, optional
+        If True, the `.` and `..` segments of the path are resolved. Defaults to True.
+    remove_fragment : bool, optional
+        If True, the fragment (`#...`) is dropped. Defaults to True.
+    sort_query : bool, optional
+        If True, the query parameters are sorted by name (the order of repeated parameters is kept). Defaults to
+        True.
+    strip_params : iterable of str, optional
+        The names of the query parameters to remove, a trailing `*` matching any suffix. Defaults to
+        `TRACKING_PARAMS`; an empty sequence keeps every parameter.
+    trailing_slash : {"keep", "strip", "add"}, optional
+        Whether a trailing slash of a non-empty path is kept as is, removed, or added to paths whose last segment
+        has no file extension. Defaults to "keep", as relative links resolve differently from `/a` and `/a/`.
+
+    Examples
+    --------
+    >>> canonicalizer = UrlCanonicalizer(trailing_slash="strip")
+    >>> canonicalizer.canonicalize("HTTP://Example.com:80/a/./b/?utm_source=x&b=2&a=1#top")
+    'http://example.com/a/b?a=1&b=2'
+    """
+
+    TRAILING_SLASH_MODES = ("keep", "strip", "add")
+
+    def __init__(
+        self,
+        remove_default_port=True,
+        remove_dot_segments=True,
+        remove_fragment=True,
+        sort_query=True,
+        strip_params=TRACKING_PARAMS,
+        trailing_slash="keep",
+    ):
+        """Initializes the canonicalizer.
+
+        Parameters
+        ----------
+        remove_default_port : bool, optional
+            If True, default ports are dropped. Defaults to True.
+        remove_dot_segments : bool, optional
+            If True, dot segments are resolved. Defaults to True.
+        remove_fragment : bool, optional
+            If True, fragments are dropped. Defaults to True.
+        sort_query : bool, optional
+            If True, query parameters are sorted by name. Defaults to True.
+        strip_params : iterable of str, optional
+            The query parameters to remove. Defaults to `TRACKING_PARAMS`.
+        trailing_slash : {"keep", "strip", "add"}, optional
+            The handling of trailing slashes. Defaults to "keep".
+
+        Raises
+        ------
+        ValueError
+            If `trailing_slash` is not one of the supported modes.
+        """
+        if trailing_slash not in self.TRAILING_SLASH_MODES:
+            raise ValueError(
+                f"Unsupported trailing slash mode: {trailing_slash} "
+                f"(expected one of {', '.join(self.TRAILING_SLASH_MODES)})"
+            )
+        self.remove_default_port = remove_default_port
+        self.remove_dot_segments = remove_dot_segments
+        self.remove_fragment = remove_fragment
+        self.sort_query = sort_query
+        self.trailing_slash = trailing_slash
+
+        strip_params = list(strip_params)
+        self._stripped_names = frozenset(name for name in strip_params if not name.endswith("*"))
+        self._stripped_prefixes = tuple(name[:-1] for name in strip_params if name.endswith("*"))
+
+    def _is_stripped(self, name):
+        return name in self._stripped_names or (
+            bool(self._stripped_prefixes) and name.startswith(self._stripped_prefixes)
+        )
+
+    def _canonical_query(self, query):
+        if not query:
+            return query
+        # Parameters are compared by their raw name and never re-encoded, so that their values are kept verbatim
+        parameters = [parameter for parameter in query.split("&") if parameter]
+        if self._stripped_names or self._stripped_prefixes:
+            parameters = [
+                parameter
+                for parameter in parameters
+                if not self._is_stripped(parameter.split("=", 1)[0])
+            ]
+        if self.sort_query:
+            parameters.sort(key=lambda parameter: parameter.split("=", 1)[0])
+        return "&".join(parameters)
+
+    def _canonical_path(self, path):
+        if not path:
+            return "/"
+        if self.remove_dot_segments:
+            path = remove_dot_segments(path)
+        if self.trailing_slash == "strip" and len(path) > 1 and path.endswith("/"):
+            path = path.rstrip("/") or "/"
+        elif self.trailing_slash == "add" and not path.endswith("/"):
+            if "." not in path.rsplit("/", 1)[-1]:
+                path += "/"
+        return path
+
+    def canonicalize(self, url):
+        """Returns the canonical form of a URL.
+
+        Parameters
+        ----------
+        url : str
+            The absolute URL to canonicalize.
+
+        Returns
+        -------
+        str
+            The canonical URL. URLs that cannot be parsed are returned unchanged.
+        """
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError:
+            return url
+
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower()
+        if netloc.endswith("."):
+            netloc = netloc[:-1]
+        if self.remove_default_port and port is not None and DEFAULT_PORTS.get(scheme) == port:
+            netloc = netloc.rsplit(":", 1)[0]
+
+        path = self._canonical_path(parts.path)
+        query = self._canonical_query(parts.query)
+        fragment = "" if self.remove_fragment else parts.fragment
+        return urlunsplit((scheme, netloc, path, query, fragment))
+
+    def __call__(self, url):
+        return self.canonicalize(url)
+
+    def __repr__(self):
+        return (
+            f"UrlCanonicalizer(sort_query={self.sort_query}, trailing_slash={self.trailing_slash!r}, "
+            f"stripped_params={len(self._stripped_names) + len(self._stripped_prefixes)})"
+        )
+
+
+DEFAULT_CANONICALIZER = UrlCanonicalizer()
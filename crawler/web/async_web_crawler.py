@@ -0,0 +1,343 @@
+import asyncio
+import logging
+from functools import partial
+from collections import deque
+
+import aiohttp
+
+from .web_crawler import WebCrawler
+from .web_graph import WebGraph
+from ..base.metrics import timed
+
+
+class AsyncWebCrawler(WebCrawler):
+    """A web crawler driven by an asyncio event loop instead of blocking HTTP calls.
+
+    This class extends `WebCrawler` with asynchronous `crawl` and `crawl_multiple_urls` methods. Pages are fetched with `aiohttp`, with a
+    bounded semaphore limiting the number of in-flight requests across the whole crawl, while the CPU-heavy HTML
+    parsing and link extraction are handed off to a thread pool so that they never block the event loop. The crawl
+    follows the same BFS semantics as `BaseCrawler.crawl` and returns the same `WebGraph`, so `save_to_*` and
+    `visualize` keep working on its result. The blocking crawls of `WebCrawler` (`iter_crawl`, `resume` and
+    `iter_resume`) are not available on this class: they raise a `NotImplementedError`.
+
+    Parameters
+    ----------
+    allowed_domains : list of str, optional
+        A list specifying domains that the crawler is allowed to access. If empty, no domain restrictions are
+        applied. Defaults to an empty list.
+    concurrency : int, optional
+        The maximum number of HTTP requests in flight at any time. Defaults to 100.
+    timeout : float, optional
+        The total timeout, in seconds, of each HTTP request. Defaults to 5.
+    session : HttpSession, optional
+        The pooled blocking HTTP session used by nodes that are fetched outside the crawl. Defaults to a new
+        `HttpSession`.
+    cache : PageCache, optional
+        The page cache shared by all the nodes created by the crawler. Defaults to a new `PageCache`.
+    lean : bool, optional
+        If True, the nodes created by the crawler run in memory-lean mode. Defaults to False.
+    parser : str or HtmlParser, optional
+        The HTML parser backend of the nodes created by the crawler, or its name. Defaults to "html.parser".
+    include : list of str, optional
+        URL prefixes or glob patterns; if any is given, only the URLs matching one of them are crawled.
+    exclude : list of str, optional
+        URL prefixes or glob patterns of URLs that are never crawled.
+
+    Methods
+    -------
+    crawl(start_node_id, max_depth=1)
+        Asynchronously performs the crawling process starting from a given URL up to a specified depth.
+    crawl_multiple_urls(urls, max_depth=1)
+        Asynchronously performs a crawl starting from multiple URLs, building a single graph.
+    fetch_html(http_session, node)
+        Asynchronously fetches the HTML content of the web page represented by a node.
+    visit_node_neighborhood_async(http_session, node)
+        Asynchronously fetches a node and returns its neighboring nodes within the allowed domains.
+
+    Examples
+    --------
+    >>> crawler = AsyncWebCrawler(allowed_domains=['example.com'], concurrency=50)
+    >>> crawl_subgraph = asyncio.run(crawler.crawl('https://example.com', max_depth=2))
+    >>> crawl_subgraph.save_to_multiple_files('output')
+    """
+
+    def __init__(
+        self,
+        allowed_domains=[],
+        concurrency=100,
+        timeout=5,
+        session=None,
+        cache=None,
+        lean=False,
+        parser=None,
+        include=None,
+        exclude=None,
+        graph_store=None,
+        dedup=None,
+        metrics=None,
+        trace=None,
+    ):
+        """Initializes the AsyncWebCrawler with domain restrictions and concurrency limits.
+
+        Parameters
+        ----------
+        allowed_domains : list of str, optional
+            Specifies the domains that the crawler is allowed to access. Defaults to an empty list, implying no
+            restrictions.
+        concurrency : int, optional
+            The maximum number of HTTP requests in flight at any time. Defaults to 100.
+        timeout : float, optional
+            The total timeout, in seconds, of each HTTP request. Defaults to 5.
+        session : HttpSession, optional
+            The pooled blocking HTTP session used by nodes that are fetched outside the crawl (e.g. leaf nodes
+            converted to Markdown). Defaults to a new `HttpSession`.
+        cache : PageCache, optional
+            The page cache shared by all the nodes created by the crawler. Defaults to a new `PageCache`.
+        lean : bool, optional
+            If True, the nodes created by the crawler run in memory-lean mode. Defaults to False.
+        parser : str or HtmlParser, optional
+            The HTML parser backend of the nodes created by the crawler, or its name. Defaults to "html.parser".
+        include : list of str, optional
+            URL prefixes or glob patterns the crawled URLs must match. Defaults to None (no restriction).
+        exclude : list of str, optional
+            URL prefixes or glob patterns of URLs that are never crawled. Defaults to None.
+        graph_store : {None, "networkx", "compact"}, optional
+            The storage engine of the crawled graphs (see `BaseGraph`). Defaults to None ("networkx").
+        dedup : {None, "exact", "near"} or ContentDeduplicator, optional
+            If given, expanded pages with the same content as a page crawled earlier are merged into it instead of
+            being expanded again (see `WebCrawler`). Defaults to None.
+        metrics : bool or CrawlMetrics, optional
+            The metrics the crawl is instrumented with (see `WebCrawler`). Requests sent by the event loop are
+            timed as the `download` phase. Defaults to None.
+        trace : bool or CrawlTracer, optional
+            The tracer recording the timed phases as spans (see `WebCrawler`). Requests run concurrently on the
+            thread of the event loop, so their spans overlap on its track. Defaults to None.
+        """
+        super().__init__(
+            allowed_domains=allowed_domains,
+            session=session,
+            cache=cache,
+            lean=lean,
+            parser=parser,
+            include=include,
+            exclude=exclude,
+            graph_store=graph_store,
+            dedup=dedup,
+            metrics=metrics,
+            trace=trace,
+        )
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    async def fetch_html(self, http_session, node):
+        """Asynchronously fetches the HTML content of the web page represented by a node.
+
+        Parameters
+        ----------
+        http_session : aiohttp.ClientSession
+            The HTTP session used to issue the request.
+        node : WebNode
+            The node whose web page should be fetched.
+
+        Returns
+        -------
+        str
+            The HTML content of the web page, or an empty string if it could not be fetched.
+        """
+        html, _ = await self._fetch_page(http_session, node)
+        return html
+
+    async def _fetch_page(self, http_session, node):
+        # Returns the HTML of the page and the URL it was served from, after redirects
+        metrics = self.metrics
+        async with self._semaphore:
+            try:
+                with timed(metrics, "download", node.url):
+                    async with http_session.get(node.url) as response:
+                        body = await response.read()
+                if metrics is not None:
+                    metrics.count("bytes_in", len(body))
+                    metrics.count("pages_fetched" if response.status == 200 else "pages_failed")
+                if response.status == 200:
+                    html = body.decode(response.get_encoding(), errors="replace")
+                    logging.info("Fetched %s webpage url", str(node.url))
+                    return html, str(response.url)
+                logging.warning("Failed to access %s: %s", str(node.url), str(response.status))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.warning("Failed to access %s: %s", str(node.url), str(e))
+                if metrics is not None:
+                    metrics.count("pages_failed")
+        return "", None
+
+    async def visit_node_neighborhood_async(self, http_session, node):
+        """Asynchronously fetches the web page of a node and returns its neighboring nodes within the allowed
+        domains.
+
+        Parameters
+        ----------
+        http_session : aiohttp.ClientSession
+            The HTTP session used to issue the request.
+        node : WebNode
+            The node whose neighborhood is to be visited.
+
+        Returns
+        -------
+        list of WebNode
+            A list of WebNode instances representing the allowable neighboring nodes linked from the given node.
+        """
+        html, final_url = self.cache.get(node.url), None
+        if html is None:
+            html, final_url = await self._fetch_page(http_session, node)
+        loop = asyncio.get_running_loop()
+        # Parsing is CPU bound, so it runs in the default thread pool to keep the event loop responsive
+        return await loop.run_in_executor(None, self._parse_neighborhood, node, html, final_url)
+
+    def _parse_neighborhood(self, node, html, final_url=None):
+        node.load_html(html, final_url=final_url)
+        return self.visit_node_neighborhood(node)
+
+    async def crawl(self, start_node_id, max_depth=1):
+        """Asynchronously performs the crawling process using Breadth-First Search (BFS).
+
+        Neighborhood visits are scheduled as soon as a node is discovered and run concurrently, bounded by
+        `concurrency`. Their results are merged in FIFO order, so the resulting graph is identical to the one built
+        by `WebCrawler.crawl`.
+
+        Parameters
+        ----------
+        start_node_id : str
+            The URL to start the crawling from.
+        max_depth : int, optional
+            The maximum depth to crawl. Default is 1.
+
+        Returns
+        -------
+        WebGraph
+            The subgraph created during the crawling process, containing nodes and edges explored.
+        """
+        crawl_subgraph = self.start_new_crawling_session(start_node_id)
+        # The root held by the graph is expanded, so that the graph keeps its fetched content
+        start_node = crawl_subgraph.all_nodes()[0]
+
+        self._semaphore = asyncio.BoundedSemaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        headers = {"User-Agent": self.session.session.headers["User-Agent"]}
+
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, headers=headers
+        ) as http_session:
+
+            async def visit(node):
+                neighbors = await self.visit_node_neighborhood_async(http_session, node)
+                fingerprint = None
+                if self.deduplicator is not None:
+                    fingerprint = await asyncio.get_running_loop().run_in_executor(
+                        None, partial(node.content_fingerprint, text=self.deduplicator.near_duplicates)
+                    )
+                return neighbors, fingerprint
+
+            def schedule_visit(node, depth):
+                if depth >= max_depth:
+                    return None
+                return asyncio.ensure_future(visit(node))
+
+            visiting_nodes = deque()
+            visiting_nodes.append((start_node, 0, schedule_visit(start_node, 0)))
+
+            try:
+                while len(visiting_nodes) > 0:
+                    current_node, current_depth, pending_visit = visiting_nodes.popleft()
+                    new_depth = current_depth + 1
+                    if self.metrics is not None:
+                        self.metrics.gauge("frontier", len(visiting_nodes) + 1)
+
+                    if new_depth > max_depth:
+                        continue
+
+                    with timed(self.metrics, "wait", current_node.url):
+                        neighbors, fingerprint = await pending_visit
+                    duplicate = False
+                    canonical_node = self.canonical_node(current_node)
+                    if canonical_node is not current_node:
+                        duplicate = canonical_node in crawl_subgraph
+                        current_node = crawl_subgraph.merge_alias(current_node, canonical_node)
+                    if not duplicate and fingerprint is not None:
+                        original_id = self.deduplicator.submit(current_node.id, fingerprint)
+                        if original_id is not None:
+                            crawl_subgraph.merge_alias(current_node, self.get_node(original_id))
+                            continue
+
+                    for child_node in neighbors:
+                        if child_node not in crawl_subgraph:
+                            child_node.depth = new_depth
+                            child_node.parent = current_node
+                            crawl_subgraph.add_node(child_node)
+                            visiting_nodes.append(
+                                (child_node, new_depth, schedule_visit(child_node, new_depth))
+                            )
+
+                        crawl_subgraph.add_edge(current_node, child_node, depth=new_depth)
+            finally:
+                for _, _, pending_visit in visiting_nodes:
+                    if pending_visit is not None:
+                        pending_visit.cancel()
+
+        return crawl_subgraph
+
+    async def crawl_multiple_urls(self, urls, max_depth=1):
+        """Asynchronously performs a crawl starting from multiple URLs, building a single graph.
+
+        Every URL is crawled in its own crawling session, restricted to its own domain, one after the other, and the
+        resulting subgraphs are merged into a single `WebGraph` instance, as in `WebCrawler.crawl_multiple_urls`.
+
+        Parameters
+        ----------
+        urls : list of str
+            A list of URLs to start crawling from.
+        max_depth : int, optional
+            The maximum depth to crawl from each starting URL. Defaults to 1.
+
+        Returns
+        -------
+        WebGraph
+            The combined `WebGraph` containing all nodes and edges explored from the provided URLs.
+        """
+        crawl_subgraph = WebGraph(store=self.graph_store)
+        for url in urls:
+            subgraph = await self.crawl(url, max_depth=max_depth)
+            crawl_subgraph.update(subgraph)  # Merge subgraphs
+        return crawl_subgraph
+
+    def _unsupported(self, method):
+        raise NotImplementedError(f"AsyncWebCrawler does not support {method}, use WebCrawler instead")
+
+    def iter_crawl(self, *args, **kwargs):
+        """Not supported by the asynchronous crawler.
+
+        Raises
+        ------
+        NotImplementedError
+            Always, streaming crawls are only available on `WebCrawler`.
+        """
+        self._unsupported("iter_crawl")
+
+    def resume(self, *args, **kwargs):
+        """Not supported by the asynchronous crawler.
+
+        Raises
+        ------
+        NotImplementedError
+            Always, checkpointed crawls are only available on `WebCrawler`.
+        """
+        self._unsupported("resume")
+
+    def iter_resume(self, *args, **kwargs):
+        """Not supported by the asynchronous crawler.
+
+        Raises
+        ------
+        NotImplementedError
+            Always, checkpointed crawls are only available on `WebCrawler`.
+        """
+        self._unsupported("iter_resume")
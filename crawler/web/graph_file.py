@@ -0,0 +1,274 @@
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import threading
+from array import array
+
+from .web_node import WebNode
+from .page_cache import PageCache
+from ..base.graph_store import CompactStore
+
+# File layout: a fixed preamble, the sections (each aligned on 8 bytes), then a JSON footer describing them
+MAGIC = b"WEBGRAPH"
+VERSION = 1
+PREAMBLE = struct.Struct("<8sIIQQ")  # magic, version, reserved, footer offset, footer length
+
+# Sections holding a typed array, by name
+ARRAY_SECTIONS = {
+    "id_offsets": "Q",
+    "url_offsets": "Q",
+    "depths": "i",
+    "parents": "i",
+    "edge_offsets": "Q",
+    "edge_targets": "I",
+    "edge_depths": "i",
+    "content_offsets": "Q",
+}
+
+
+class _SectionWriter:
+    """Writes the sections of a graph file, recording their position for the footer."""
+
+    def __init__(self, file):
+        self.file = file
+        self.sections = {}
+
+    def _align(self):
+        padding = -self.file.tell() % 8
+        if padding:
+            self.file.write(b"\0" * padding)
+
+    def write(self, name, data):
+        self._align()
+        start = self.file.tell()
+        self.file.write(data)
+        self.sections[name] = [start, self.file.tell() - start]
+
+    def write_chunks(self, name, chunks):
+        """Writes a section from an iterable of byte strings, returning the offset of every chunk in the section."""
+        self._align()
+        start = self.file.tell()
+        offsets = array("Q", [0])
+        for chunk in chunks:
+            self.file.write(chunk)
+            offsets.append(offsets[-1] + len(chunk))
+        self.sections[name] = [start, offsets[-1]]
+        return offsets
+
+
+def _write_strings(writer, name, offsets_name, strings):
+    blob = bytearray()
+    offsets = array("Q", [0])
+    for string in strings:
+        blob += string.encode("utf-8")
+        offsets.append(len(blob))
+    writer.write(name, blob)
+    writer.write(offsets_name, offsets.tobytes())
+
+
+def _node_content(node, compression_level):
+    """Returns the zlib-compressed HTML of a node, fetching it if needed."""
+    if node._html_z is not None:
+        return bytes(node._html_z)
+    return zlib.compress(node._raw_html().encode("utf-8"), compression_level)
+
+
+def _build_csr(edges, index):
+    """Returns the CSR offsets, targets and depths of edges, renumbered by position in the node table."""
+    keys = {}
+    for u_id, v_id, attributes in edges:
+        u, v = index.get(u_id), index.get(v_id)
+        if u is not None and v is not None:
+            keys[(u << 32) | v] = attributes.get("depth", CompactStore.NO_DEPTH)
+    offsets = array("Q", bytes(8 * (len(index) + 1)))
+    targets, depths = array("I"), array("i")
+    for key in sorted(keys):
+        offsets[(key >> 32) + 1] += 1
+        targets.append(key & 0xFFFFFFFF)
+        depths.append(keys[key])
+    for position in range(len(index)):
+        offsets[position + 1] += offsets[position]
+    return offsets, targets, depths
+
+
+def save_web_graph(graph, path, content=True, compression_level=6):
+    """Saves a web graph to a binary file.
+
+    The file holds a columnar node table (identifiers, URLs, depths and parents), the edges in compressed sparse row
+    form, and optionally the zlib-compressed HTML of every page, so that the graph can be opened again with
+    `load_web_graph` without crawling. The file is written to a temporary file renamed over `path`.
+
+    Parameters
+    ----------
+    graph : WebGraph
+        The graph to save. Only the `depth` attribute of the edges is saved.
+    path : str
+        The path of the file.
+    content : bool, optional
+        If True, the HTML of every page is saved. Pages whose content was not fetched yet are fetched, as by
+        `to_markdown`. Defaults to True.
+    compression_level : int, optional
+        The zlib compression level of the page contents, from 0 (stored uncompressed) to 9. Defaults to 6. Contents
+        already compressed in memory (lean mode, or a loaded graph) are saved as they are.
+
+    Returns
+    -------
+    str
+        The path of the saved file.
+    """
+    nodes = graph.all_nodes()
+    index = {node.id: position for position, node in enumerate(nodes)}
+
+    if isinstance(graph.store, CompactStore) and len(nodes) == len(graph.store.ids):
+        # Every interned integer is a node, in the order of the node table: the adjacency is saved as is
+        edge_offsets, edge_targets, edge_depths = graph.store.csr()
+    else:
+        edge_offsets, edge_targets, edge_depths = _build_csr(graph.store.edges(), index)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    temporary_path = os.path.join(directory, f".tmp-{os.getpid()}-{threading.get_ident()}")
+    try:
+        with open(temporary_path, "wb") as file:
+            file.write(b"\0" * PREAMBLE.size)
+            writer = _SectionWriter(file)
+            _write_strings(writer, "ids", "id_offsets", [node.id for node in nodes])
+            urls = [node.url if node.url != node.id else "" for node in nodes]
+            _write_strings(writer, "urls", "url_offsets", urls)
+            writer.write("depths", array("i", [node.depth for node in nodes]).tobytes())
+            parents = array("i", [-1]) * len(nodes)
+            for position, node in enumerate(nodes):
+                if node.parent is not None:
+                    parents[position] = index.get(node.parent.id, -1)
+            writer.write("parents", parents.tobytes())
+            writer.write("edge_offsets", edge_offsets.tobytes())
+            writer.write("edge_targets", edge_targets.tobytes())
+            writer.write("edge_depths", edge_depths.tobytes())
+            if content:
+                content_offsets = writer.write_chunks(
+                    "contents", (_node_content(node, compression_level) for node in nodes)
+                )
+                writer.write("content_offsets", content_offsets.tobytes())
+
+            footer = {
+                "nodes": len(nodes),
+                "edges": len(edge_targets),
+                "byteorder": sys.byteorder,
+                "sections": writer.sections,
+                "aliases": graph.aliases,
+            }
+            footer_bytes = json.dumps(footer).encode("utf-8")
+            footer_offset = file.tell()
+            file.write(footer_bytes)
+            file.seek(0)
+            file.write(PREAMBLE.pack(MAGIC, VERSION, 0, footer_offset, len(footer_bytes)))
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    return path
+
+
+def load_web_graph(path, store="compact", session=None, cache=None, parser=None):
+    """Opens a web graph saved by `save_web_graph`.
+
+    The file is memory-mapped: the node and edge arrays are copied out of the mapping, the identifiers are decoded,
+    and nothing else is read. With the compact store, node objects are only created when they are accessed, and the
+    content of a page stays compressed in the mapping until it is converted to Markdown, so opening a graph costs
+    roughly one string per node, whatever the size of the pages.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file.
+    store : {"compact", "networkx"}, optional
+        The storage engine of the returned graph. With "networkx", all the node objects are created at once.
+        Defaults to "compact".
+    session : HttpSession, optional
+        The HTTP session of the nodes, used to fetch pages saved without content. Defaults to None.
+    cache : PageCache, optional
+        The page cache shared by the nodes. Defaults to a new `PageCache`.
+    parser : str or HtmlParser, optional
+        The HTML parser backend of the nodes. Defaults to "html.parser".
+
+    Returns
+    -------
+    WebGraph
+        The graph, with its nodes, edges, depths, parents and aliases.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a web graph file, or was written by an unsupported version.
+    """
+    from .web_graph import WebGraph
+
+    with open(path, "rb") as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapping) < PREAMBLE.size:
+        raise ValueError(f"{path} is not a web graph file")
+    magic, version, _, footer_offset, footer_length = PREAMBLE.unpack_from(mapping)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a web graph file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported web graph file version: {version} (expected {VERSION})")
+    footer = json.loads(mapping[footer_offset:footer_offset + footer_length])
+    sections = footer["sections"]
+
+    def read_array(name):
+        values = array(ARRAY_SECTIONS[name])
+        start, length = sections[name]
+        values.frombytes(mapping[start:start + length])
+        if footer["byteorder"] != sys.byteorder:
+            values.byteswap()
+        return values
+
+    def read_strings(name, offsets_name):
+        start, _ = sections[name]
+        offsets = read_array(offsets_name)
+        blob = mapping[start:start + offsets[-1]]
+        return [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+    ids = read_strings("ids", "id_offsets")
+    urls = read_strings("urls", "url_offsets")
+    content_offsets = read_array("content_offsets") if "content_offsets" in sections else None
+    content_start = sections["contents"][0] if "contents" in sections else 0
+    contents = memoryview(mapping)
+    cache = cache if cache is not None else PageCache()
+    node_count = len(ids)
+
+    def create_node(position):
+        if position >= node_count:
+            return None  # A node added after loading, through an edge only
+        node = WebNode(ids[position], session=session, cache=cache, parser=parser)
+        node.depth = compact.depths[position]
+        parent = compact.parents[position]
+        if parent >= 0:
+            node.parent = compact.get(ids[parent])
+        if urls[position]:
+            node._final_url = urls[position]
+        if content_offsets is not None:
+            start, end = content_offsets[position], content_offsets[position + 1]
+            node._html_z = contents[content_start + start:content_start + end]
+        return node
+
+    compact = CompactStore.from_arrays(
+        ids,
+        read_array("depths"),
+        read_array("parents"),
+        read_array("edge_offsets"),
+        read_array("edge_targets"),
+        read_array("edge_depths"),
+        create_node,
+    )
+    graph = WebGraph(store="compact")
+    graph.store = compact
+    graph.aliases.update(footer["aliases"])
+    if store == "compact":
+        return graph
+
+    copy = WebGraph(store=store)
+    copy.update(graph)
+    return copy
@@ -0,0 +1,197 @@
+from bs4 import BeautifulSoup
+
+from .link_extractor import is_canonical_relation
+
+
+class HtmlParser:
+    """Base class of the HTML parser backends of `WebNode`.
+
+    A backend turns raw HTML into a document object, exposed by `WebNode.soup`, and gives `WebNode` the `href`
+    attributes of its `a`, `base` and canonical `link` elements when links are read from an already parsed page. Link filtering stays
+    in `WebNode` and Markdown is converted from the original HTML, so every backend yields the same links and the
+    same Markdown for a page; they only differ in speed and in the type of the document they build.
+
+    Attributes
+    ----------
+    name : str
+        The name of the backend, as accepted by `get_parser`.
+
+    Methods
+    -------
+    parse(html)
+        Parses HTML content into a document.
+    hrefs(document)
+        Returns the `href` attributes of the `a` elements of a document.
+    base_href(document)
+        Returns the `href` attribute of the first `base` element of a document.
+    canonical_href(document)
+        Returns the `href` attribute of the first `<link rel="canonical">` element of a document.
+    """
+
+    name = None
+
+    def parse(self, html):
+        """Parses HTML content into a document.
+
+        Parameters
+        ----------
+        html : str
+            The HTML content.
+
+        Returns
+        -------
+        object
+            The parsed document.
+        """
+        raise NotImplementedError
+
+    def hrefs(self, document):
+        """Returns the `href` attributes of the `a` elements of a document, in document order.
+
+        Parameters
+        ----------
+        document : object
+            A document returned by `parse`.
+
+        Returns
+        -------
+        list of str or None
+            The `href` attribute of each `a` element, or None for the elements without one.
+        """
+        raise NotImplementedError
+
+    def base_href(self, document):
+        """Returns the `href` attribute of the first `base` element of a document.
+
+        Parameters
+        ----------
+        document : object
+            A document returned by `parse`.
+
+        Returns
+        -------
+        str or None
+            The base URL of the document, or None if it has none.
+        """
+        raise NotImplementedError
+
+    def canonical_href(self, document):
+        """Returns the `href` attribute of the first `link` element declaring the canonical URL of a document.
+
+        Parameters
+        ----------
+        document : object
+            A document returned by `parse`.
+
+        Returns
+        -------
+        str or None
+            The canonical URL declared by the document, or None if it declares none.
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}(name={self.name!r})"
+
+
+class SoupParser(HtmlParser):
+    """BeautifulSoup backend, with either Python's built-in "html.parser" or the faster "lxml" tree builder.
+
+    Parameters
+    ----------
+    features : {"html.parser", "lxml"}, optional
+        The BeautifulSoup tree builder. "lxml" requires the optional `lxml` package. Defaults to "html.parser".
+    """
+
+    def __init__(self, features="html.parser"):
+        if features == "lxml":
+            try:
+                import lxml  # noqa: F401
+            except ImportError as e:
+                raise ImportError("the 'lxml' parser requires the 'lxml' package") from e
+        self.name = features
+
+    def parse(self, html):
+        return BeautifulSoup(html, self.name)
+
+    def hrefs(self, document):
+        return [link.get("href") for link in document.find_all("a")]
+
+    def base_href(self, document):
+        base = document.find("base", href=True)
+        return base.get("href") if base is not None else None
+
+    def canonical_href(self, document):
+        for link in document.find_all("link", rel=True):
+            if is_canonical_relation(link.get("rel")):
+                return link.get("href")
+        return None
+
+
+class LexborParser(HtmlParser):
+    """Selector-based backend built on the Lexbor engine of `selectolax`, several times faster than BeautifulSoup.
+
+    Requires the optional `selectolax` package. `WebNode.soup` is then a `selectolax.lexbor.LexborHTMLParser`.
+    """
+
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError as e:
+            raise ImportError("the 'selectolax' parser requires the 'selectolax' package") from e
+        self._parser_class = LexborHTMLParser
+
+    def parse(self, html):
+        return self._parser_class(html)
+
+    def hrefs(self, document):
+        return [link.attributes.get("href") for link in document.css("a")]
+
+    def base_href(self, document):
+        base = document.css_first("base[href]")
+        return base.attributes.get("href") if base is not None else None
+
+    def canonical_href(self, document):
+        for link in document.css("link[rel]"):
+            if is_canonical_relation(link.attributes.get("rel")):
+                return link.attributes.get("href")
+        return None
+
+
+PARSERS = {
+    "html.parser": lambda: SoupParser("html.parser"),
+    "lxml": lambda: SoupParser("lxml"),
+    "selectolax": LexborParser,
+}
+
+DEFAULT_PARSER = SoupParser()
+
+
+def get_parser(parser=None):
+    """Returns the HTML parser backend matching a name.
+
+    Parameters
+    ----------
+    parser : str or HtmlParser, optional
+        The name of a backend in `PARSERS` ("html.parser", "lxml" or "selectolax"), or a backend instance, returned
+        as is. If None, the default "html.parser" backend is returned.
+
+    Returns
+    -------
+    HtmlParser
+        The parser backend.
+
+    Raises
+    ------
+    ValueError
+        If the name does not match any backend.
+    """
+    if parser is None:
+        return DEFAULT_PARSER
+    if isinstance(parser, HtmlParser):
+        return parser
+    if parser not in PARSERS:
+        raise ValueError(f"Unsupported HTML parser: {parser} (expected one of {', '.join(PARSERS)})")
+    return PARSERS[parser]()
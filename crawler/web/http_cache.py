@@ -0,0 +1,201 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+from ..utils.url_utils import normalize_url
+
+
+class CachedResponse:
+    """A response body stored in a `DiskCache`, together with its validators.
+
+    Parameters
+    ----------
+    body : bytes
+        The raw body of the response.
+    encoding : str or None
+        The text encoding of the body.
+    etag : str or None
+        The `ETag` header of the response.
+    last_modified : str or None
+        The `Last-Modified` header of the response.
+    """
+
+    def __init__(self, body, encoding, etag, last_modified):
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self):
+        """Builds the headers used to revalidate this response with the server.
+
+        Returns
+        -------
+        dict
+            The `If-None-Match` and/or `If-Modified-Since` headers.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class DiskCache:
+    """A persistent HTTP cache stored in a sqlite database inside a cache directory.
+
+    Response bodies are stored along with their `ETag` and `Last-Modified` validators. On later runs, requests for
+    cached URLs are sent as conditional requests (`If-None-Match` / `If-Modified-Since`), and when the server
+    answers `304 Not Modified` the stored body is reused instead of being downloaded again. Only responses carrying
+    at least one validator are stored.
+
+    Parameters
+    ----------
+    directory : str
+        The directory where the cache database is kept. It is created if it does not exist.
+
+    Attributes
+    ----------
+    revalidated : int
+        The number of responses reused after a `304 Not Modified` answer during this run.
+    bytes_saved : int
+        The number of body bytes that did not have to be downloaded during this run.
+    stored : int
+        The number of responses stored (or refreshed) in the cache during this run.
+
+    Examples
+    --------
+    >>> session = HttpSession(disk_cache=DiskCache(".crawler_cache"))
+    >>> response = session.get("https://example.com")  # revalidated on the next run
+    >>> session.disk_cache.stats()
+    {'revalidated': 0, 'bytes_saved': 0, 'stored': 1}
+    """
+
+    FILENAME = "http_cache.sqlite"
+
+    def __init__(self, directory):
+        """Opens (or creates) the cache database in the given directory.
+
+        Parameters
+        ----------
+        directory : str
+            The directory where the cache database is kept.
+        """
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.directory = directory
+        self.revalidated = 0
+        self.bytes_saved = 0
+        self.stored = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            os.path.join(directory, self.FILENAME), check_same_thread=False
+        )
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, encoding TEXT, body BLOB, stored_at REAL)"
+            )
+
+    def lookup(self, url):
+        """Retrieves the cached response of a URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the response.
+
+        Returns
+        -------
+        CachedResponse or None
+            The cached response, or None if the URL is not cached.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, encoding, etag, last_modified FROM responses WHERE url = ?",
+                (normalize_url(url),),
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(*row)
+
+    def store(self, url, response):
+        """Stores a successful response if it carries an `ETag` or `Last-Modified` validator.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the response.
+        response : requests.Response
+            The response to store.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            return
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    normalize_url(url),
+                    etag,
+                    last_modified,
+                    response.encoding,
+                    response.content,
+                    time.time(),
+                ),
+            )
+            self.stored += 1
+
+    def reuse(self, response, cached):
+        """Turns a `304 Not Modified` response into a full response carrying the cached body.
+
+        Parameters
+        ----------
+        response : requests.Response
+            The `304 Not Modified` response returned by the server.
+        cached : CachedResponse
+            The cached response that was revalidated.
+
+        Returns
+        -------
+        requests.Response
+            The same response object, with status 200 and the cached body.
+        """
+        response.status_code = 200
+        response._content = cached.body
+        response.encoding = cached.encoding
+
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += len(cached.body)
+
+        logging.debug("Revalidated %s from the disk cache", str(response.url))
+        return response
+
+    def stats(self):
+        """Returns the statistics of the current run.
+
+        Returns
+        -------
+        dict
+            A dictionary with the number of revalidated responses, bytes saved and stored responses.
+        """
+        return {
+            "revalidated": self.revalidated,
+            "bytes_saved": self.bytes_saved,
+            "stored": self.stored,
+        }
+
+    def close(self):
+        """Closes the cache database."""
+        with self._lock:
+            self._connection.close()
+
+    def __repr__(self):
+        return f"DiskCache({self.directory!r})"
@@ -0,0 +1,285 @@
+import time
+import socket
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+
+DEFAULT_USER_AGENT = "crawler/0.1.0 (+https://github.com/joe-stifler/crawler)"
+
+
+class ConnectionStats:
+    """Thread-safe counters describing how the connections of an `HttpSession` were used.
+
+    Attributes
+    ----------
+    requests : int
+        The number of HTTP requests sent over the session's connection pools.
+    opened : int
+        The number of new connections opened (each one costs a TCP, and possibly TLS, handshake).
+    """
+
+    def __init__(self):
+        """Initializes all counters to zero."""
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.opened = 0
+
+    def count_request(self):
+        """Records one HTTP request sent over a pooled connection."""
+        with self._lock:
+            self.requests += 1
+
+    def count_opened(self):
+        """Records one newly opened connection."""
+        with self._lock:
+            self.opened += 1
+
+    @property
+    def reused(self):
+        """The number of requests that were served over an already open (kept-alive) connection.
+
+        Returns
+        -------
+        int
+            The number of reused connections.
+        """
+        return self.requests - self.opened
+
+    def as_dict(self):
+        """Returns the counters as a dictionary.
+
+        Returns
+        -------
+        dict
+            A dictionary with the `requests`, `opened` and `reused` counters.
+        """
+        return {"requests": self.requests, "opened": self.opened, "reused": self.reused}
+
+    def __repr__(self):
+        return f"ConnectionStats(requests={self.requests}, opened={self.opened}, reused={self.reused})"
+
+
+def _instrumented_connection_class(connection_class, owner, tls):
+    """Creates a subclass of a urllib3 connection that reports the duration of the name resolution, TCP connection
+    and TLS handshake of every new connection to the metrics of `owner`, if any."""
+
+    class InstrumentedConnection(connection_class):
+        def _new_conn(self):
+            metrics = owner.metrics
+            if metrics is None:
+                return super()._new_conn()
+
+            # The name is resolved here, to be timed apart from the connection, and every address is then tried in
+            # turn as urllib3 would
+            host = self._dns_host
+            start = time.perf_counter()
+            try:
+                infos = socket.getaddrinfo(host, self.port, type=socket.SOCK_STREAM)
+            except OSError:
+                return super()._new_conn()  # Reported by urllib3
+            resolved = time.perf_counter()
+            metrics.observe("dns", resolved - start)
+
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+            try:
+                for index, address in enumerate(addresses):
+                    self._dns_host = address
+                    try:
+                        sock = super()._new_conn()
+                        break
+                    except ConnectTimeoutError:
+                        if index == len(addresses) - 1:
+                            raise
+            finally:
+                self._dns_host = host
+            self._connected_at = time.perf_counter()
+            metrics.observe("connect", self._connected_at - resolved)
+            return sock
+
+        def connect(self):
+            self._connected_at = None
+            super().connect()
+            metrics = owner.metrics
+            if tls and metrics is not None and self._connected_at is not None:
+                metrics.observe("tls", time.perf_counter() - self._connected_at)
+
+    InstrumentedConnection.__name__ = f"Instrumented{connection_class.__name__}"
+    return InstrumentedConnection
+
+
+def _counting_pool_class(pool_class, owner, tls=False):
+    """Creates a subclass of a urllib3 connection pool that reports its activity to the stats (and metrics) of
+    `owner`."""
+    stats = owner.stats
+
+    class CountingPool(pool_class):
+        ConnectionCls = _instrumented_connection_class(pool_class.ConnectionCls, owner, tls)
+
+        def _new_conn(self):
+            stats.count_opened()
+            return super()._new_conn()
+
+        def _make_request(self, *args, **kwargs):
+            stats.count_request()
+            return super()._make_request(*args, **kwargs)
+
+    CountingPool.__name__ = f"Counting{pool_class.__name__}"
+    return CountingPool
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """An `HTTPAdapter` whose connection pools count opened and reused connections, and time new connections."""
+
+    def __init__(self, owner, **kwargs):
+        self._owner = owner
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool_class(HTTPConnectionPool, self._owner),
+            "https": _counting_pool_class(HTTPSConnectionPool, self._owner, tls=True),
+        }
+
+
+class HttpSession:
+    """A pooled HTTP session shared by all the web nodes of a crawler.
+
+    Wraps a `requests.Session` so that connections are kept alive and reused across pages instead of paying a
+    fresh TCP+TLS handshake per request. The session also carries default headers (such as the User-Agent) and
+    counts how many connections were opened versus reused.
+
+    Parameters
+    ----------
+    pool_maxsize : int, optional
+        The maximum number of connections kept alive per host. Should be at least the number of crawl workers.
+        Defaults to 10.
+    pool_connections : int, optional
+        The number of per-host connection pools to keep cached. Defaults to 10.
+    user_agent : str, optional
+        The User-Agent header sent with every request. Defaults to `DEFAULT_USER_AGENT`.
+    headers : dict, optional
+        Additional default headers sent with every request.
+    timeout : float, optional
+        The timeout, in seconds, of each request. Defaults to 5.
+    disk_cache : DiskCache, optional
+        A persistent HTTP cache. When given, cached URLs are revalidated with conditional requests and their stored
+        body is reused on `304 Not Modified`.
+    metrics : CrawlMetrics, optional
+        If given, the duration of the name resolution (`dns`), TCP connection (`connect`) and TLS handshake (`tls`)
+        of every new connection is reported to these metrics.
+
+    Attributes
+    ----------
+    stats : ConnectionStats
+        Counters of requests sent, connections opened and connections reused.
+    metrics : CrawlMetrics or None
+        The metrics new connections are timed into. It may be set after the session is created.
+    disk_cache : DiskCache or None
+        The persistent HTTP cache, if any.
+
+    Methods
+    -------
+    get(url, **kwargs)
+        Sends a GET request over the pooled connections.
+    close()
+        Closes all the pooled connections.
+
+    Examples
+    --------
+    >>> session = HttpSession(pool_maxsize=16, user_agent="my-crawler/1.0")
+    >>> response = session.get("https://example.com")
+    >>> session.stats
+    ConnectionStats(requests=1, opened=1, reused=0)
+    """
+
+    def __init__(
+        self,
+        pool_maxsize=10,
+        pool_connections=10,
+        user_agent=DEFAULT_USER_AGENT,
+        headers=None,
+        timeout=5,
+        disk_cache=None,
+        metrics=None,
+    ):
+        """Initializes the pooled HTTP session.
+
+        Parameters
+        ----------
+        pool_maxsize : int, optional
+            The maximum number of connections kept alive per host. Defaults to 10.
+        pool_connections : int, optional
+            The number of per-host connection pools to keep cached. Defaults to 10.
+        user_agent : str, optional
+            The User-Agent header sent with every request. Defaults to `DEFAULT_USER_AGENT`.
+        headers : dict, optional
+            Additional default headers sent with every request.
+        timeout : float, optional
+            The timeout, in seconds, of each request. Defaults to 5.
+        disk_cache : DiskCache, optional
+            A persistent HTTP cache used to revalidate previously fetched URLs. Defaults to None.
+        metrics : CrawlMetrics, optional
+            The metrics new connections are timed into. Defaults to None.
+        """
+        self.stats = ConnectionStats()
+        self.metrics = metrics
+        self.timeout = timeout
+        self.disk_cache = disk_cache
+
+        self.session = requests.Session()
+        adapter = _CountingHTTPAdapter(self, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.session.headers.update({"User-Agent": user_agent, "Connection": "keep-alive"})
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(self, url, **kwargs):
+        """Sends a GET request over the pooled connections.
+
+        If a disk cache is configured and the URL was cached by a previous run, the request is sent as a conditional
+        request, and a `304 Not Modified` answer is turned into a regular response carrying the cached body.
+
+        Parameters
+        ----------
+        url : str
+            The URL to fetch.
+        **kwargs
+            Additional keyword arguments forwarded to `requests.Session.get`.
+
+        Returns
+        -------
+        requests.Response
+            The HTTP response.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if self.disk_cache is None:
+            return self.session.get(url, **kwargs)
+
+        cached = self.disk_cache.lookup(url)
+        if cached is not None:
+            kwargs["headers"] = {**cached.conditional_headers(), **kwargs.get("headers", {})}
+
+        response = self.session.get(url, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            return self.disk_cache.reuse(response, cached)
+        if response.status_code == 200:
+            self.disk_cache.store(url, response)
+        return response
+
+    def close(self):
+        """Closes all the pooled connections, and the disk cache if any."""
+        self.session.close()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
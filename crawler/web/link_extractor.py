@@ -0,0 +1,108 @@
+from html.parser import HTMLParser
+
+
+class LinkExtractor(HTMLParser):
+    """An incremental HTML tokenizer that collects hyperlinks without building a document tree.
+
+    Only the start tags of `a`, `base` and `link` elements are looked at: the `href` attribute of every `a` element
+    is collected in document order, together with the `href` of the first `base` element and of the first
+    `<link rel="canonical">` element. HTML can be fed in several chunks, e.g. as it is read from the network, and is
+    never kept in memory as a whole.
+
+    Attributes
+    ----------
+    hrefs : list of str or None
+        The `href` attribute of each `a` element seen so far, or None for the elements without one.
+    base_href : str or None
+        The `href` attribute of the first `base` element, or None if there is none.
+    canonical_href : str or None
+        The `href` attribute of the first `link` element with a `canonical` relation, or None if there is none.
+
+    Examples
+    --------
+    >>> extractor = LinkExtractor()
+    >>> extractor.feed('<base href="/docs/"><a href="install.html">Install</a>')
+    >>> extractor.close()
+    >>> extractor.base_href, extractor.hrefs
+    ('/docs/', ['install.html'])
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs = []
+        self.base_href = None
+        self.canonical_href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self.hrefs.append(_get_attribute(attrs, "href"))
+        elif tag == "base" and self.base_href is None:
+            self.base_href = _get_attribute(attrs, "href")
+        elif tag == "link" and self.canonical_href is None:
+            if is_canonical_relation(_get_attribute(attrs, "rel")):
+                self.canonical_href = _get_attribute(attrs, "href")
+
+
+def _get_attribute(attrs, name):
+    # The last occurrence wins, as in BeautifulSoup
+    value = None
+    for key, attribute_value in attrs:
+        if key == name:
+            value = attribute_value
+    return value
+
+
+def is_canonical_relation(rel):
+    """Checks whether the `rel` attribute of a `link` element declares the canonical URL of the page.
+
+    Parameters
+    ----------
+    rel : str or list of str or None
+        The value of the attribute, as a string of space-separated tokens or as a list of tokens.
+
+    Returns
+    -------
+    bool
+        True if one of the tokens is `canonical` (case-insensitively).
+    """
+    if not rel:
+        return False
+    tokens = rel.split() if isinstance(rel, str) else rel
+    return any(token.lower() == "canonical" for token in tokens)
+
+
+def parse_links(html):
+    """Runs a `LinkExtractor` over a whole HTML page.
+
+    Parameters
+    ----------
+    html : str
+        The HTML content.
+
+    Returns
+    -------
+    LinkExtractor
+        The closed extractor, holding the `hrefs`, `base_href` and `canonical_href` of the page.
+    """
+    extractor = LinkExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor
+
+
+def extract_hrefs(html):
+    """Extracts the `href` attributes of the `a` elements of an HTML page, and its `base` URL, without a DOM.
+
+    Parameters
+    ----------
+    html : str
+        The HTML content.
+
+    Returns
+    -------
+    tuple
+        The `href` of the first `base` element (or None), and the list of the `href` attributes of the `a` elements
+        in document order (None for the elements without one).
+    """
+    extractor = parse_links(html)
+    return extractor.base_href, extractor.hrefs
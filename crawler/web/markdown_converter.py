@@ -0,0 +1,152 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import html2text
+
+
+class MarkdownConverter:
+    """A configured HTML to Markdown converter, memoizing its output by content hash.
+
+    The original HTML of a page is converted in a single pass by html2text, without building or re-serializing a
+    document tree first. Converted Markdown is kept in a thread-safe LRU memo keyed by the hash of the HTML, so pages
+    with identical content (mirrors, duplicated URLs, unchanged pages of a resumed crawl) are converted only once.
+    The memo is bounded by the total size of the stored Markdown.
+
+    html2text handlers keep parsing state and are not thread-safe, so the converter keeps their configuration and
+    gives every conversion its own handler, which is cheap to create.
+
+    Parameters
+    ----------
+    ignore_links : bool, optional
+        If True, links are rendered as plain text. Defaults to True.
+    max_bytes : int, optional
+        The maximum total size, in bytes, of the memoized Markdown. Defaults to 64 MiB, 0 disables the memo.
+    **options : dict, optional
+        Additional html2text options (e.g. `body_width=0`), set as attributes of every handler.
+
+    Attributes
+    ----------
+    hits : int
+        The number of conversions answered from the memo.
+    misses : int
+        The number of conversions actually performed.
+
+    Examples
+    --------
+    >>> converter = MarkdownConverter()
+    >>> converter.convert("<h1>Example Page</h1>")
+    '# Example Page\\n\\n'
+    """
+
+    def __init__(self, ignore_links=True, max_bytes=64 * 1024 * 1024, **options):
+        """Initializes the converter.
+
+        Parameters
+        ----------
+        ignore_links : bool, optional
+            If True, links are rendered as plain text. Defaults to True.
+        max_bytes : int, optional
+            The maximum total size, in bytes, of the memoized Markdown. Defaults to 64 MiB.
+        **options : dict, optional
+            Additional html2text options.
+        """
+        self.options = dict(options, ignore_links=ignore_links)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _handler(self):
+        handler = html2text.HTML2Text()
+        for name, value in self.options.items():
+            setattr(handler, name, value)
+        return handler
+
+    def convert(self, html):
+        """Converts HTML content to Markdown, reusing the memoized result for identical content.
+
+        Parameters
+        ----------
+        html : str
+            The HTML content.
+
+        Returns
+        -------
+        str
+            The Markdown text.
+        """
+        if not html:
+            return ""
+
+        key = hashlib.blake2b(html.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        markdown_text = self._handler().handle(html)
+
+        size = len(markdown_text.encode("utf-8"))
+        if size <= self.max_bytes:
+            with self._lock:
+                if key not in self._memo:
+                    self._memo[key] = (markdown_text, size)
+                    self.total_bytes += size
+                while self.total_bytes > self.max_bytes:
+                    _, (_, evicted_size) = self._memo.popitem(last=False)
+                    self.total_bytes -= evicted_size
+
+        return markdown_text
+
+    def stats(self):
+        """Returns the memo statistics.
+
+        Returns
+        -------
+        dict
+            A dictionary with the number of memoized pages, their total size, hits and misses.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._memo),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __repr__(self):
+        return f"MarkdownConverter({len(self._memo)} pages, {self.total_bytes} bytes)"
+
+
+DEFAULT_CONVERTER = MarkdownConverter()
+
+# The converters of a worker process, by options, so that each worker keeps its own memo across tasks
+_process_converters = {}
+
+
+def convert_html_bytes(html, options):
+    """Converts UTF-8 encoded HTML to Markdown. Meant to run in a worker process, see `WebNode.markdown_task`.
+
+    Parameters
+    ----------
+    html : bytes
+        The UTF-8 encoded HTML content.
+    options : dict
+        The options of the `MarkdownConverter` to use.
+
+    Returns
+    -------
+    str
+        The Markdown text.
+    """
+    key = tuple(sorted(options.items()))
+    converter = _process_converters.get(key)
+    if converter is None:
+        converter = _process_converters[key] = MarkdownConverter(**options)
+    return converter.convert(html.decode("utf-8"))
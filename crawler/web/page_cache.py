@@ -0,0 +1,152 @@
+import threading
+from collections import OrderedDict
+
+from ..utils.url_utils import normalize_url
+
+
+class PageCache:
+    """A thread-safe LRU cache of fetched web pages, shared by all the nodes of a crawl.
+
+    Pages are keyed by their normalized URL, so every `WebNode` created for the same page (for instance each time a
+    link to it is discovered) reuses the content fetched the first time. The cache is bounded by the total size of
+    the stored pages rather than by their number: when it grows beyond `max_bytes`, the least recently used pages
+    are evicted.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        The maximum total size, in bytes, of the cached pages. Defaults to 256 MiB.
+
+    Attributes
+    ----------
+    hits : int
+        The number of lookups that found the page in the cache.
+    misses : int
+        The number of lookups that did not find the page in the cache.
+    evictions : int
+        The number of pages evicted to respect `max_bytes`.
+    total_bytes : int
+        The current total size, in bytes, of the cached pages.
+
+    Examples
+    --------
+    >>> cache = PageCache(max_bytes=1024)
+    >>> cache["https://Example.com/page#intro"] = "<h1>Page</h1>"
+    >>> cache.get("https://example.com/page")
+    '<h1>Page</h1>'
+    >>> cache.stats()
+    {'entries': 1, 'bytes': 13, 'hits': 1, 'misses': 0, 'evictions': 0}
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        """Initializes an empty page cache.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            The maximum total size, in bytes, of the cached pages. Defaults to 256 MiB.
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size_of(content):
+        if isinstance(content, bytes):
+            return len(content)
+        return len(content.encode("utf-8"))
+
+    def get(self, url, default=None):
+        """Retrieves the cached content of a page, marking it as recently used.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the page.
+        default : Any, optional
+            The value returned if the page is not cached. Defaults to None.
+
+        Returns
+        -------
+        str or Any
+            The cached content of the page, or `default` if it is not cached.
+        """
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, url, content):
+        """Stores the content of a page, evicting the least recently used pages if needed.
+
+        Pages larger than `max_bytes` are not cached.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the page.
+        content : str or bytes
+            The content of the page.
+        """
+        key = normalize_url(url)
+        size = self._size_of(content)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (content, size)
+            self.total_bytes += size
+
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self):
+        """Returns the cache statistics.
+
+        Returns
+        -------
+        dict
+            A dictionary with the number of entries, total bytes, hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __contains__(self, url):
+        with self._lock:
+            return normalize_url(url) in self._entries
+
+    def __getitem__(self, url):
+        content = self.get(url)
+        if content is None:
+            raise KeyError(url)
+        return content
+
+    def __setitem__(self, url, content):
+        self.put(url, content)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"PageCache({len(self._entries)} pages, {self.total_bytes} bytes)"
@@ -0,0 +1,136 @@
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+
+class Politeness:
+    """Per-host politeness settings of a `WebCrawler`.
+
+    When a crawler is given a `Politeness` policy, its frontier is expanded through a `KeyedScheduler` keyed by
+    host: each host gets at most `max_per_host` concurrent requests and, optionally, a token bucket of
+    `requests_per_second`. The `Crawl-delay` of each host's robots.txt and the `Retry-After` header of 429/503
+    responses further slow down the offending host only, while the other hosts keep the workers busy.
+
+    Parameters
+    ----------
+    max_per_host : int, optional
+        The maximum number of concurrent requests per host. Defaults to 2.
+    requests_per_second : float, optional
+        The maximum number of requests per second per host. If None, only `max_per_host` applies.
+    burst : int, optional
+        The number of requests per host that may be sent back to back before `requests_per_second` applies.
+        Defaults to 1.
+    respect_crawl_delay : bool, optional
+        If True, reads the `Crawl-delay` directive of each host's robots.txt. Defaults to True.
+
+    Examples
+    --------
+    >>> crawler = WebCrawler(politeness=Politeness(max_per_host=4, requests_per_second=2))
+    >>> graph = crawler.crawl_multiple_urls(['https://a.example', 'https://b.example'], workers=8)
+    """
+
+    def __init__(self, max_per_host=2, requests_per_second=None, burst=1, respect_crawl_delay=True):
+        """Initializes the politeness settings.
+
+        Parameters
+        ----------
+        max_per_host : int, optional
+            The maximum number of concurrent requests per host. Defaults to 2.
+        requests_per_second : float, optional
+            The maximum number of requests per second per host. Defaults to None (no rate limit).
+        burst : int, optional
+            The size of the token bucket of each host. Defaults to 1.
+        respect_crawl_delay : bool, optional
+            If True, honors the `Crawl-delay` directive of robots.txt. Defaults to True.
+        """
+        self.max_per_host = max_per_host
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.respect_crawl_delay = respect_crawl_delay
+
+    def host_rate(self, crawl_delay):
+        """Combines the configured rate with a host's `Crawl-delay`, keeping the stricter of both.
+
+        Parameters
+        ----------
+        crawl_delay : float
+            The `Crawl-delay` of the host, in seconds.
+
+        Returns
+        -------
+        float
+            The maximum number of requests per second for the host.
+        """
+        rate = 1.0 / crawl_delay
+        if self.requests_per_second is not None:
+            rate = min(rate, self.requests_per_second)
+        return rate
+
+    def __repr__(self):
+        return (
+            f"Politeness(max_per_host={self.max_per_host}, requests_per_second={self.requests_per_second}, "
+            f"burst={self.burst}, respect_crawl_delay={self.respect_crawl_delay})"
+        )
+
+
+def fetch_crawl_delay(session, url):
+    """Reads the `Crawl-delay` directive that applies to the crawler in the robots.txt of a URL's host.
+
+    Parameters
+    ----------
+    session : HttpSession
+        The HTTP session used to fetch robots.txt. Its User-Agent is matched against the robots.txt rules.
+    url : str
+        Any URL of the host.
+
+    Returns
+    -------
+    float or None
+        The crawl delay in seconds, or None if the host does not declare one.
+    """
+    parts = urlsplit(url)
+    robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+    try:
+        response = session.get(robots_url)
+    except requests.RequestException as e:
+        logging.debug("Failed to access %s: %s", robots_url, str(e))
+        return None
+    if response.status_code != 200:
+        return None
+
+    parser = RobotFileParser(robots_url)
+    parser.parse(response.text.splitlines())
+    delay = parser.crawl_delay(session.session.headers.get("User-Agent", "*"))
+    if delay is None:
+        return None
+    logging.info("Using a crawl delay of %s seconds for %s", str(delay), parts.netloc)
+    return float(delay)
+
+
+def retry_after_seconds(response):
+    """Parses the `Retry-After` header of a response.
+
+    Parameters
+    ----------
+    response : requests.Response
+        The HTTP response.
+
+    Returns
+    -------
+    float or None
+        The number of seconds to wait before retrying, or None if the header is absent or invalid.
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
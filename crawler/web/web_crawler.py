@@ -1,8 +1,29 @@
+import copy
+import logging
+import threading
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
 from .web_node import WebNode
 from .web_graph import WebGraph
+from .page_cache import PageCache
+from .html_parser import get_parser
+from .http_session import HttpSession
+from .politeness import fetch_crawl_delay, retry_after_seconds
+from ..base.dedup import get_deduplicator
+from ..base.metrics import CrawlMetrics, get_metrics
+from ..base.tracing import get_tracer
+from ..base.scheduler import KeyedScheduler
+from ..utils.url_matcher import UrlMatcher
+from ..utils.url_utils import DEFAULT_CANONICALIZER
 from ..base.base_crawler import BaseCrawler
 
 
+class _Throttled(Exception):
+    """Raised by the response hook of a polite crawl to put a page answered with `Retry-After` back on the queue."""
+
+
 class WebCrawler(BaseCrawler):
     """A web crawler for navigating and extracting information from the web, adhering to specified
     domain restrictions.
@@ -13,14 +34,63 @@ class WebCrawler(BaseCrawler):
     Parameters
     ----------
     allowed_domains : list of str, optional
-        A list specifying domains that the crawler is allowed to access. If empty, no domain restrictions are applied. Defaults to an empty list.
+        A list specifying domains that the crawler is allowed to access, subdomains included. If empty, no domain restrictions are applied. Defaults to an empty list.
+    session : HttpSession, optional
+        The pooled HTTP session shared by all the nodes created by the crawler. If None, a default `HttpSession` is
+        created.
+    cache : PageCache, optional
+        The page cache shared by all the nodes created by the crawler. If None, a default `PageCache` is created.
+    politeness : Politeness, optional
+        Per-host concurrency and rate limits. If given, web pages are fetched through a scheduler that interleaves
+        hosts while enforcing the limits, and honors `Crawl-delay` and `Retry-After` (a throttled page is queued
+        again behind the deferral of its host). Defaults to None.
+    lean : bool, optional
+        If True, the nodes created by the crawler run in memory-lean mode: their parsed HTML is discarded as soon as
+        links or Markdown are extracted, and only the links and the compressed HTML are kept. Defaults to False.
+    parser : str or HtmlParser, optional
+        The HTML parser backend of the nodes created by the crawler, or its name ("html.parser", "lxml" or
+        "selectolax"). Defaults to "html.parser".
+    include : list of str, optional
+        URL prefixes or glob patterns; if any is given, only the URLs matching one of them are crawled.
+    exclude : list of str, optional
+        URL prefixes or glob patterns of URLs that are never crawled.
+    canonicalizer : UrlCanonicalizer or callable, optional
+        The function giving the canonical form of a URL, applied to every URL before it becomes a node so that
+        different spellings of a page are fetched once. Defaults to `DEFAULT_CANONICALIZER`.
+    metrics : bool or CrawlMetrics, optional
+        If given (True creates new metrics), the crawler, its HTTP session and its nodes report the duration of
+        every phase of the crawl, byte counts and the length of the frontier to these metrics. Defaults to None.
+    trace : bool or CrawlTracer, optional
+        If given (True creates a new tracer), every timed phase is also recorded as a span of a timeline, exported
+        with `metrics.tracer.export` in the Chrome trace-event format. Implies `metrics`. Defaults to None.
 
     Attributes
     ----------
+    session : HttpSession
+        The pooled HTTP session shared by all the nodes created by the crawler.
+    cache : PageCache
+        The page cache shared by all the nodes created by the crawler, so that a page is fetched at most once.
+    politeness : Politeness or None
+        The per-host concurrency and rate limits of the crawler.
+    lean : bool
+        Whether the nodes created by the crawler run in memory-lean mode.
+    parser : HtmlParser
+        The HTML parser backend shared by the nodes created by the crawler.
     base_allowed_domains : list of str
         The list of domains that the crawler is initially set to access.
     session_allowed_domains : list of str
         Domains that the crawler is allowed to access during a specific crawling session, which can be dynamically adjusted.
+    include : list of str
+        The include rules of the crawler.
+    exclude : list of str
+        The exclude rules of the crawler.
+    canonicalizer : UrlCanonicalizer or callable
+        The URL canonicalizer of the crawler.
+    metrics : CrawlMetrics or None
+        The metrics of the crawl, if it is instrumented.
+    aliases : dict
+        The alias table of the crawler: maps every URL known to redirect to, or to declare, another canonical URL to
+        that URL. Aliases are resolved before nodes are created, so they are never fetched again.
 
     Methods
     -------
@@ -32,6 +102,10 @@ class WebCrawler(BaseCrawler):
         Checks whether a given URL falls within the allowed domains for the current session.
     visit_node_neighborhood(node)
         Analyzes a given node (web page) and returns its neighboring nodes (linked web pages) that fall within the allowed domains.
+    canonical_node(node)
+        Records the redirect target or declared canonical URL of a visited node, and returns the node of that URL.
+    canonicalization_stats()
+        Returns the number of URL spellings seen and of fetches avoided by canonicalization in the current session.
 
     Examples
     --------
@@ -43,18 +117,99 @@ class WebCrawler(BaseCrawler):
     5  # Assuming the start_node has 5 allowable linked pages.
     """
 
-    def __init__(self, allowed_domains=[]):
+    # In lean mode the nodes keep their own compressed HTML, so the shared page cache only needs to bridge the fetch
+    # and the parse of in-flight pages
+    LEAN_CACHE_BYTES = 16 * 1024 * 1024
+
+    # Number of times a page answered with 429 or 503 and `Retry-After` is queued again, before its answer is kept
+    MAX_THROTTLED_RETRIES = 3
+
+    def __init__(
+        self,
+        allowed_domains=[],
+        session=None,
+        cache=None,
+        politeness=None,
+        lean=False,
+        parser=None,
+        include=None,
+        exclude=None,
+        canonicalizer=None,
+        graph_store=None,
+        dedup=None,
+        metrics=None,
+        trace=None,
+    ):
         """Initializes the WebCrawler with specified domain restrictions.
 
         Parameters
         ----------
         allowed_domains : list of str, optional
             Specifies the domains that the crawler is allowed to access. Defaults to an empty list, implying no restrictions.
+        session : HttpSession, optional
+            The pooled HTTP session shared by all the nodes created by the crawler. Defaults to a new `HttpSession`.
+        cache : PageCache, optional
+            The page cache shared by all the nodes created by the crawler. Defaults to a new `PageCache`, smaller in
+            lean mode.
+        politeness : Politeness, optional
+            Per-host concurrency and rate limits. Defaults to None (no per-host limits).
+        lean : bool, optional
+            If True, the nodes created by the crawler run in memory-lean mode. Defaults to False.
+        parser : str or HtmlParser, optional
+            The HTML parser backend of the nodes created by the crawler, or its name. Defaults to "html.parser".
+        include : list of str, optional
+            URL prefixes or glob patterns the crawled URLs must match. Defaults to None (no restriction).
+        exclude : list of str, optional
+            URL prefixes or glob patterns of URLs that are never crawled. Defaults to None.
+        canonicalizer : UrlCanonicalizer or callable, optional
+            The URL canonicalizer of the crawler. Defaults to `DEFAULT_CANONICALIZER`.
+        graph_store : {None, "networkx", "compact"}, optional
+            The storage engine of the crawled graphs (see `BaseGraph`). Defaults to None ("networkx").
+        dedup : {None, "exact", "near"} or ContentDeduplicator, optional
+            If given, pages with the same content as a page crawled earlier ("exact"), or nearly the same visible
+            text ("near"), are merged into that page instead of being expanded and written again. Pages at the
+            maximum depth are then fetched during the crawl, to be fingerprinted. Defaults to None.
+        metrics : bool or CrawlMetrics, optional
+            The metrics the crawl is instrumented with, or True for new metrics. The HTTP session reports to them
+            unless it already has its own. Defaults to None (no instrumentation).
+        trace : bool or CrawlTracer, optional
+            The tracer recording the timed phases as spans, or True for a new tracer. Metrics are created if none
+            are given. Defaults to None (no tracing).
         """
         super().__init__()
-        self.base_allowed_domains = allowed_domains
+        self.session = session if session is not None else HttpSession()
+        if cache is None:
+            cache = PageCache(max_bytes=self.LEAN_CACHE_BYTES) if lean else PageCache()
+        self.cache = cache
+        self.politeness = politeness
+        self.lean = lean
+        self.parser = get_parser(parser)
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.canonicalizer = canonicalizer if canonicalizer is not None else DEFAULT_CANONICALIZER
+        self.graph_store = graph_store
+        self.deduplicator = get_deduplicator(dedup)
+        self.metrics = get_metrics(metrics)
+        tracer = get_tracer(trace)
+        if tracer is not None:
+            if self.metrics is None:
+                self.metrics = CrawlMetrics()
+            self.metrics.tracer = tracer
+        if self.session.metrics is None:
+            self.session.metrics = self.metrics
+        self._spellings = set()
+        self._canonical_urls = set()
+        self._spellings_lock = threading.Lock()
+        self.aliases = {}
+        self._aliases_lock = threading.Lock()
+        self._base_allowed_domains = list(allowed_domains)
         self.session_allowed_domains = []
 
+        self._scheduler = None
+        self._crawl_delays = {}
+        self._crawl_delays_lock = threading.Lock()
+        self._polite_visit = threading.local()
+
     def get_node(self, node_id):
         """Retrieves a WebNode instance corresponding to a given node identifier (URL).
 
@@ -66,9 +221,14 @@ class WebCrawler(BaseCrawler):
         Returns
         -------
         WebNode
-            The WebNode instance corresponding to the given identifier.
+            The WebNode instance corresponding to the given identifier, identified by its canonical URL.
         """
-        return WebNode(node_id)
+        return self._create_node(self.resolve_alias(self.canonicalizer(node_id)))
+
+    def _create_node(self, url):
+        return WebNode(
+            url, session=self.session, cache=self.cache, lean=self.lean, parser=self.parser, metrics=self.metrics
+        )
 
     def start_new_crawling_session(self, start_node_id, restrict_to_domain=True):
         """Initializes a new crawling session, with an option to restrict the session to the domain
@@ -87,18 +247,75 @@ class WebCrawler(BaseCrawler):
             An initialized WebGraph instance for the new crawling session.
         """
         start_node = self.get_node(start_node_id)
+        self._reset_spellings([start_node_id])
+        if self.deduplicator is not None:
+            self.deduplicator.clear()
         if restrict_to_domain:
             self.session_allowed_domains = [start_node.domain]
         else:
             self.session_allowed_domains = []
-        crawl_subgraph = WebGraph()
+        crawl_subgraph = WebGraph(store=self.graph_store)
         crawl_subgraph.add_node(start_node)
         return crawl_subgraph
 
+    def restore_crawling_session(self, root_ids):
+        """Starts the crawling session of a crawl restored from a checkpoint, restricted to the domains of all
+        its start URLs.
+
+        Parameters
+        ----------
+        root_ids : list of str
+            The URLs the crawl started from.
+
+        Returns
+        -------
+        WebGraph
+            A new WebGraph instance containing the root nodes.
+        """
+        crawl_subgraph = WebGraph(store=self.graph_store)
+        for root_id in root_ids:
+            crawl_subgraph.add_node(self.get_node(root_id))
+        self._reset_spellings(root_ids)
+        if self.deduplicator is not None:
+            self.deduplicator.clear()
+        self.session_allowed_domains = [node.domain for node in crawl_subgraph.all_nodes()]
+        return crawl_subgraph
+
+    @property
+    def base_allowed_domains(self):
+        """The list of domains that the crawler is initially set to access."""
+        return self._base_allowed_domains
+
+    @base_allowed_domains.setter
+    def base_allowed_domains(self, domains):
+        self._base_allowed_domains = list(domains)
+        self._compile_url_matcher()
+
+    @property
+    def session_allowed_domains(self):
+        """The domains that the crawler is allowed to access during the current crawling session. Setting them
+        compiles the URL matcher of the session."""
+        return self._session_allowed_domains
+
+    @session_allowed_domains.setter
+    def session_allowed_domains(self, domains):
+        self._session_allowed_domains = list(domains)
+        self._compile_url_matcher()
+
+    def _compile_url_matcher(self):
+        self._url_matcher = UrlMatcher(
+            self._base_allowed_domains + self._session_allowed_domains,
+            include=self.include,
+            exclude=self.exclude,
+        )
+
     def in_allowed_domain(self, url):
         """Determines if the given URL is within the crawler's allowed domains for the current
         session.
 
+        The URL is allowed if its host is one of the allowed domains or one of their subdomains, and if it passes
+        the include and exclude rules of the crawler. The check uses a `UrlMatcher` compiled once per session.
+
         Parameters
         ----------
         url : str
@@ -109,10 +326,7 @@ class WebCrawler(BaseCrawler):
         bool
             True if the URL is within the allowed domains, False otherwise.
         """
-        all_allowed_domains = self.base_allowed_domains + self.session_allowed_domains
-        return len(all_allowed_domains) == 0 or any(
-            domain in url for domain in all_allowed_domains
-        )
+        return self._url_matcher.match(url)
 
     def visit_node_neighborhood(self, node):
         """Fetches the web page corresponding to the given node, extracts links, and returns
@@ -128,19 +342,237 @@ class WebCrawler(BaseCrawler):
         list of WebNode
             A list of WebNode instances representing the allowable neighboring nodes linked from the given node.
         """
-        node_neighbors = node.fetch_connected_hyperlinks()
-        allowed_neighbors = [
-            WebNode(neighbor)
-            for neighbor in node_neighbors
-            if self.in_allowed_domain(neighbor)
-        ]
-        return allowed_neighbors
-
-    def crawl_multiple_urls(self, urls, max_depth=1):
+        spellings = {}
+        for neighbor in node.fetch_connected_hyperlinks():
+            canonical_url = self.canonicalizer(neighbor)
+            if self.in_allowed_domain(canonical_url):
+                spellings[neighbor] = canonical_url
+        self._record_spellings(spellings)
+
+        # Known aliases are replaced by their canonical URL, so that they are never requested
+        allowed_neighbors = sorted({self.resolve_alias(url) for url in spellings.values()})
+        return [self._create_node(url) for url in allowed_neighbors]
+
+    def resolve_alias(self, url):
+        """Returns the canonical URL of a URL, following the alias table.
+
+        Parameters
+        ----------
+        url : str
+            A canonicalized URL.
+
+        Returns
+        -------
+        str
+            The URL `url` is an alias of, or `url` itself if it is not a known alias.
+        """
+        seen = 0
+        while url in self.aliases and seen < len(self.aliases):
+            url = self.aliases[url]
+            seen += 1
+        return url
+
+    def canonical_node(self, node):
+        """Records the redirect target or declared canonical URL of a visited node, and returns the node of that URL.
+
+        The URL a page was served from after redirects, or the URL it declares with `<link rel="canonical">`, is
+        canonicalized and, if it is allowed and differs from the URL of the node, recorded in the alias table
+        (together with the redirect target, when a page redirects to a URL declaring yet another canonical URL).
+        The crawl then merges the node into the node of the canonical URL, which inherits its content.
+
+        Parameters
+        ----------
+        node : WebNode
+            The visited node.
+
+        Returns
+        -------
+        WebNode
+            A node for the canonical URL sharing the content of `node`, or `node` itself if it has no alias.
+        """
+        canonical_url = self.canonicalizer(node.canonical_url)
+        if canonical_url == node.url or not self.in_allowed_domain(canonical_url):
+            canonical_url = self.canonicalizer(node.final_url)
+            if canonical_url == node.url or not self.in_allowed_domain(canonical_url):
+                return node
+
+        with self._aliases_lock:
+            canonical_url = self.resolve_alias(canonical_url)
+            if canonical_url == node.url:
+                return node
+            self.aliases[node.url] = canonical_url
+            final_url = self.canonicalizer(node.final_url)
+            if final_url not in (node.url, canonical_url):
+                self.aliases.setdefault(final_url, canonical_url)
+        logging.info("Merged %s into its canonical URL %s", str(node.url), str(canonical_url))
+        return node.copy_as(canonical_url)
+
+    def _reset_spellings(self, urls):
+        with self._spellings_lock:
+            self._spellings.clear()
+            self._canonical_urls.clear()
+        self._record_spellings({url: self.canonicalizer(url) for url in urls})
+
+    def _record_spellings(self, spellings):
+        # Only hashes are kept, as the URLs themselves are already held by the nodes of the crawl graph
+        with self._spellings_lock:
+            for url, canonical_url in spellings.items():
+                self._spellings.add(hash(url))
+                self._canonical_urls.add(hash(canonical_url))
+
+    def canonicalization_stats(self):
+        """Returns the effect of URL canonicalization on the current crawling session.
+
+        Every distinct spelling of an allowed URL found in the crawled pages would be a separate node, and a separate
+        fetch, without canonicalization. The difference between the number of spellings and the number of canonical
+        URLs is thus the number of fetches avoided.
+
+        Returns
+        -------
+        dict
+            The number of distinct URL spellings, of distinct canonical URLs, and of fetches avoided.
+        """
+        with self._spellings_lock:
+            spellings, canonical_urls = len(self._spellings), len(self._canonical_urls)
+        return {
+            "spellings": spellings,
+            "canonical_urls": canonical_urls,
+            "fetches_avoided": spellings - canonical_urls,
+        }
+
+    def create_executor(self, workers):
+        """Creates the executor used to fetch web pages, honoring the politeness settings if any.
+
+        Parameters
+        ----------
+        workers : int
+            The number of concurrent workers requested for the crawl.
+
+        Returns
+        -------
+        concurrent.futures.Executor or KeyedScheduler or None
+            A `KeyedScheduler` keyed by host if the crawler has a politeness policy, otherwise the default executor.
+        """
+        if self.politeness is None:
+            return super().create_executor(workers)
+
+        self._scheduler = KeyedScheduler(
+            max_workers=workers,
+            max_per_key=self.politeness.max_per_host,
+            rate=self.politeness.requests_per_second,
+            burst=self.politeness.burst,
+        )
+        with self._crawl_delays_lock:
+            for host, crawl_delay in self._crawl_delays.items():
+                if crawl_delay is not None:
+                    self._scheduler.set_rate(host, self.politeness.host_rate(crawl_delay))
+        # The session may be shared with other crawlers, so the hook only stays registered while the scheduler runs
+        self.session.session.hooks["response"].append(self._on_response)
+        return self._scheduler
+
+    def shutdown_executor(self, executor):
+        """Stops the executor of a crawl, and unregisters the `Retry-After` hook of its scheduler from the session.
+
+        Parameters
+        ----------
+        executor : concurrent.futures.Executor or KeyedScheduler
+            The executor returned by `create_executor`.
+        """
+        super().shutdown_executor(executor)
+        if executor is self._scheduler:
+            hooks = self.session.session.hooks["response"]
+            if self._on_response in hooks:
+                hooks.remove(self._on_response)
+            self._scheduler = None
+
+    def submit_visit(self, executor, node, function):
+        """Submits the processing of a web page, throttled by its host if the crawler has a politeness policy.
+
+        Parameters
+        ----------
+        executor : concurrent.futures.Executor or KeyedScheduler
+            The executor returned by `create_executor`.
+        node : WebNode
+            The node to process.
+        function : callable
+            The function processing the node, called with the node as its only argument.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            A future resolving to the result of `function`.
+        """
+        if self.politeness is None:
+            return super().submit_visit(executor, node, function)
+        future = Future()
+        self._submit_polite_visit(executor, node, function, future, 0)
+        return future
+
+    def _submit_polite_visit(self, executor, node, function, future, attempt):
+        try:
+            visit = executor.submit(node.domain, self._process_politely, node, function, attempt)
+        except RuntimeError:
+            future.cancel()  # The crawl is over
+            return
+        visit.add_done_callback(partial(self._polite_visit_done, executor, node, function, future, attempt))
+
+    def _polite_visit_done(self, executor, node, function, future, attempt, visit):
+        if visit.cancelled():
+            future.cancel()
+        elif isinstance(visit.exception(), _Throttled):
+            # The host is deferred by now, so the page waits in its queue without holding a worker
+            logging.info("Queuing %s again after a throttled response", str(node.url))
+            self._submit_polite_visit(executor, node, function, future, attempt + 1)
+        elif visit.exception() is not None:
+            future.set_exception(visit.exception())
+        else:
+            future.set_result(visit.result())
+
+    def _process_politely(self, node, function, attempt=0):
+        if self.politeness.respect_crawl_delay:
+            self._apply_crawl_delay(node)
+        self._polite_visit.attempt = attempt
+        try:
+            return function(node)
+        finally:
+            self._polite_visit.attempt = None
+
+    def _apply_crawl_delay(self, node):
+        with self._crawl_delays_lock:
+            if node.domain in self._crawl_delays:
+                return
+            self._crawl_delays[node.domain] = None
+
+        crawl_delay = fetch_crawl_delay(self.session, node.url)
+        if crawl_delay is None or crawl_delay <= 0:
+            return
+
+        with self._crawl_delays_lock:
+            self._crawl_delays[node.domain] = crawl_delay
+        self._scheduler.set_rate(node.domain, self.politeness.host_rate(crawl_delay))
+
+    def _on_response(self, response, *args, **kwargs):
+        if self._scheduler is None or response.status_code not in (429, 503):
+            return
+        delay = retry_after_seconds(response)
+        if delay is not None:
+            host = urlsplit(response.url).netloc
+            logging.warning("Deferring requests to %s for %s seconds", host, str(delay))
+            self._scheduler.defer(host, delay)
+            # The visit fetching the page is aborted before the node stores the error, and queued again
+            attempt = getattr(self._polite_visit, "attempt", None)
+            if attempt is not None and attempt < self.MAX_THROTTLED_RETRIES:
+                response.close()
+                raise _Throttled(response.url)
+
+    def crawl_multiple_urls(self, urls, max_depth=1, workers=1, checkpoint=None):
         """Performs a crawl starting from multiple URLs, building a single graph.
 
-        This method iteratively crawls each URL in the provided list, adding the resulting subgraphs to a
-        single `WebGraph` instance.
+        Every URL is crawled in its own crawling session, restricted to its own domain, and the resulting subgraphs
+        are merged into a single `WebGraph` instance. With a single worker, no politeness policy and no checkpoint,
+        the URLs are crawled one after the other. Otherwise, the sessions are expanded concurrently through a shared
+        executor, so that the workers fetch pages of all hosts at once instead of crawling one site after the other,
+        and the merged graph is the same.
 
         Parameters
         ----------
@@ -148,14 +580,119 @@ class WebCrawler(BaseCrawler):
             A list of URLs to start crawling from.
         max_depth : int, optional
             The maximum depth to crawl from each starting URL. Defaults to 1.
+        workers : int, optional
+            The number of threads used to visit web pages concurrently. Defaults to 1.
+        checkpoint : CrawlCheckpoint, optional
+            If given, the progress of the session of every URL is journaled to its own subdirectory of the
+            checkpoint (see `CrawlCheckpoint.session`), so that the crawl can be continued with `resume`.
 
         Returns
         -------
         WebGraph
             The combined `WebGraph` containing all nodes and edges explored from the provided URLs.
         """
-        crawl_subgraph = WebGraph()
-        for url in urls:
-            subgraph = self.crawl(url, max_depth=max_depth)
-            crawl_subgraph.graph.update(subgraph.graph)  # Merge subgraphs
+        if workers <= 1 and self.politeness is None and checkpoint is None:
+            crawl_subgraph = WebGraph(store=self.graph_store)
+            for url in urls:
+                subgraph = self.crawl(url, max_depth=max_depth)
+                crawl_subgraph.update(subgraph)  # Merge subgraphs
+            return crawl_subgraph
+
+        if checkpoint is not None:
+            checkpoint.begin([self.get_node(url) for url in urls], max_depth, sessions=True)
+        return self._expand_sessions(urls, max_depth, workers, checkpoint)
+
+    def resume(self, checkpoint, workers=1):
+        """Continues a crawl from its last checkpoint.
+
+        A crawl from several URLs (see `crawl_multiple_urls`) continues the session of every URL from its own
+        checkpoint, starting the sessions that were not started yet.
+
+        Parameters
+        ----------
+        checkpoint : CrawlCheckpoint
+            The checkpoint of the crawl to continue.
+        workers : int, optional
+            The number of threads used to visit web pages concurrently. Defaults to 1.
+
+        Returns
+        -------
+        WebGraph
+            The graph of the crawl, containing nodes and edges explored.
+        """
+        state = checkpoint.load()
+        if not state.sessions:
+            return super().resume(checkpoint, workers=workers)
+        return self._expand_sessions(state.roots, state.max_depth, workers, checkpoint, resume=True)
+
+    def _expand_sessions(self, urls, max_depth, workers, checkpoint, resume=False):
+        # The executor is created before the copies of the crawler, which share its scheduler
+        executor = self.create_executor(workers)
+        loops = None
+        try:
+            sessions = []
+            for index, url in enumerate(urls):
+                crawler = self._session_copy(share_state=index == len(urls) - 1)
+                session_checkpoint = checkpoint.session(index) if checkpoint is not None else None
+                if resume and session_checkpoint.exists():
+                    crawl_subgraph, start_nodes, session_depth = crawler._restore(session_checkpoint)
+                else:
+                    crawl_subgraph = crawler.start_new_crawling_session(url)
+                    start_nodes, session_depth = crawl_subgraph.all_nodes(), max_depth
+                    if session_checkpoint is not None:
+                        session_checkpoint.begin(start_nodes, max_depth)
+                sessions.append((crawler, crawl_subgraph, start_nodes, session_depth, session_checkpoint))
+
+            if executor is None:
+                subgraphs = [
+                    crawler.expand_frontier(crawl_subgraph, start_nodes, session_depth, checkpoint=session_checkpoint)
+                    for crawler, crawl_subgraph, start_nodes, session_depth, session_checkpoint in sessions
+                ]
+            else:
+                # Every session runs its own BFS loop, waiting for its visits in order, while all the visits
+                # share the workers
+                loops = ThreadPoolExecutor(max_workers=len(sessions), thread_name_prefix="CrawlSession")
+                futures = [
+                    loops.submit(
+                        crawler.expand_frontier,
+                        crawl_subgraph,
+                        start_nodes,
+                        session_depth,
+                        workers,
+                        session_checkpoint,
+                        executor,
+                    )
+                    for crawler, crawl_subgraph, start_nodes, session_depth, session_checkpoint in sessions
+                ]
+                subgraphs = [future.result() for future in futures]
+        finally:
+            # Cancelling the visits left also stops the other sessions if one of them failed
+            if executor is not None:
+                self.shutdown_executor(executor)
+            if loops is not None:
+                loops.shutdown(wait=True)
+
+        crawl_subgraph = WebGraph(store=self.graph_store)
+        for subgraph in subgraphs:
+            crawl_subgraph.update(subgraph)
+        if checkpoint is not None:
+            checkpoint.finish()
         return crawl_subgraph
+
+    def _session_copy(self, share_state=False):
+        """Returns a copy of the crawler to crawl one of several URLs in its own crawling session.
+
+        The copy shares the configuration, HTTP session, caches, alias table and scheduler of the crawler, but has
+        its own allowed domains, URL spellings and duplicate contents. With `share_state`, the copy keeps the URL
+        spellings and duplicate contents of the crawler, which then reports those of its session as after a serial
+        crawl of the URLs.
+        """
+        crawler = copy.copy(self)
+        if not share_state:
+            crawler._spellings = set()
+            crawler._canonical_urls = set()
+            crawler._spellings_lock = threading.Lock()
+            if self.deduplicator is not None:
+                crawler.deduplicator = copy.copy(self.deduplicator)
+                crawler.deduplicator.clear()
+        return crawler
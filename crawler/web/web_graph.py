@@ -1,4 +1,5 @@
 from ..base.base_graph import BaseGraph
+from .graph_file import load_web_graph, save_web_graph
 
 
 class WebGraph(BaseGraph):
@@ -17,6 +18,10 @@ class WebGraph(BaseGraph):
         Offers a detailed string representation of the web graph's nodes, listing URLs and their crawl depths.
     _repr_html_()
         Generates an HTML representation of the graph for display in Jupyter notebooks or web interfaces.
+    save(path, content=True, compression_level=6)
+        Saves the graph, and optionally the content of its pages, to a binary file.
+    load(path, store="compact", session=None, cache=None, parser=None)
+        Opens a graph saved with `save`, memory-mapping the file.
 
     Examples
     --------
@@ -37,9 +42,15 @@ class WebGraph(BaseGraph):
     instances being compatible with the `WebGraph` structure.
     """
 
-    def __init__(self):
-        """Initializes a new WebGraph instance, ready for adding web nodes and edges."""
-        super().__init__()
+    def __init__(self, store=None):
+        """Initializes a new WebGraph instance, ready for adding web nodes and edges.
+
+        Parameters
+        ----------
+        store : {None, "networkx", "compact"}, optional
+            The storage engine of the graph (see `BaseGraph`). Default is None ("networkx").
+        """
+        super().__init__(store=store)
 
     def __repr__(self):
         """Returns a compact representation of the WebGraph, indicating the number of nodes.
@@ -49,7 +60,53 @@ class WebGraph(BaseGraph):
         str
             A string representation indicating the number of nodes in the graph.
         """
-        return f"WebGraph({len(self.graph.nodes)} nodes)"
+        return f"WebGraph({len(self)} nodes)"
+
+    def save(self, path, content=True, compression_level=6):
+        """Saves the graph, and optionally the content of its pages, to a binary file (see `save_web_graph`).
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+        content : bool, optional
+            If True, the compressed HTML of every page is saved, fetching the pages not fetched yet. Default is True.
+        compression_level : int, optional
+            The zlib compression level of the page contents, from 0 (uncompressed) to 9. Default is 6.
+
+        Returns
+        -------
+        str
+            The path of the saved file.
+        """
+        return save_web_graph(self, path, content=content, compression_level=compression_level)
+
+    @classmethod
+    def load(cls, path, store="compact", session=None, cache=None, parser=None):
+        """Opens a graph saved with `save` (see `load_web_graph`).
+
+        The file is memory-mapped, nodes are created on first access, and page contents are only read and
+        decompressed when they are converted to Markdown.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+        store : {"compact", "networkx"}, optional
+            The storage engine of the graph. Default is "compact".
+        session : HttpSession, optional
+            The HTTP session fetching pages saved without content. Default is None.
+        cache : PageCache, optional
+            The page cache shared by the nodes. Default is a new `PageCache`.
+        parser : str or HtmlParser, optional
+            The HTML parser backend of the nodes. Default is "html.parser".
+
+        Returns
+        -------
+        WebGraph
+            The loaded graph.
+        """
+        return load_web_graph(path, store=store, session=session, cache=cache, parser=parser)
 
     def __str__(self):
         """Provides a detailed string representation of the web graph's nodes.
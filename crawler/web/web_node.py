@@ -1,10 +1,26 @@
+import re
+import html as html_entities
+import zlib
 import logging
 import requests
-import html2text
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 
+from .page_cache import PageCache
+from .html_parser import get_parser
+from .link_extractor import parse_links
+from .markdown_converter import DEFAULT_CONVERTER, convert_html_bytes
 from ..base.base_node import BaseNode
+from ..base.dedup import fingerprint_content
+from ..base.metrics import timed
+
+# Elements whose content is not text, and tags, removed to extract the text of a page for near-duplicate detection
+_NON_TEXT_PATTERN = re.compile(r"<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->", re.DOTALL | re.IGNORECASE)
+_TAG_PATTERN = re.compile(r"<[^>]*>")
+
+
+def _visible_text(html):
+    """Returns the text of an HTML document, without markup, scripts or styles."""
+    return html_entities.unescape(_TAG_PATTERN.sub(" ", _NON_TEXT_PATTERN.sub(" ", html)))
 
 
 class WebNode(BaseNode):
@@ -15,30 +31,87 @@ class WebNode(BaseNode):
     ----------
     url : str
         The URL of the web page this node represents.
+    session : HttpSession, optional
+        The pooled HTTP session used to fetch the web page. If None, a standalone `requests.get` call is used.
+    cache : PageCache, optional
+        The page cache shared by all the nodes of a crawl. If None, the node gets its own private cache.
+    lean : bool, optional
+        If True, the node keeps only its extracted links and its zlib-compressed HTML, and discards the parsed tree
+        after each use. Defaults to False.
+    parser : str or HtmlParser, optional
+        The HTML parser backend, or its name ("html.parser", "lxml" or "selectolax"). Defaults to "html.parser".
+    converter : MarkdownConverter, optional
+        The HTML to Markdown converter, which memoizes Markdown by content hash. Defaults to a converter shared by
+        all the nodes.
+    metrics : CrawlMetrics, optional
+        The metrics the node reports the duration of its fetch, parse, link extraction and conversion phases to. If
+        None, the node is not instrumented.
     **attributes : dict, optional
         Additional attributes for the web node, passed as keyword arguments.
 
     Attributes
     ----------
-    _content_fetched : bool
-        Indicates whether the HTML content has been fetched and parsed.
+    session : HttpSession or None
+        The pooled HTTP session used to fetch the web page.
+    cache : PageCache
+        The cache holding the raw HTML of fetched pages, keyed by normalized URL.
+    lean : bool
+        Whether the node runs in memory-lean mode.
+    parser : HtmlParser
+        The HTML parser backend.
+    converter : MarkdownConverter
+        The HTML to Markdown converter.
+    metrics : CrawlMetrics or None
+        The metrics of the node's phases.
+    _soup : object or None
+        The parsed HTML content (a BeautifulSoup object with the default backend), or None until the page is first
+        accessed (or after it has been released).
+    _html : str or None
+        The HTML content of the page (empty if it could not be fetched), once fetched or given to `load_html`, until
+        it is released.
+    _links : tuple of str or None
+        In lean mode, the hyperlinks extracted from the page.
+    _html_z : bytes or None
+        In lean mode, or once released, the zlib-compressed HTML content of the page.
+    _final_url : str or None
+        The URL the page was served from, if the request was redirected.
+    _canonical_url : str or None
+        The absolute canonical URL declared by the page with `<link rel="canonical">`, once its links are extracted.
 
     Methods
     -------
+    _fetch_html()
+        Returns the web page's HTML content from the page cache, fetching it on a cache miss.
     _fetch_and_parse_html()
-        Fetches the web page's HTML content and parses it using BeautifulSoup.
+        Fetches the web page's HTML content and parses it with the parser backend.
+    load_html(html, final_url=None)
+        Stores HTML content fetched elsewhere as the node's content.
     soup
-        A property that ensures the HTML content is fetched and parsed upon first access, returning a BeautifulSoup object.
+        A property that ensures the HTML content is fetched and parsed upon first access, returning the parsed document.
     fetch_connected_hyperlinks()
         Extracts and returns all hyperlinks found within the web page's HTML content.
     convert_to_markdown()
         Converts the web page's HTML content to Markdown format.
     url
         A property returning the URL of the web page.
+    final_url
+        A property returning the URL the web page was served from, after redirects.
+    canonical_url
+        A property returning the canonical URL of the web page, as declared by the page or reached by redirects.
+    copy_as(url)
+        Returns a node identified by another URL, sharing the content of this node.
     domain
         Extracts and returns the domain part of the web page's URL.
     to_markdown()
         Converts the node's content (the web page's HTML) to Markdown format.
+    markdown_task()
+        Returns a picklable task converting the web page's raw HTML to Markdown in another process.
+    release()
+        Drops the parsed HTML content of the web page.
+    dump_content()
+        Returns the compressed HTML content held by the node, without fetching it.
+    load_content(content)
+        Restores compressed HTML content returned by `dump_content`.
 
     Examples
     --------
@@ -55,59 +128,196 @@ class WebNode(BaseNode):
     >>> print(markdown_content[:100])  # Print the first 100 characters of the Markdown content
     """
 
-    def __init__(self, url, **attributes):
+    __slots__ = (
+        "session",
+        "cache",
+        "lean",
+        "parser",
+        "converter",
+        "metrics",
+        "_soup",
+        "_html",
+        "_links",
+        "_html_z",
+        "_final_url",
+        "_canonical_url",
+    )
+
+    def __init__(
+        self, url, session=None, cache=None, lean=False, parser=None, converter=None, metrics=None, **attributes
+    ):
         """Initializes a WebNode instance representing a web page.
 
         Parameters
         ----------
         url : str
             The URL of the web page this node represents.
+        session : HttpSession, optional
+            The pooled HTTP session used to fetch the web page. If None, a standalone `requests.get` call is used.
+        cache : PageCache, optional
+            The page cache shared by all the nodes of a crawl. If None, the node gets its own private cache.
+        lean : bool, optional
+            If True, the parsed tree is discarded after links or Markdown are extracted, and only the links and the
+            compressed HTML are kept. Defaults to False.
+        parser : str or HtmlParser, optional
+            The HTML parser backend, or its name. Defaults to "html.parser".
+        converter : MarkdownConverter, optional
+            The HTML to Markdown converter. Defaults to a converter shared by all the nodes.
+        metrics : CrawlMetrics, optional
+            The metrics the node reports its phases to. Defaults to None (no instrumentation).
         **attributes : dict, optional
             Additional attributes for the web node, such as 'depth' in the crawl graph, passed as keyword arguments.
         """
         super().__init__(url, **attributes)
-        self._content_fetched = False
-        self.cache = {}  # Add a cache dictionary to the WebNode
+        self.session = session
+        self.cache = cache if cache is not None else PageCache()
+        self.lean = lean
+        self.parser = get_parser(parser)
+        self.converter = converter if converter is not None else DEFAULT_CONVERTER
+        self.metrics = metrics
+        self._soup = None
+        self._html = None
+        self._links = None
+        self._html_z = None
+        self._final_url = None
+        self._canonical_url = None
+
+    def _fetch_html(self):
+        metrics = self.metrics
+        html = self.cache.get(self.url)  # Check if the URL is in the cache
+        if html is not None:
+            logging.info("Retrieved %s from cache", str(self.url))
+            if metrics is not None:
+                metrics.count("cache_hits")
+            return html
+
+        try:
+            with timed(metrics, "download", self.url):
+                if self.session is not None:
+                    response = self.session.get(self.url)
+                else:
+                    response = requests.get(self.url, timeout=5)
+            if metrics is not None:
+                metrics.count("bytes_in", len(response.content))
+                metrics.count("pages_fetched" if response.status_code == 200 else "pages_failed")
+            if response.status_code == 200:
+                html = response.text
+                self.cache[self.url] = html  # Store in cache
+                if response.url and response.url != self.url:
+                    self._final_url = response.url
+                    logging.info("Redirected %s to %s", str(self.url), str(response.url))
+                logging.info("Fetched %s webpage url", str(self.url))
+                return html
+            logging.warning("Failed to access %s: %s", str(self.url), str(response.status_code))
+        except requests.RequestException as e:
+            logging.warning("Failed to access %s: %s", str(self.url), str(e))
+            if metrics is not None:
+                metrics.count("pages_failed")
+        return ""
+
+    def _raw_html(self):
+        """Returns the HTML content of the web page without parsing it, fetching it if needed."""
+        if self._html is not None:
+            return self._html
+        if self._html_z is not None:
+            return zlib.decompress(self._html_z).decode("utf-8")
+
+        html = self._fetch_html()
+        # The content is held even if the page could not be fetched, so that it is never requested again
+        if self.lean:
+            self._html_z = zlib.compress(html.encode("utf-8"))
+        else:
+            self._html = html
+        return html
 
     def _fetch_and_parse_html(self):
-        if self.url not in self.cache:  # Check if the URL is in the cache
-            try:
-                response = requests.get(self.url, timeout=5)
-                if response.status_code == 200:
-                    self.cache[self.url] = BeautifulSoup(response.text, "html.parser")  # Store in cache
-                    logging.info("Fetched and parsed %s webpage urls", str(self.url))
-                else:
-                    logging.warning(
-                        "Failed to access %s: %s", str(self.url), str(response.status_code)
-                    )
-                    self.cache[self.url] = BeautifulSoup("", "html.parser")  # Store empty in cache
-            except requests.RequestException as e:
-                logging.warning("Failed to access %s: %s", str(self.url), str(e))
-                self.cache[self.url] = BeautifulSoup("", "html.parser")  # Store empty in cache
-            finally:
-                self._content_fetched = True
+        html = self._raw_html()
+        with timed(self.metrics, "parse", self.url):
+            self._soup = self.parser.parse(html)
+        logging.debug("Parsed %s webpage url", str(self.url))
+
+    def load_html(self, html, final_url=None):
+        """Stores HTML content that was fetched elsewhere as the content of this node. It is parsed on first access.
+
+        This allows alternative fetch paths (e.g. an asyncio engine) to provide the page content without going
+        through the blocking `requests` call of `_fetch_and_parse_html`.
+
+        Parameters
+        ----------
+        html : str
+            The HTML content of the web page. An empty string marks the page as fetched but empty, and is not
+            stored in the page cache.
+        final_url : str, optional
+            The URL the content was served from, if the request was redirected. Defaults to None.
+        """
+        if final_url is not None and final_url != self.url:
+            self._final_url = final_url
+        if html:
+            self.cache[self.url] = html
+        if self.lean:
+            self._html_z = zlib.compress(html.encode("utf-8"))
         else:
-            logging.info("Retrieved %s from cache", str(self.url))
+            self._html = html
+        self._soup = None
+
+    def release(self):
+        """Drops the parsed HTML content of the web page held by the node, and keeps its HTML compressed. It is
+        parsed again on next access from the compressed HTML, so that a page is never fetched again once fetched."""
+        if self._html is not None:
+            self._html_z = zlib.compress(self._html.encode("utf-8"))
+        self._soup = None
+        self._html = None
+
+    def dump_content(self):
+        """Returns the HTML content held by the node, to be saved with a crawl checkpoint. The page is never fetched.
+
+        Returns
+        -------
+        bytes or None
+            The zlib-compressed HTML content (empty if the page could not be fetched), or None if the page was not
+            fetched.
+        """
+        if self._html_z is not None:
+            return bytes(self._html_z)
+        if self._html is not None:
+            return zlib.compress(self._html.encode("utf-8"))
+        return None
+
+    def load_content(self, content):
+        """Restores the HTML content returned by `dump_content`, which is then never fetched.
+
+        Parameters
+        ----------
+        content : bytes-like
+            The zlib-compressed HTML content.
+        """
+        self._html_z = content
+        self._html = None
+        self._soup = None
 
     @property
     def soup(self):
         """A property that ensures the HTML content is fetched and parsed upon first access. It
-        returns a BeautifulSoup object containing the parsed HTML of the web page. This allows for
+        returns the document containing the parsed HTML of the web page. This allows for
         lazy loading of web page content, minimizing unnecessary network operations.
 
         Returns
         -------
-        BeautifulSoup
-            The BeautifulSoup object containing the parsed HTML of the web page, or an empty BeautifulSoup object if
+        object
+            The document returned by the parser backend (a BeautifulSoup object with the default backend), empty if
             the content could not be fetched.
         """
-        if not self._content_fetched:
+        if self._soup is None:
             self._fetch_and_parse_html()
-        return self.cache[self.url]
+        return self._soup
 
     def fetch_connected_hyperlinks(self):
-        """Extracts and returns all hyperlinks found within the web page's HTML content. It parses
-        the `a` tags to extract the `href` attribute values, resolving them to absolute URLs.
+        """Extracts and returns all hyperlinks found within the web page's HTML content. It reads
+        the `href` attribute values of the `a` tags, resolving them to absolute URLs against the page's `base`
+        URL.
+
+        Unless the page has already been parsed, the links are read by a streaming tokenizer, without building a
+        document tree: the tree is only built if the page is later converted to Markdown.
 
         Returns
         -------
@@ -115,13 +325,36 @@ class WebNode(BaseNode):
             A list containing the absolute URLs of all hyperlinks found within the web page's HTML content. The list
             is sorted to maintain a consistent order of URLs.
         """
-        if self.soup is None:
-            return []
+        if self._links is not None:
+            return list(self._links)
 
-        urls = set()
-        for link in self.soup.find_all("a"):
-            href = link.get("href")
+        html = self._raw_html() if self._soup is None else None
+        with timed(self.metrics, "links", self.url):
+            urls = self._extract_links(html)
+        if self.metrics is not None:
+            self.metrics.count("links_extracted", len(urls))
+
+        if self.lean:
+            self._links = tuple(urls)
+            self.release()
 
+        return urls
+
+    def _extract_links(self, html):
+        # Reads the links of the parsed tree if any, else streams the raw HTML
+        if self._soup is not None:
+            base_href, hrefs = self.parser.base_href(self._soup), self.parser.hrefs(self._soup)
+            canonical_href = self.parser.canonical_href(self._soup)
+        else:
+            extractor = parse_links(html)
+            base_href, hrefs, canonical_href = extractor.base_href, extractor.hrefs, extractor.canonical_href
+        # Relative links resolve against the URL the page was actually served from
+        base_url = urljoin(self.final_url, base_href) if base_href else self.final_url
+        if canonical_href:
+            self._canonical_url = urljoin(base_url, canonical_href.strip())
+
+        urls = set()
+        for href in hrefs:
             if href is None:
                 continue
 
@@ -129,14 +362,13 @@ class WebNode(BaseNode):
                 href = href.split(".html")[0] + ".html"
 
             if href and not href.startswith("#"):
-                full_url = urljoin(self.url, href)
+                full_url = urljoin(base_url, href)
                 urls.add(full_url)
         urls = list(urls)
         urls.sort()
 
         for idx, url in enumerate(urls):
             logging.debug("\tConnected hyperlink %d: %s", idx, str(url))
-
         return urls
 
     def convert_to_markdown(self):
@@ -144,20 +376,54 @@ class WebNode(BaseNode):
         method allows for a text representation of the web page's content, which can be particularly
         useful for documentation or note-taking applications.
 
+        The original HTML is converted in a single pass, without parsing it into a document tree, and the result is
+        memoized by content hash in the node's converter. The page is only fetched if it has not been yet: the
+        content held by a crawled node (even empty, or released) is converted without any request.
+
         Returns
         -------
         str
             The Markdown text representation of the web page's HTML content. If the content has not been fetched or
             if there's no content, an empty string is returned.
         """
-        if self.soup is None:
-            return ""
+        html = self._raw_html()
+        with timed(self.metrics, "markdown", self.url):
+            return self.converter.convert(html)
 
-        h = html2text.HTML2Text()
-        h.ignore_links = (
-            True  # Optionally, links can be included by setting this to False
-        )
-        return h.handle(self.soup.prettify())
+    def markdown_task(self):
+        """Returns a picklable task converting the web page's raw HTML to Markdown in another process.
+
+        Only the UTF-8 encoded HTML and the converter options are shipped to the worker process.
+
+        Returns
+        -------
+        tuple of (callable, tuple) or None
+            The conversion function and its arguments, or None if the page has no content.
+        """
+        html = self._raw_html()
+        if not html:
+            return None
+        return convert_html_bytes, (html.encode("utf-8"), self.converter.options)
+
+    def content_fingerprint(self, text=False):
+        """Fingerprints the HTML content of the web page, fetching it if needed.
+
+        Parameters
+        ----------
+        text : bool, optional
+            If True, the fingerprint also holds a SimHash of the visible text of the page, to detect near
+            duplicates. Default is False.
+
+        Returns
+        -------
+        ContentFingerprint or None
+            The fingerprint, or None if the page has no content (e.g. it could not be fetched).
+        """
+        html = self._raw_html()
+        if not html:
+            return None
+        with timed(self.metrics, "fingerprint", self.url):
+            return fingerprint_content(html.encode("utf-8"), _visible_text(html) if text else None)
 
     @property
     def url(self):
@@ -171,6 +437,65 @@ class WebNode(BaseNode):
         """
         return self.id
 
+    @property
+    def final_url(self):
+        """The URL the web page was served from, which differs from `url` when the request was redirected.
+
+        Returns
+        -------
+        str
+            The final URL of the web page, or its URL if it was not redirected (or not fetched yet).
+        """
+        return self._final_url if self._final_url is not None else self.url
+
+    @property
+    def canonical_url(self):
+        """The canonical URL of the web page: the URL declared by its `<link rel="canonical">` element, or else the
+        URL it was redirected to. It is only known once the page is fetched (and its links are extracted, for the
+        declared URL), and never triggers a fetch.
+
+        Returns
+        -------
+        str
+            The canonical URL of the web page, which is its URL if it declares none and was not redirected.
+        """
+        return self._canonical_url if self._canonical_url is not None else self.final_url
+
+    def copy_as(self, url):
+        """Returns a node identified by another URL, sharing the content of this node. Used to move the content of
+        a page fetched through an alias (e.g. a redirecting URL) to the node of its canonical URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the new node.
+
+        Returns
+        -------
+        WebNode
+            A node for `url`, with the content, links and final URL of this node.
+        """
+        node = WebNode(
+            url,
+            session=self.session,
+            cache=self.cache,
+            lean=self.lean,
+            parser=self.parser,
+            converter=self.converter,
+            metrics=self.metrics,
+        )
+        node._soup = self._soup
+        node._html = self._html
+        node._links = self._links
+        node._html_z = self._html_z
+        node._final_url = self.final_url if self.final_url != url else None
+        node._canonical_url = self._canonical_url
+        if self._html is None and self._html_z is None:
+            html = self.cache.get(self.url)
+            if html is not None:
+                self.cache[url] = html
+        return node
+
     @property
     def domain(self):
         """Extracts and returns the domain part of the web page's URL, facilitating operations that
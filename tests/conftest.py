@@ -0,0 +1,142 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pytest import fixture
+
+
+# A small static website served by the `site_url` fixture
+SITE_PAGES = {
+    "/": '<h1>Home</h1><a href="/docs">Docs</a> <a href="/blog">Blog</a> <a href="https://otherdomain.com/">Out</a>',
+    "/docs": '<h1>Docs</h1><a href="/">Home</a> <a href="/docs/install">Install</a> <a href="/docs/usage">Usage</a>',
+    "/docs/install": '<h1>Install</h1><a href="/docs">Docs</a> <a href="/missing">Missing</a>',
+    "/docs/usage": '<h1>Usage</h1><a href="/docs/install">Install</a> <a href="/blog/post">Post</a>',
+    "/blog": '<h1>Blog</h1><a href="/blog/post">Post</a>',
+    "/blog/post": '<h1>Post</h1><a href="/">Home</a>',
+}
+
+# A website whose pages are reachable through redirects and canonical declarations, served by `aliased_site_url`
+ALIASED_SITE_PAGES = {
+    "/": '<h1>Home</h1><a href="/old">Old</a> <a href="/docs/latest/">Docs</a> <a href="/print/about">About</a>',
+    "/docs/latest/": '<h1>Docs</h1><a href="guide">Guide</a> <a href="/">Home</a>',
+    "/docs/latest/guide": '<h1>Guide</h1><a href="/old">Docs</a>',
+    "/print/about": '<link rel="canonical" href="/about"><h1>About</h1><a href="/">Home</a>',
+    "/about": '<link rel="canonical" href="/about"><h1>About</h1><a href="/">Home</a>',
+}
+ALIASED_SITE_REDIRECTS = {"/old": "/docs/latest/"}
+
+_GUIDE_TEXT = " ".join(f"Paragraph {index} of the installation guide explains one step." for index in range(12))
+
+# A website serving the same guide under several URLs, served by `duplicate_site_url`
+DUPLICATE_SITE_PAGES = {
+    "/": '<h1>Home</h1><a href="/guide">Guide</a> <a href="/mirror/guide">Mirror</a> <a href="/print/guide">Print</a>',
+    "/guide": f'<h1>Guide</h1><p>{_GUIDE_TEXT}</p><a href="child">Next</a>',
+    "/mirror/guide": f'<h1>Guide</h1><p>{_GUIDE_TEXT}</p><a href="child">Next</a>',
+    "/print/guide": f'<h1>Guide</h1><p>{_GUIDE_TEXT} Printed.</p><a href="/print/child">Next</a>',
+    "/child": "<h1>Child</h1>",
+    "/mirror/child": "<h1>Mirror child</h1>",
+    "/print/child": "<h1>Print child</h1>",
+}
+
+
+class SiteRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.request_paths.append(self.path)
+        if self.server.throttled.get(self.path, 0) > 0:
+            self.server.throttled[self.path] -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        location = self.server.redirects.get(self.path)
+        if location is not None:
+            self.send_response(301)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        page = self.server.pages.get(self.path)
+        if page is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = f"<html><body>{page}</body></html>".encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_site(pages, redirects=None):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteRequestHandler)
+    server.daemon_threads = True
+    server.request_paths = []
+    server.pages = pages
+    server.redirects = redirects or {}
+    # Number of 429 answers sent for a path before it is served
+    server.throttled = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@fixture
+def site_server():
+    server = serve_site(SITE_PAGES)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@fixture
+def aliased_site_server():
+    server = serve_site(ALIASED_SITE_PAGES, ALIASED_SITE_REDIRECTS)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@fixture
+def duplicate_site_server():
+    server = serve_site(DUPLICATE_SITE_PAGES)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@fixture
+def site_url(site_server):
+    host, port = site_server.server_address
+    return f"http://{host}:{port}/"
+
+
+@fixture
+def aliased_site_url(aliased_site_server):
+    host, port = aliased_site_server.server_address
+    return f"http://{host}:{port}/"
+
+
+@fixture
+def duplicate_site_url(duplicate_site_server):
+    host, port = duplicate_site_server.server_address
+    return f"http://{host}:{port}/"
@@ -0,0 +1,49 @@
+import asyncio
+
+from pytest import raises
+
+from crawler.base.checkpoint import CrawlCheckpoint
+from crawler.web.web_crawler import WebCrawler
+from crawler.web.web_graph import WebGraph
+from crawler.web.async_web_crawler import AsyncWebCrawler
+
+
+def graph_summary(graph):
+    nodes = sorted(
+        (node.id, node.depth, node.parent.id if node.parent else None)
+        for node in graph.all_nodes()
+    )
+    return nodes, sorted(graph.graph.edges(data="depth"))
+
+
+def test_async_crawl_matches_web_crawler(site_url):
+    for max_depth in range(4):
+        expected = WebCrawler().crawl(site_url, max_depth=max_depth)
+        graph = asyncio.run(
+            AsyncWebCrawler(concurrency=3).crawl(site_url, max_depth=max_depth)
+        )
+        assert isinstance(graph, WebGraph)
+        assert graph_summary(graph) == graph_summary(expected)
+
+
+def test_async_crawl_saves_markdown(site_url, tmp_path):
+    graph = asyncio.run(AsyncWebCrawler().crawl(site_url, max_depth=1))
+    graph.save_to_single_file(directory=tmp_path, filename="merged.md")
+    content = (tmp_path / "merged.md").read_text(encoding="utf-8")
+    assert "Docs" in content and "Blog" in content
+
+
+def test_async_crawl_multiple_urls_matches_web_crawler(site_url, aliased_site_url):
+    urls = [site_url, aliased_site_url]
+    expected = WebCrawler().crawl_multiple_urls(urls, max_depth=2)
+    graph = asyncio.run(AsyncWebCrawler().crawl_multiple_urls(urls, max_depth=2))
+    assert isinstance(graph, WebGraph)
+    assert graph_summary(graph) == graph_summary(expected)
+
+
+def test_async_crawler_rejects_blocking_crawls(site_url, tmp_path):
+    crawler = AsyncWebCrawler()
+    with raises(NotImplementedError):
+        crawler.iter_crawl(site_url)
+    with raises(NotImplementedError):
+        crawler.resume(CrawlCheckpoint(str(tmp_path)))
@@ -0,0 +1,84 @@
+import time
+import random
+
+from crawler.base.base_node import BaseNode
+from crawler.base.base_graph import BaseGraph
+from crawler.base.base_crawler import BaseCrawler
+
+
+SITE = {
+    "a": ["b", "c", "d"],
+    "b": ["a", "e", "f"],
+    "c": ["f", "g"],
+    "d": ["h"],
+    "e": ["i"],
+    "f": ["i", "j"],
+    "g": ["a"],
+    "h": ["j", "k"],
+    "i": [],
+    "j": ["a"],
+    "k": ["l"],
+    "l": [],
+}
+
+
+class DictNode(BaseNode):
+    @property
+    def url(self):
+        return self.id
+
+    def to_markdown(self):
+        return self.id
+
+
+class DictCrawler(BaseCrawler):
+    def __init__(self, site, delay=0.0):
+        super().__init__()
+        self.site = site
+        self.delay = delay
+
+    def get_node(self, node_id):
+        return DictNode(node_id)
+
+    def start_new_crawling_session(self, start_node_id):
+        crawl_subgraph = BaseGraph()
+        crawl_subgraph.add_node(self.get_node(start_node_id))
+        return crawl_subgraph
+
+    def visit_node_neighborhood(self, node):
+        if self.delay:
+            time.sleep(random.uniform(0, self.delay))
+        return [DictNode(neighbor) for neighbor in self.site[node.id]]
+
+
+def graph_summary(graph):
+    nodes = [
+        (node.id, node.depth, node.parent.id if node.parent else None)
+        for node in graph.all_nodes()
+    ]
+    return nodes, sorted(graph.graph.edges(data="depth"))
+
+
+def test_serial_crawl_respects_max_depth():
+    graph = DictCrawler(SITE).crawl("a", max_depth=1)
+    assert sorted(node.id for node in graph.all_nodes()) == ["a", "b", "c", "d"]
+
+
+def test_concurrent_crawl_matches_serial_crawl():
+    for max_depth in range(5):
+        serial = DictCrawler(SITE).crawl("a", max_depth=max_depth)
+        concurrent = DictCrawler(SITE, delay=0.01).crawl(
+            "a", max_depth=max_depth, workers=4
+        )
+        assert graph_summary(concurrent) == graph_summary(serial)
+
+
+def test_iter_crawl_yields_nodes_in_bfs_order():
+    expected = DictCrawler(SITE).crawl("a", max_depth=2)
+    records = list(DictCrawler(SITE, delay=0.01).iter_crawl("a", max_depth=2, workers=4))
+
+    assert [record.node.id for record in records] == [node.id for node in expected.all_nodes()]
+    assert [record.depth for record in records] == [node.depth for node in expected.all_nodes()]
+    assert records[0].parent is None and records[0].links == ["b", "c", "d"]
+    assert all(record.markdown == record.node.id for record in records)
+    assert all(record.links == [] for record in records if record.depth == 2)
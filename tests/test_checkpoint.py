@@ -0,0 +1,120 @@
+from pytest import raises
+
+from crawler.base.base_node import BaseNode
+from crawler.base.base_graph import BaseGraph
+from crawler.base.base_crawler import BaseCrawler
+from crawler.base.checkpoint import CrawlCheckpoint
+from crawler.web.web_crawler import WebCrawler
+
+
+SITE = {
+    "a": ["b", "c", "d"],
+    "b": ["a", "e", "f"],
+    "c": ["f", "g"],
+    "d": ["h"],
+    "e": ["i"],
+    "f": ["i", "j"],
+    "g": ["a"],
+    "h": ["j", "k"],
+    "i": [],
+    "j": ["a"],
+    "k": [],
+}
+
+
+class DictNode(BaseNode):
+    def to_markdown(self):
+        return self.id
+
+
+class FlakyCrawler(BaseCrawler):
+    """Crawls `SITE`, failing after `crash_after` visits to simulate a crash."""
+
+    def __init__(self, crash_after=None):
+        super().__init__()
+        self.crash_after = crash_after
+        self.visited = []
+
+    def get_node(self, node_id):
+        return DictNode(node_id)
+
+    def start_new_crawling_session(self, start_node_id):
+        crawl_subgraph = BaseGraph()
+        crawl_subgraph.add_node(self.get_node(start_node_id))
+        return crawl_subgraph
+
+    def visit_node_neighborhood(self, node):
+        if self.crash_after is not None and len(self.visited) >= self.crash_after:
+            raise RuntimeError("crash")
+        self.visited.append(node.id)
+        return [DictNode(neighbor) for neighbor in SITE[node.id]]
+
+
+def graph_summary(graph):
+    nodes = [
+        (node.id, node.depth, node.parent.id if node.parent else None)
+        for node in graph.all_nodes()
+    ]
+    return nodes, sorted(graph.graph.edges(data="depth"))
+
+
+def test_resume_continues_interrupted_crawl(tmp_path):
+    expected = FlakyCrawler().crawl("a", max_depth=3)
+
+    crashing_crawler = FlakyCrawler(crash_after=4)
+    with raises(RuntimeError):
+        crashing_crawler.crawl("a", max_depth=3, checkpoint=CrawlCheckpoint(tmp_path, compact_every=2))
+
+    resumed_crawler = FlakyCrawler()
+    graph = resumed_crawler.resume(CrawlCheckpoint(tmp_path))
+
+    assert graph_summary(graph) == graph_summary(expected)
+    assert not set(crashing_crawler.visited) & set(resumed_crawler.visited)
+
+
+def test_resume_completed_crawl_does_not_visit(tmp_path):
+    FlakyCrawler().crawl("a", max_depth=2, checkpoint=CrawlCheckpoint(tmp_path))
+    state = CrawlCheckpoint(tmp_path).load()
+    assert state.complete
+
+    crawler = FlakyCrawler()
+    crawler.resume(CrawlCheckpoint(tmp_path))
+    assert crawler.visited == []
+
+
+def test_aliases_fold_into_canonical_nodes(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path))
+    a, b, c, d = (DictNode(node_id) for node_id in "abcd")
+    b.parent = c.parent = a
+    b.depth = c.depth = 1
+    checkpoint.begin([a], max_depth=2)
+    for node in (b, c):
+        checkpoint.record_node(node)
+        checkpoint.record_edge(a, node, 1)
+    checkpoint.record_expanded(a)
+    checkpoint.record_alias(b, d)
+    checkpoint.record_expanded(d)
+    checkpoint.record_alias(c, d)
+    checkpoint.close()
+
+    for state in (checkpoint.load(), (checkpoint.compact(), checkpoint.load())[1]):
+        assert list(state.nodes) == ["a", "d"]
+        assert state.nodes["d"] == (1, "a")
+        assert state.edges == {("a", "d"): 1}
+        assert state.frontier() == []
+
+
+def test_resumed_crawl_does_not_refetch_expanded_pages(site_server, site_url, tmp_path):
+    expected = WebCrawler().crawl(site_url, max_depth=2)
+    expected_markdown = {node.id: node.to_markdown() for node in expected.all_nodes()}
+    WebCrawler().crawl(site_url, max_depth=2, checkpoint=CrawlCheckpoint(str(tmp_path)))
+    # A record cut short by a crash is dropped
+    with open(CrawlCheckpoint(str(tmp_path)).contents_path, "ab") as file:
+        file.write(b"\x05\x00")
+
+    site_server.request_paths.clear()
+    graph = WebCrawler().resume(CrawlCheckpoint(str(tmp_path)))
+    markdown = {node.id: node.to_markdown() for node in graph.all_nodes()}
+
+    assert markdown == expected_markdown
+    assert sorted(site_server.request_paths) == ["/blog/post", "/docs/install", "/docs/usage"]
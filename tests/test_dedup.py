@@ -0,0 +1,66 @@
+import pytest
+
+from crawler import stream_to_files
+from crawler.web.web_crawler import WebCrawler
+from crawler.base.dedup import ContentDeduplicator, fingerprint_content, get_deduplicator, simhash
+
+TEXT = " ".join(f"Sentence number {index} describes the crawler configuration." for index in range(10))
+
+
+def test_simhash_of_similar_texts_are_close():
+    edited = TEXT.replace("number 4", "number four")
+    assert (simhash(TEXT) ^ simhash(edited)).bit_count() <= 3
+    assert (simhash(TEXT) ^ simhash(TEXT.upper())) == 0
+    assert (simhash(TEXT) ^ simhash("An unrelated text about cooking pasta " * 5)).bit_count() > 3
+    assert simhash("Too short") is None
+
+
+def test_deduplicator():
+    deduplicator = ContentDeduplicator(near_duplicates=True)
+    assert deduplicator.submit("a", fingerprint_content(b"<p>a</p>", TEXT)) is None
+    assert deduplicator.submit("b", fingerprint_content(b"<p>a</p>", TEXT)) == "a"
+    assert deduplicator.submit("c", fingerprint_content(b"<p>c</p>", TEXT + " Edited.")) == "a"
+    assert deduplicator.submit("d", fingerprint_content(b"<p>d</p>", "Too short")) is None
+    assert deduplicator.submit("a", fingerprint_content(b"<p>a</p>", TEXT)) is None
+    report = deduplicator.report()
+    assert report["exact_duplicates"] == 1 and report["near_duplicates"] == 1
+    assert report["groups"] == {"a": ["b", "c"]}
+
+    exact = get_deduplicator("exact")
+    assert exact.submit("a", fingerprint_content(b"a", TEXT)) is None
+    assert exact.submit("c", fingerprint_content(b"c", TEXT)) is None
+    with pytest.raises(ValueError):
+        get_deduplicator("fuzzy")
+
+
+def test_exact_duplicates_merged_during_crawl(duplicate_site_server, duplicate_site_url):
+    crawler = WebCrawler(dedup="exact")
+    graph = crawler.crawl(duplicate_site_url, max_depth=2, workers=2)
+    ids = {node.id for node in graph.all_nodes()}
+    assert duplicate_site_url + "mirror/guide" not in ids
+    assert duplicate_site_url + "print/guide" in ids
+    # The duplicate is not expanded
+    assert duplicate_site_url + "mirror/child" not in ids
+    assert "/mirror/child" not in duplicate_site_server.request_paths
+    assert graph.graph.has_edge(duplicate_site_url, duplicate_site_url + "guide")
+    assert graph.get_node(duplicate_site_url + "mirror/guide").id == duplicate_site_url + "guide"
+    groups = crawler.dedup_report()["groups"]
+    assert groups == {duplicate_site_url + "guide": [duplicate_site_url + "mirror/guide"]}
+
+
+def test_near_duplicates_written_once(duplicate_site_url, tmp_path):
+    crawler = WebCrawler(dedup="near")
+    records = list(crawler.iter_crawl(duplicate_site_url, max_depth=2, workers=2))
+    assert sorted(record.node.id for record in records) == [
+        duplicate_site_url,
+        duplicate_site_url + "child",
+        duplicate_site_url + "guide",
+    ]
+    report = crawler.dedup_report()
+    assert report["exact_duplicates"] == 1 and report["near_duplicates"] == 1
+
+    serial = WebCrawler(dedup="near").crawl(duplicate_site_url, max_depth=2)
+    parallel = WebCrawler(dedup="near").crawl(duplicate_site_url, max_depth=2, workers=3)
+    assert sorted(serial.graph.edges) == sorted(parallel.graph.edges)
+    records = WebCrawler(dedup="near").iter_crawl(duplicate_site_url, max_depth=2)
+    assert stream_to_files(records, str(tmp_path), combine=False) == 3
@@ -1,5 +1,11 @@
+import gzip
+
+from pytest import raises
+
+from crawler.utils.bulk_writer import write_file_atomically
 from crawler.utils.file_utils import (
     generate_filename_from_url,
+    save_content_to_multiple_files,
     save_content_to_single_file,
 )
 
@@ -15,3 +21,50 @@ def test_save_content_to_single_file(tmp_path):
     save_content_to_single_file(url_text_dict, directory=tmp_path, filename="test.md")
     saved_file = tmp_path / "test.md"
     assert saved_file.exists()
+
+
+def test_save_content_to_single_file_streams_pairs(tmp_path):
+    pairs = (
+        (f"https://example.com/{index}", f"Page {index}") for index in range(3)
+    )
+    save_content_to_single_file(pairs, directory=tmp_path, filename="test.md")
+    expected = "".join(
+        f"# Source URL: https://example.com/{index}\n\nPage {index}\n\n---\n\n"
+        for index in range(3)
+    )
+    assert (tmp_path / "test.md").read_text(encoding="utf-8") == expected
+
+
+def test_save_content_to_single_file_gzip(tmp_path):
+    url_text_dict = {"https://example.com": "# Example Content"}
+    path = save_content_to_single_file(
+        url_text_dict, directory=tmp_path, filename="test.md", compression="gzip"
+    )
+    assert path.endswith("test.md.gz")
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        assert file.read() == "# Source URL: https://example.com\n\n# Example Content\n\n---\n\n"
+
+
+def test_save_content_to_multiple_files_skips_unchanged_files(tmp_path):
+    url_text_dict = {f"https://example.com/{index}": f"Page {index}" for index in range(20)}
+    stats = save_content_to_multiple_files(url_text_dict, directory=tmp_path, workers=4)
+    assert stats["written"] == 20 and stats["unchanged"] == 0
+    assert stats["files_per_second"] > 0 and stats["bytes_per_second"] > 0
+
+    url_text_dict["https://example.com/3"] = "Page 3, updated"
+    stats = save_content_to_multiple_files(url_text_dict, directory=tmp_path, workers=4)
+    assert stats["written"] == 1 and stats["unchanged"] == 19
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        generate_filename_from_url(url) for url in url_text_dict
+    )
+    assert (tmp_path / "example_com_3.md").read_text(encoding="utf-8") == (
+        "# Source URL: https://example.com/3\n\nPage 3, updated"
+    )
+
+
+def test_failed_atomic_write_raises_original_error(tmp_path):
+    path = str(tmp_path / "missing" / "page.md")
+    with raises(FileNotFoundError) as excinfo:
+        write_file_atomically(path, b"Page")
+    assert excinfo.value.__context__ is None
@@ -0,0 +1,77 @@
+import pytest
+
+from crawler.web.web_node import WebNode
+from crawler.web.web_graph import WebGraph
+from crawler.web.web_crawler import WebCrawler
+from crawler.base.graph_store import CompactStore, get_graph_store
+
+
+def build_graph(store):
+    graph = WebGraph(store=store)
+    nodes = [WebNode(f"https://example.com/page{index}") for index in range(6)]
+    for index, node in enumerate(nodes):
+        node.depth = index // 2
+        graph.add_node(node)
+    for index in range(5):
+        graph.add_edge(nodes[index], nodes[index + 1], depth=index)
+        graph.add_edge(nodes[index + 1], nodes[0], depth=index)
+    graph.add_edge(nodes[2], nodes[3], depth=7)  # Overrides the attributes of an existing edge
+    graph.add_edge(nodes[4], nodes[4], depth=0)  # Self-loops are dropped
+    return graph, nodes
+
+
+def test_compact_store_matches_networkx_store():
+    expected, _ = build_graph("networkx")
+    graph, nodes = build_graph("compact")
+    assert len(graph) == len(expected) == 6
+    assert [node.id for node in graph.all_nodes()] == [node.id for node in expected.all_nodes()]
+    assert sorted(graph.graph.edges(data="depth")) == sorted(expected.graph.edges(data="depth"))
+    assert graph.graph.has_edge(nodes[2].id, nodes[3].id)
+    assert not graph.graph.has_edge(nodes[3].id, nodes[2].id)
+    assert graph.get_node(nodes[3].id) is nodes[3]
+    assert nodes[5] in graph and WebNode("https://example.com/other") not in graph
+
+
+def test_compact_store_merge_and_discard():
+    for store in ["networkx", "compact"]:
+        graph, nodes = build_graph(store)
+        canonical = WebNode("https://example.com/canonical")
+        assert graph.merge_alias(nodes[1], canonical) is canonical
+        graph.discard(nodes[5])
+        edges = sorted(graph.graph.edges)
+        assert ("https://example.com/page0", "https://example.com/canonical") in edges
+        assert ("https://example.com/canonical", "https://example.com/page2") in edges
+        assert not any(nodes[1].id in edge or nodes[5].id in edge for edge in edges)
+        assert graph.get_node(nodes[1].id) is canonical
+        assert len(graph) == 5
+
+
+def test_compact_store_compacts_many_edges():
+    store = CompactStore()
+    nodes = [WebNode(f"https://example.com/{index}") for index in range(1000)]
+    for node in nodes:
+        store.add_node(node)
+    for index in range(200_000):
+        u = index % 1000
+        store.add_edge(nodes[u].id, nodes[(u + index // 1000 + 1) % 1000].id, {"depth": 1})
+    store.add_edge(nodes[0].id, nodes[1].id, {"depth": 1})
+    assert store.number_of_edges() == 200_000
+    assert store.has_edge(nodes[999].id, nodes[199].id) and not store.has_edge(nodes[999].id, nodes[200].id)
+    assert store.nbytes < 20 * store.number_of_edges()
+    with pytest.raises(TypeError):
+        store.add_edge(nodes[0].id, nodes[1].id, {"weight": 2})
+
+
+def test_unknown_graph_store():
+    with pytest.raises(ValueError):
+        get_graph_store("sparse")
+
+
+def test_compact_crawl_matches_default_crawl(site_url):
+    expected = WebCrawler().crawl(site_url, max_depth=3)
+    graph = WebCrawler(graph_store="compact").crawl(site_url, max_depth=3, workers=2)
+    assert isinstance(graph.store, CompactStore)
+    assert sorted(graph.graph.edges(data="depth")) == sorted(expected.graph.edges(data="depth"))
+    assert {node.id: node.depth for node in graph.all_nodes()} == {
+        node.id: node.depth for node in expected.all_nodes()
+    }
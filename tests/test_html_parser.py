@@ -0,0 +1,61 @@
+import pytest
+
+from crawler.web.web_node import WebNode
+from crawler.web.page_cache import PageCache
+from crawler.web.html_parser import SoupParser, get_parser
+from crawler.web.link_extractor import extract_hrefs
+
+
+PAGE = """<html><head><title>Title</title><base href="/base/"><link rel="stylesheet" href="/style.css"><link rel="Canonical" href="page"></head><body>
+<h1>Example   Page</h1>
+<p>Some <b>bold</b> &amp; <i>italic</i> text<br>on two lines.</p>
+<ul><li><a href="/docs">Docs</a></li><li><a href="guide.html#install">Guide</a></li></ul>
+<a href="#top">Top</a> <a>No href</a> <a href="https://other.example/">Other</a>
+<pre>  indented
+    code</pre>
+<table><tr><th>A</th><th>B</th></tr><tr><td>1</td><td>2</td></tr></table>
+</body></html>"""
+
+
+@pytest.mark.parametrize("name", ["lxml", "selectolax"])
+def test_parser_backends_match_default_backend(name):
+    pytest.importorskip(name)
+    expected = WebNode("https://example.com/a/", cache=PageCache())
+    expected.load_html(PAGE)
+    node = WebNode("https://example.com/a/", cache=PageCache(), parser=name)
+    node.load_html(PAGE)
+
+    assert node.parser.name == name
+    assert node.fetch_connected_hyperlinks() == expected.fetch_connected_hyperlinks()
+    assert node.convert_to_markdown() == expected.convert_to_markdown()
+    assert node.canonical_url == expected.canonical_url == "https://example.com/base/page"
+
+
+def test_get_parser():
+    assert isinstance(get_parser(), SoupParser)
+    parser = SoupParser()
+    assert get_parser(parser) is parser
+    with pytest.raises(ValueError):
+        get_parser("unknown")
+
+
+def test_streaming_links_match_parsed_links():
+    parsed = WebNode("https://example.com/a/", cache=PageCache())
+    parsed.load_html(PAGE)
+    parsed.soup
+    streamed = WebNode("https://example.com/a/", cache=PageCache())
+    streamed.load_html(PAGE)
+
+    links = streamed.fetch_connected_hyperlinks()
+    assert streamed._soup is None
+    assert links == parsed.fetch_connected_hyperlinks()
+    assert streamed.canonical_url == parsed.canonical_url == "https://example.com/base/page"
+    assert links == [
+        "https://example.com/base/guide.html",
+        "https://example.com/docs",
+        "https://other.example/",
+    ]
+    assert extract_hrefs(PAGE) == (
+        "/base/",
+        ["/docs", "guide.html#install", "#top", None, "https://other.example/"],
+    )
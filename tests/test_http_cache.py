@@ -0,0 +1,29 @@
+from crawler.web.web_crawler import WebCrawler
+from crawler.web.http_cache import DiskCache
+from crawler.web.http_session import HttpSession
+
+
+def crawl_with_disk_cache(site_url, cache_dir):
+    disk_cache = DiskCache(cache_dir)
+    crawler = WebCrawler(session=HttpSession(disk_cache=disk_cache))
+    graph = crawler.crawl(site_url, max_depth=2)
+    markdown = graph.to_markdown()
+    crawler.session.close()
+    return disk_cache, markdown
+
+
+def test_disk_cache_revalidates_on_next_run(site_url, tmp_path):
+    first_run, first_markdown = crawl_with_disk_cache(site_url, tmp_path)
+    assert first_run.revalidated == 0
+    assert first_run.stored == len(first_markdown)
+
+    second_run, second_markdown = crawl_with_disk_cache(site_url, tmp_path)
+    assert second_run.revalidated == len(second_markdown)
+    assert second_run.bytes_saved > 0
+    assert second_markdown == first_markdown
+
+
+def test_disk_cache_skips_responses_without_validators(tmp_path):
+    disk_cache = DiskCache(tmp_path)
+    assert disk_cache.lookup("https://example.com/") is None
+    assert disk_cache.stats() == {"revalidated": 0, "bytes_saved": 0, "stored": 0}
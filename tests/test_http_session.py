@@ -0,0 +1,20 @@
+from crawler.web.web_crawler import WebCrawler
+from crawler.web.http_session import HttpSession
+
+
+def test_session_sends_default_headers(site_url):
+    session = HttpSession(user_agent="test-agent/1.0", headers={"X-Test": "1"})
+    response = session.get(site_url)
+    assert response.request.headers["User-Agent"] == "test-agent/1.0"
+    assert response.request.headers["X-Test"] == "1"
+
+
+def test_crawler_reuses_pooled_connections(site_url):
+    crawler = WebCrawler()
+    graph = crawler.crawl(site_url, max_depth=3)
+
+    stats = crawler.session.stats
+    assert stats.requests > 1
+    assert stats.opened == 1
+    assert stats.reused == stats.requests - 1
+    assert all(node.session is crawler.session for node in graph.all_nodes())
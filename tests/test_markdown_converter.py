@@ -0,0 +1,20 @@
+from crawler.web.markdown_converter import MarkdownConverter
+
+
+def test_markdown_converter_memoizes_identical_content():
+    converter = MarkdownConverter()
+    first = converter.convert("<h1>Title</h1><p>Some <a href='/x'>link</a></p>")
+    second = converter.convert("<h1>Title</h1><p>Some <a href='/x'>link</a></p>")
+
+    assert first == second == "# Title\n\nSome link\n\n"
+    assert converter.stats() == {"entries": 1, "bytes": len(first), "hits": 1, "misses": 1}
+    assert converter.convert("") == ""
+
+
+def test_markdown_converter_respects_max_bytes():
+    converter = MarkdownConverter(max_bytes=20, ignore_links=False)
+    assert converter.convert("<a href='/x'>link</a>") == "[link](/x)\n\n"
+    converter.convert("<p>another page</p>")
+
+    stats = converter.stats()
+    assert stats["entries"] == 1 and stats["bytes"] <= 20
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from crawler import stream_to_files
+from crawler.web.web_crawler import WebCrawler
+from crawler.base.metrics import CrawlMetrics, Histogram, get_metrics, timed
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    assert histogram.quantile(0.5) is None
+    for value in [0.005] * 50 + [0.05] * 49 + [2.0]:
+        histogram.observe(value)
+    assert histogram.bucket_counts == [50, 49, 0, 1]
+    assert 0.005 <= histogram.quantile(0.5) <= 0.01
+    assert 0.01 <= histogram.quantile(0.99) <= 0.1
+    assert histogram.quantile(1.0) == 2.0
+    assert histogram.as_dict()["count"] == 100
+
+
+def test_metrics_exports(tmp_path):
+    metrics = CrawlMetrics(buckets=(0.1, 1.0), sample_interval=0, max_samples=4)
+    metrics.count("bytes_in", 100)
+    metrics.count("bytes_in", 20)
+    with metrics.phase("download"):
+        pass
+    metrics.observe("download", 0.5)
+    for value in range(10):
+        metrics.gauge("frontier", value)
+    with timed(None, "parse"):
+        pass
+
+    summary = metrics.summary()
+    assert summary["counters"] == {"bytes_in": 120}
+    assert summary["phases"]["download"]["count"] == 2
+    assert summary["gauges"]["frontier"]["max"] == 9
+    assert 0 < len(summary["gauges"]["frontier"]["samples"]) <= 4
+    assert "download" in metrics.format_summary()
+
+    prometheus = metrics.to_prometheus().splitlines()
+    assert "crawler_bytes_in_total 120" in prometheus
+    assert 'crawler_phase_seconds_bucket{phase="download",le="1.0"} 2' in prometheus
+    assert 'crawler_phase_seconds_count{phase="download"} 2' in prometheus
+    assert "crawler_frontier_max 9" in prometheus
+
+    metrics.export(str(tmp_path / "metrics.jsonl"))
+    with open(tmp_path / "metrics.jsonl", encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file]
+    assert lines[0]["type"] == "run"
+    assert {"type": "counter", "name": "bytes_in", "value": 120} in lines
+    assert any(line["type"] == "sample" and line["name"] == "frontier" for line in lines)
+    with pytest.raises(ValueError, match="metrics.csv"):
+        metrics.export(str(tmp_path / "metrics.csv"))
+
+    assert get_metrics() is None and get_metrics(metrics) is metrics
+    assert isinstance(get_metrics(True), CrawlMetrics)
+
+
+def test_crawl_phases_are_instrumented(site_url, tmp_path):
+    assert WebCrawler().metrics is None
+
+    crawler = WebCrawler(metrics=True)
+    metrics = crawler.metrics
+    assert crawler.session.metrics is metrics
+    graph = crawler.crawl(site_url, max_depth=2, workers=2)
+    graph.save_to_multiple_files(str(tmp_path / "pages"), metrics=metrics)
+
+    summary = metrics.summary()
+    phases = summary["phases"]
+    for phase in ("dns", "connect", "download", "links", "wait", "markdown", "write"):
+        assert phases[phase]["count"] > 0, phase
+    counters = summary["counters"]
+    assert counters["pages_crawled"] == len(graph)
+    assert counters["pages_fetched"] >= 3 and counters["bytes_in"] > 0
+    assert counters["files_written"] == len(graph) and counters["bytes_out"] > 0
+    assert summary["gauges"]["frontier"]["max"] >= 2
+
+    metrics.clear()
+    records = WebCrawler(metrics=metrics).iter_crawl(site_url, max_depth=1)
+    count = stream_to_files(records, str(tmp_path / "stream"), combine=True, metrics=metrics)
+    assert metrics.summary()["counters"]["pages_crawled"] == count
+    assert metrics.summary()["phases"]["write"]["count"] == count
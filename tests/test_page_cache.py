@@ -0,0 +1,48 @@
+from crawler.web.page_cache import PageCache
+from crawler.web.web_crawler import WebCrawler
+
+
+def test_page_cache_normalizes_urls():
+    cache = PageCache()
+    cache["HTTP://Example.com:80#top"] = "<h1>Home</h1>"
+    assert "http://example.com/" in cache
+    assert cache.get("http://example.com") == "<h1>Home</h1>"
+    assert cache.stats()["hits"] == 1
+
+
+def test_page_cache_evicts_least_recently_used_by_bytes():
+    cache = PageCache(max_bytes=10)
+    cache["https://example.com/a"] = "aaaa"
+    cache["https://example.com/b"] = "bbbb"
+    cache.get("https://example.com/a")
+    cache["https://example.com/c"] = "cccc"
+
+    assert "https://example.com/a" in cache
+    assert "https://example.com/b" not in cache
+    assert cache.total_bytes == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_crawl_and_markdown_fetch_each_page_once(site_server, site_url):
+    crawler = WebCrawler()
+    graph = crawler.crawl(site_url, max_depth=2)
+    graph.to_markdown()
+    graph.to_markdown()
+
+    fetched_paths = site_server.request_paths
+    assert len(fetched_paths) == len(set(fetched_paths))
+    assert len(fetched_paths) == len(graph.all_nodes())
+
+
+def test_conversions_never_refetch_evicted_or_failed_pages(site_server, site_url, tmp_path):
+    crawler = WebCrawler(cache=PageCache(max_bytes=1))
+    graph = crawler.crawl(site_url, max_depth=3)
+    markdown = graph.to_markdown()
+    assert markdown[site_url + "missing"] == "" and "Install" in markdown[site_url + "docs/install"]
+    requests_after_conversion = len(site_server.request_paths)
+
+    graph.save_to_multiple_files(str(tmp_path))
+    assert graph.to_markdown() == markdown
+    fetched_paths = site_server.request_paths
+    assert len(fetched_paths) == requests_after_conversion
+    assert len(fetched_paths) == len(set(fetched_paths)) == len(graph.all_nodes())
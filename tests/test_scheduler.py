@@ -0,0 +1,47 @@
+import time
+import threading
+
+from crawler.base.scheduler import KeyedScheduler, TokenBucket
+
+
+def test_token_bucket_delay():
+    bucket = TokenBucket(rate=10, burst=2)
+    now = bucket.updated_at
+    bucket.consume(now)
+    bucket.consume(now)
+    assert abs(bucket.delay(now) - 0.1) < 1e-6
+    assert bucket.delay(now + 0.11) == 0
+
+
+def test_scheduler_limits_concurrency_per_key():
+    running = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    lock = threading.Lock()
+
+    def task(key):
+        with lock:
+            running[key] += 1
+            peak[key] = max(peak[key], running[key])
+        time.sleep(0.01)
+        with lock:
+            running[key] -= 1
+        return key
+
+    with KeyedScheduler(max_workers=8, max_per_key=2) as scheduler:
+        futures = [scheduler.submit(key, task, key) for key in "ab" * 10]
+        assert [future.result() for future in futures] == list("ab" * 10)
+
+    assert peak == {"a": 2, "b": 2}
+
+
+def test_scheduler_serves_other_keys_while_one_is_throttled():
+    started = []
+
+    with KeyedScheduler(max_workers=1, max_per_key=1, rate=5) as scheduler:
+        scheduler.defer("slow", 0.3)
+        futures = [scheduler.submit("slow", started.append, "slow")]
+        futures += [scheduler.submit(f"fast{i}", started.append, f"fast{i}") for i in range(3)]
+        for future in futures:
+            future.result()
+
+    assert started == ["fast0", "fast1", "fast2", "slow"]
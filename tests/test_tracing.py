@@ -0,0 +1,49 @@
+import json
+import threading
+
+from crawler.web.web_crawler import WebCrawler
+from crawler.base.tracing import CrawlTracer
+
+
+def test_ring_buffer_keeps_most_recent_spans(tmp_path):
+    tracer = CrawlTracer(capacity=4)
+    for index in range(6):
+        tracer.record("download", 1000 * index, 1000 * index + 500, f"https://example.com/{index}")
+    thread = threading.Thread(target=tracer.record, args=("parse", 7000, 8000), name="Worker-1")
+    thread.start()
+    thread.join()
+
+    assert tracer.recorded == 7 and len(tracer) == 4 and tracer.dropped == 3
+    spans = list(tracer.iter_spans())
+    assert [span["target"] for span in spans] == [f"https://example.com/{index}" for index in (3, 4, 5)] + [None]
+    assert spans[-1]["thread"] == "Worker-1" and spans[-1]["name"] == "parse"
+
+    path = tmp_path / "crawl.trace.json"
+    tracer.export(str(path))
+    with open(path, encoding="utf-8") as file:
+        trace = json.load(file)
+    assert trace == tracer.to_chrome_trace()
+    assert trace["otherData"] == {"recorded": 7, "dropped": 3}
+    spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert len(spans) == 4 and spans[0]["dur"] == 0.5
+    names = {event["args"]["name"] for event in trace["traceEvents"] if event["name"] == "thread_name"}
+    assert "Worker-1" in names
+
+
+def test_crawl_timeline(site_url, tmp_path):
+    crawler = WebCrawler(trace=True)
+    tracer = crawler.metrics.tracer
+    graph = crawler.crawl(site_url, max_depth=2, workers=2)
+    graph.save_to_multiple_files(str(tmp_path), workers=2, metrics=crawler.metrics)
+
+    spans = list(tracer.iter_spans())
+    downloads = [span for span in spans if span["name"] == "download"]
+    # Expanded pages are fetched by the workers, and waited for by the crawl loop
+    expanded = {site_url, site_url + "docs", site_url + "blog"}
+    assert all(span["thread"] != threading.current_thread().name for span in downloads if span["target"] in expanded)
+    assert {span["target"] for span in downloads} >= expanded
+    assert any(span["name"] == "wait" and span["thread"] == threading.current_thread().name for span in spans)
+    # Markdown conversions run in worker processes, on their own tracks
+    markdown = [span for span in spans if span["name"] == "markdown"]
+    assert markdown and all(span["thread"].startswith("process ") for span in markdown)
+    assert sum(span["name"] == "write" for span in spans) == len(graph)
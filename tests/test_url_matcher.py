@@ -0,0 +1,49 @@
+from crawler.utils.url_matcher import UrlMatcher
+from crawler.web.web_crawler import WebCrawler
+
+
+def test_domain_and_subdomains():
+    matcher = UrlMatcher(["example.com"])
+    assert matcher.match("https://example.com/page")
+    assert matcher.match("https://docs.example.com/guide")
+    assert matcher.match("https://EXAMPLE.com/page")
+
+
+def test_substring_hosts_rejected():
+    matcher = UrlMatcher(["example.com"])
+    assert not matcher.match("https://notexample.com/page")
+    assert not matcher.match("https://evil.net/?example.com")
+    assert not matcher.match("https://example.com.evil.net/")
+
+
+def test_no_domains_allows_everything():
+    assert UrlMatcher().match("https://anything.org/page")
+
+
+def test_port_specific_domain():
+    matcher = UrlMatcher(["127.0.0.1:8000", "example.com:443"])
+    assert matcher.match("http://127.0.0.1:8000/page")
+    assert not matcher.match("http://127.0.0.1:9000/page")
+    assert matcher.match("https://example.com/page")
+    assert not matcher.match("http://example.com/page")
+
+
+def test_include_and_exclude_rules():
+    matcher = UrlMatcher(
+        ["example.com"],
+        include=["https://example.com/docs/", "*/blog/*"],
+        exclude=["*/private/*", "https://example.com/docs/old/"],
+    )
+    assert matcher.match("https://example.com/docs/intro")
+    assert matcher.match("https://www.example.com/blog/post")
+    assert not matcher.match("https://example.com/about")
+    assert not matcher.match("https://example.com/docs/private/key")
+    assert not matcher.match("https://example.com/docs/old/intro")
+
+
+def test_crawler_session_domains():
+    crawler = WebCrawler(allowed_domains=["example.com"], exclude=["*.pdf"])
+    assert not crawler.in_allowed_domain("https://other.org/page")
+    crawler.session_allowed_domains = ["other.org"]
+    assert crawler.in_allowed_domain("https://other.org/page")
+    assert not crawler.in_allowed_domain("https://example.com/file.pdf")
@@ -0,0 +1,45 @@
+from pytest import raises
+
+from crawler.utils.url_utils import UrlCanonicalizer, normalize_url, remove_dot_segments
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.com:443#top") == "https://example.com/"
+    assert normalize_url("http://example.com:99999/") == "http://example.com:99999/"
+
+
+def test_remove_dot_segments():
+    assert remove_dot_segments("/a/b/../c/./d") == "/a/c/d"
+    assert remove_dot_segments("/a/..") == "/"
+    assert remove_dot_segments("/../../a") == "/a"
+    assert remove_dot_segments("/a/b/.") == "/a/b/"
+
+
+def test_canonical_spellings_collapse():
+    canonicalizer = UrlCanonicalizer(trailing_slash="strip")
+    spellings = [
+        "HTTP://Example.com/a?b=2&a=1",
+        "http://example.com:80/a/?a=1&b=2",
+        "http://example.com/x/../a?a=1&utm_source=news&b=2#section",
+        "http://example.com./a?fbclid=123&a=1&b=2",
+    ]
+    assert {canonicalizer.canonicalize(url) for url in spellings} == {"http://example.com/a?a=1&b=2"}
+
+
+def test_canonicalizer_options():
+    url = "http://example.com:8080/a/?b=2&a=1&utm_campaign=x#top"
+    assert UrlCanonicalizer().canonicalize(url) == "http://example.com:8080/a/?a=1&b=2"
+    assert (
+        UrlCanonicalizer(sort_query=False, strip_params=(), remove_fragment=False).canonicalize(url)
+        == "http://example.com:8080/a/?b=2&a=1&utm_campaign=x#top"
+    )
+    assert UrlCanonicalizer(trailing_slash="add").canonicalize("http://example.com/docs") == (
+        "http://example.com/docs/"
+    )
+    assert UrlCanonicalizer(trailing_slash="add").canonicalize("http://example.com/a.html") == (
+        "http://example.com/a.html"
+    )
+    # Query values are never re-encoded
+    assert UrlCanonicalizer().canonicalize("http://example.com/?q=a%20b+c") == "http://example.com/?q=a%20b+c"
+    with raises(ValueError):
+        UrlCanonicalizer(trailing_slash="sometimes")
@@ -0,0 +1,49 @@
+from pytest import raises
+
+from crawler.web.web_crawler import WebCrawler
+from crawler.base.visited_set import BloomFilter, HashVisitedSet, get_visited_set
+
+
+URLS = [f"https://example.com/page/{index}" for index in range(5000)]
+ABSENT_URLS = [f"https://example.org/page/{index}" for index in range(5000)]
+
+
+def test_hash_visited_set_is_exact():
+    visited = HashVisitedSet(capacity=16)
+    for url in URLS:
+        visited.add(url)
+    visited.add(URLS[0])
+    assert len(visited) == len(URLS)
+    assert all(url in visited for url in URLS)
+    assert not any(url in visited for url in ABSENT_URLS)
+    assert visited.nbytes < 32 * len(URLS)
+
+
+def test_bloom_filter_false_positive_rate():
+    visited = BloomFilter(capacity=1000, error_rate=0.01)
+    for url in URLS:
+        visited.add(url)
+    # No false negatives, even once the filter has grown past its initial capacity
+    assert all(url in visited for url in URLS)
+    assert sum(url in visited for url in ABSENT_URLS) / len(ABSENT_URLS) < 0.02
+    assert visited.nbytes < 4 * len(URLS)
+    with raises(ValueError):
+        BloomFilter(error_rate=1.5)
+
+
+def test_get_visited_set():
+    assert get_visited_set() is None
+    assert isinstance(get_visited_set("bloom"), BloomFilter)
+    visited = HashVisitedSet()
+    assert get_visited_set(visited) is visited
+    with raises(ValueError):
+        get_visited_set("unknown")
+
+
+def test_streaming_crawl_with_visited_set(site_url):
+    expected = list(WebCrawler().iter_crawl(site_url, max_depth=3, markdown=False))
+    for visited in ("hash", "bloom"):
+        records = list(WebCrawler().iter_crawl(site_url, max_depth=3, markdown=False, visited=visited))
+        assert [(record.node.id, record.depth, record.links) for record in records] == [
+            (record.node.id, record.depth, record.links) for record in expected
+        ]
@@ -1,9 +1,14 @@
+import sys
+
+from crawler import main, stream_to_files
 from crawler.web.web_crawler import WebCrawler
 from crawler.web.web_node import WebNode
 from crawler.web.web_graph import WebGraph
-from bs4 import BeautifulSoup
+from crawler.web.politeness import Politeness
+from crawler.web.http_session import HttpSession
+from crawler.base.checkpoint import CrawlCheckpoint
 
-from pytest import fixture
+from pytest import fixture, raises
 
 
 # Fixtures for reusable objects
@@ -53,9 +58,8 @@ def test_in_allowed_domain(crawler):
 
 def test_visit_node_neighborhood(crawler, web_node):
     # Mock or provide actual HTML content for testing
-    web_node.cache[web_node.url] = BeautifulSoup(
-        """<a href="/link1">Link 1</a> <a href="https://otherdomain.com/link2">Link 2</a>""",
-        "html.parser",
+    web_node.cache[web_node.url] = (
+        """<a href="/link1">Link 1</a> <a href="https://otherdomain.com/link2">Link 2</a>"""
     )
     neighbors = crawler.visit_node_neighborhood(web_node)
     assert len(neighbors) == 1  # Only the allowed link should be included
@@ -65,15 +69,14 @@ def test_visit_node_neighborhood(crawler, web_node):
 # Test WebNode methods
 def test_web_node_soup(web_node):
     # Mock or provide actual HTML content for testing
-    web_node.cache[web_node.url] = BeautifulSoup("<h1>Example Page</h1>", "html.parser")
+    web_node.cache[web_node.url] = "<h1>Example Page</h1>"
     assert web_node.soup.find("h1").text == "Example Page"
 
 
 def test_fetch_connected_hyperlinks(web_node):
     # Mock or provide actual HTML content for testing
-    web_node.cache[web_node.url] = BeautifulSoup(
-        """<a href="/link1">Link 1</a> <a href="/link2">Link 2</a>""",
-        "html.parser",
+    web_node.cache[web_node.url] = (
+        """<a href="/link1">Link 1</a> <a href="/link2">Link 2</a>"""
     )
     links = web_node.fetch_connected_hyperlinks()
     assert links == ["https://example.com/link1", "https://example.com/link2"]
@@ -81,9 +84,9 @@ def test_fetch_connected_hyperlinks(web_node):
 
 def test_convert_to_markdown(web_node):
     # Mock or provide actual HTML content for testing
-    web_node.cache[web_node.url] = BeautifulSoup("<h1>Example Page</h1>", "html.parser")
+    web_node.cache[web_node.url] = "<h1>Example Page</h1>"
     markdown = web_node.convert_to_markdown()
-    assert markdown.startswith("#  Example Page")
+    assert markdown.startswith("# Example Page")
 
 
 # Test WebGraph methods
@@ -100,3 +103,128 @@ def test_web_graph_add_edge(crawler):
     node2 = crawler.get_node("https://example.com/page2")
     graph.add_edge(node1, node2)
     assert graph.graph.has_edge(node1.id, node2.id)
+
+
+def test_polite_crawl_matches_serial_crawl(site_url):
+    expected = WebCrawler().crawl(site_url, max_depth=3)
+    polite_crawler = WebCrawler(politeness=Politeness(max_per_host=2, requests_per_second=100))
+    graph = polite_crawler.crawl_multiple_urls([site_url], max_depth=3, workers=4)
+    assert sorted(graph.graph.edges) == sorted(expected.graph.edges)
+    assert {node.id: node.depth for node in graph.all_nodes()} == {
+        node.id: node.depth for node in expected.all_nodes()
+    }
+
+
+def test_stream_to_files(site_url, tmp_path):
+    records = WebCrawler().iter_crawl(site_url, max_depth=1, workers=2)
+    count = stream_to_files(records, str(tmp_path), combine=False)
+    assert count == 3
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_canonical_neighbors_fetched_once():
+    crawler = WebCrawler(allowed_domains=["example.com"])
+    crawler.start_new_crawling_session("https://example.com/start")
+    node = crawler.get_node("https://example.com/start")
+    node.cache[node.url] = (
+        '<a href="/page?b=2&a=1">1</a> <a href="HTTPS://EXAMPLE.com:443/page?a=1&b=2#top">2</a> '
+        '<a href="/other/../page?a=1&b=2&utm_source=x">3</a> <a href="/second">4</a>'
+    )
+    neighbors = crawler.visit_node_neighborhood(node)
+    assert [neighbor.url for neighbor in neighbors] == [
+        "https://example.com/page?a=1&b=2",
+        "https://example.com/second",
+    ]
+    assert crawler.canonicalization_stats()["fetches_avoided"] == 2
+
+
+def test_redirects_and_canonical_links_merge_nodes(aliased_site_server, aliased_site_url):
+    crawler = WebCrawler()
+    graph = crawler.crawl(aliased_site_url, max_depth=2)
+    expected_nodes = {aliased_site_url + path for path in ["", "docs/latest/", "docs/latest/guide", "about"]}
+    assert {node.id for node in graph.all_nodes()} == expected_nodes
+    assert graph.graph.has_edge(aliased_site_url, aliased_site_url + "about")
+    assert graph.graph.has_edge(aliased_site_url + "docs/latest/", aliased_site_url + "docs/latest/guide")
+    # The content of /about was read from /print/about, which declares it as canonical
+    assert "/about" not in aliased_site_server.request_paths
+    assert crawler.aliases[aliased_site_url + "old"] == aliased_site_url + "docs/latest/"
+
+    # Known aliases are resolved before any request
+    requests_before = len(aliased_site_server.request_paths)
+    assert crawler.get_node(aliased_site_url + "old").url == aliased_site_url + "docs/latest/"
+    assert len(aliased_site_server.request_paths) == requests_before
+
+
+def test_aliased_parallel_crawl_matches_serial_crawl(aliased_site_url):
+    expected = WebCrawler().crawl(aliased_site_url, max_depth=3)
+    graph = WebCrawler().crawl(aliased_site_url, max_depth=3, workers=4)
+    assert sorted(graph.graph.edges) == sorted(expected.graph.edges)
+    records = list(WebCrawler().iter_crawl(aliased_site_url, max_depth=3, workers=2))
+    assert sorted(record.node.id for record in records) == sorted(graph.graph.nodes)
+
+
+def test_polite_crawlers_do_not_leak_response_hooks(site_url):
+    session = HttpSession()
+    hooks = session.session.hooks["response"]
+    for _ in range(3):
+        crawler = WebCrawler(session=session, politeness=Politeness(max_per_host=2))
+        crawler.crawl_multiple_urls([site_url], max_depth=1, workers=2)
+    assert hooks == [] and crawler._scheduler is None
+
+
+def test_polite_crawl_retries_throttled_pages(site_server, site_url):
+    expected = WebCrawler().crawl(site_url, max_depth=3)
+    site_server.request_paths.clear()
+    site_server.throttled["/docs"] = 1
+    crawler = WebCrawler(politeness=Politeness(max_per_host=2, respect_crawl_delay=False))
+    graph = crawler.crawl_multiple_urls([site_url], max_depth=3, workers=2)
+
+    assert site_server.request_paths.count("/docs") == 2
+    assert sorted(graph.graph.edges) == sorted(expected.graph.edges)
+    assert "Install" in graph.get_node(site_url + "docs").to_markdown()
+
+
+def test_multiple_urls_crawl_matches_serial_crawl(site_server, site_url, duplicate_site_url, tmp_path):
+    # A link to the other site, which the session of each URL must not follow
+    site_server.pages = dict(site_server.pages)
+    site_server.pages["/blog/post"] += f'<a href="{duplicate_site_url}guide">Guide</a>'
+    urls = [site_url, duplicate_site_url]
+    expected = WebCrawler().crawl_multiple_urls(urls, max_depth=3)
+    expected_depths = {node.id: node.depth for node in expected.all_nodes()}
+    assert not expected.graph.has_edge(site_url + "blog/post", duplicate_site_url + "guide")
+
+    polite_crawler = WebCrawler(politeness=Politeness(max_per_host=2, respect_crawl_delay=False))
+    checkpoint_dir = str(tmp_path / "checkpoint")
+    for graph in (
+        WebCrawler().crawl_multiple_urls(urls, max_depth=3, workers=4),
+        polite_crawler.crawl_multiple_urls(urls, max_depth=3, workers=4),
+        WebCrawler().crawl_multiple_urls(urls, max_depth=3, workers=2, checkpoint=CrawlCheckpoint(checkpoint_dir)),
+        WebCrawler().resume(CrawlCheckpoint(checkpoint_dir)),
+    ):
+        assert sorted(graph.graph.edges) == sorted(expected.graph.edges)
+        assert {node.id: node.depth for node in graph.all_nodes()} == expected_depths
+
+
+def test_stream_to_combined_file_replaces_previous_run(site_url, tmp_path):
+    for _ in range(2):
+        records = WebCrawler().iter_crawl(site_url, max_depth=1)
+        assert stream_to_files(records, str(tmp_path), combine=True) == 3
+    with open(tmp_path / "merged_output.md", encoding="utf-8") as file:
+        assert file.read().count(site_url + "docs") == 1
+
+
+def test_cli_rejects_ignored_options(monkeypatch, tmp_path, capsys):
+    for options in (
+        ["-z", "gzip"],
+        ["-c", "-s", "-z", "gzip"],
+        ["-vs", "hash"],
+        ["-s", "-sg", str(tmp_path / "graph.bin")],
+        ["-s", "-vis"],
+        ["-s", "-mw", "4"],
+        ["-s", "-vs", "hash", "-gs", "compact"],
+        ["-mt", str(tmp_path / "metrics.csv")],
+    ):
+        monkeypatch.setattr(sys, "argv", ["crawler", "-u", "https://example.com", "-o", str(tmp_path)] + options)
+        with raises(SystemExit):
+            main()
+        assert "error: argument" in capsys.readouterr().err
@@ -1,3 +1,5 @@
+import pytest
+
 from crawler.web.web_node import WebNode
 from crawler.web.web_graph import WebGraph
 
@@ -17,3 +19,69 @@ def test_add_edge_to_web_graph():
     graph.add_node(node2)
     graph.add_edge(node1, node2)
     assert graph.graph.has_edge(node1.id, node2.id)
+
+
+def test_parallel_markdown_matches_serial_markdown(tmp_path):
+    graph = WebGraph()
+    for index in range(20):
+        node = WebNode(f"https://example.com/page{index}")
+        node.load_html(f"<h1>Page {index}</h1><p>Body of page {index}</p>" if index % 7 else "")
+        graph.add_node(node)
+
+    serial = graph.to_markdown()
+    parallel = graph.to_markdown(workers=2)
+    assert list(parallel.items()) == list(serial.items())
+    assert parallel["https://example.com/page1"] == "# Page 1\n\nBody of page 1\n\n"
+
+    path = graph.save_to_single_file(directory=str(tmp_path), workers=2)
+    with open(path, encoding="utf-8") as file:
+        content = file.read()
+    assert content.index("# Page 1\n") < content.index("# Page 2\n") < content.index("# Page 19\n")
+
+
+def build_saved_graph():
+    graph = WebGraph()
+    nodes = []
+    for index in range(5):
+        node = WebNode(f"https://example.com/page{index}")
+        node.load_html(f"<h1>Page {index}</h1><p>Body of page {index}</p>" if index != 3 else "")
+        node.depth = index // 2
+        node.parent = nodes[index // 2] if index else None
+        graph.add_node(node)
+        nodes.append(node)
+    for index in range(1, 5):
+        graph.add_edge(nodes[index // 2], nodes[index], depth=index // 2)
+    graph.aliases["https://example.com/old"] = "https://example.com/page1"
+    return graph
+
+
+def test_save_and_load_graph(tmp_path):
+    graph = build_saved_graph()
+    path = graph.save(str(tmp_path / "graph.wg"))
+    loaded = WebGraph.load(path)
+    assert len(loaded) == 5
+    # Nodes are only created when accessed
+    assert loaded.store._nodes.count(None) == 5
+    assert loaded.get_node("https://example.com/old").id == "https://example.com/page1"
+    assert sorted(loaded.graph.edges(data="depth")) == sorted(graph.graph.edges(data="depth"))
+    assert {node.id: (node.depth, node.parent and node.parent.id) for node in loaded.all_nodes()} == {
+        node.id: (node.depth, node.parent and node.parent.id) for node in graph.all_nodes()
+    }
+    assert loaded.to_markdown() == graph.to_markdown()
+
+    copy = WebGraph.load(path, store="networkx")
+    assert sorted(copy.graph.edges) == sorted(graph.graph.edges)
+    assert copy.to_markdown(workers=2) == graph.to_markdown()
+
+
+def test_save_without_content_and_reject_other_files(tmp_path):
+    graph = build_saved_graph()
+    path = graph.save(str(tmp_path / "graph.wg"), content=False)
+    loaded = WebGraph.load(path)
+    assert [node.id for node in loaded.all_nodes()] == [node.id for node in graph.all_nodes()]
+    assert loaded.get_node("https://example.com/page2")._html_z is None
+
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"not a graph file at all, but long enough")
+    with pytest.raises(ValueError):
+        WebGraph.load(str(other))
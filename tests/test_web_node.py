@@ -12,3 +12,31 @@ def test_web_node_initialization():
 def test_web_node_domain_extraction():
     node = WebNode("https://example.com/page")
     assert node.domain == "example.com"
+
+
+def test_lean_web_node_matches_default_node():
+    html = '<html><body><h1>Title</h1><a href="/a">A</a> <a href="/b.html#top">B</a></body></html>'
+    default_node = WebNode("https://example.com/")
+    default_node.load_html(html)
+    lean_node = WebNode("https://example.com/", lean=True)
+    lean_node.load_html(html)
+
+    assert lean_node.fetch_connected_hyperlinks() == default_node.fetch_connected_hyperlinks()
+    assert lean_node._soup is None
+    assert not hasattr(lean_node, "__dict__")
+    assert lean_node.convert_to_markdown() == default_node.convert_to_markdown()
+    assert lean_node._soup is None
+
+
+def test_failed_page_is_fetched_once(site_server, site_url):
+    node = WebNode(site_url + "missing")
+    assert node.fetch_connected_hyperlinks() == []
+    assert node.content_fingerprint() is None
+    assert node.markdown_task() is None
+    assert node.to_markdown() == ""
+    assert site_server.request_paths == ["/missing"]
+
+
+def test_malformed_url_is_a_failed_page():
+    node = WebNode("http://example.com:99999/")
+    assert node._fetch_html() == ""